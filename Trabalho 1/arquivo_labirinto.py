@@ -0,0 +1,169 @@
+import os
+import struct
+from typing import Iterator, Optional, Tuple
+
+import numpy as np
+
+# Formato .lab: cabeçalho fixo de TAMANHO_CABECALHO bytes (little-endian) seguido das
+# células em ordem de linha. Na codificação UINT8 cada célula é um byte com o valor do
+# grid (0 livre, 1 parede, 2 início, 3 fim) e o arquivo pode ser aberto por memmap sem
+# cópia; na codificação BITS cada linha guarda só as paredes, 1 bit por célula (a linha
+# é completada até um byte inteiro), e S/E vêm do cabeçalho.
+MAGICO = b"LABI"
+VERSAO = 1
+UINT8 = 0
+BITS = 1
+# magico, versão, codificação, conectividade, linhas, colunas, início (i, j), fim (i, j)
+_CABECALHO = struct.Struct("<4sBBBxQQqqqq8x")
+TAMANHO_CABECALHO = _CABECALHO.size
+EXTENSAO = ".lab"
+# Células processadas por vez ao salvar (limita a memória temporária em grids enormes)
+CELULAS_POR_BLOCO = 1 << 24
+
+
+class CabecalhoLabirinto:
+    # Metadados de um arquivo .lab; inicio/fim são None quando o grid não tem S/E
+    def __init__(
+        self,
+        linhas: int,
+        colunas: int,
+        inicio: Optional[Tuple[int, int]] = None,
+        fim: Optional[Tuple[int, int]] = None,
+        conectividade: int = 4,
+        codificacao: int = UINT8,
+    ):
+        self.linhas = linhas
+        self.colunas = colunas
+        self.inicio = inicio
+        self.fim = fim
+        self.conectividade = conectividade
+        self.codificacao = codificacao
+
+    # Bytes das células no arquivo
+    @property
+    def tamanho_dados(self) -> int:
+        if self.codificacao == BITS:
+            return self.linhas * ((self.colunas + 7) // 8)
+        return self.linhas * self.colunas
+
+    def empacotar(self) -> bytes:
+        inicio = self.inicio or (-1, -1)
+        fim = self.fim or (-1, -1)
+        return _CABECALHO.pack(
+            MAGICO,
+            VERSAO,
+            self.codificacao,
+            self.conectividade,
+            self.linhas,
+            self.colunas,
+            *inicio,
+            *fim,
+        )
+
+    @classmethod
+    def desempacotar(cls, dados: bytes) -> "CabecalhoLabirinto":
+        if len(dados) < TAMANHO_CABECALHO or dados[:4] != MAGICO:
+            raise ValueError("Arquivo não é um labirinto .lab")
+        _, versao, codificacao, conectividade, linhas, colunas, *extremos = (
+            _CABECALHO.unpack(dados[:TAMANHO_CABECALHO])
+        )
+        if versao != VERSAO:
+            raise ValueError(f"Versão de arquivo não suportada: {versao}")
+        if codificacao not in (UINT8, BITS):
+            raise ValueError(f"Codificação desconhecida: {codificacao}")
+        inicio = tuple(extremos[:2]) if extremos[0] >= 0 else None
+        fim = tuple(extremos[2:]) if extremos[2] >= 0 else None
+        return cls(linhas, colunas, inicio, fim, conectividade, codificacao)
+
+
+# Faixas de linhas [a, b) com cerca de CELULAS_POR_BLOCO células cada
+def blocos_de_linhas(linhas: int, colunas: int) -> Iterator[Tuple[int, int]]:
+    passo = max(1, CELULAS_POR_BLOCO // max(1, colunas))
+    for a in range(0, linhas, passo):
+        yield a, min(linhas, a + passo)
+
+
+# Localiza o único S e o único E do grid, bloco a bloco. Mais de um S ou E (o Flood
+# Fill aceita várias saídas) deixa o extremo repetido como None no cabeçalho.
+def _extremos(grade: np.ndarray):
+    achados = {2: [], 3: []}
+    colunas = grade.shape[1]
+    for a, b in blocos_de_linhas(*grade.shape):
+        bloco = grade[a:b]
+        for valor, lista in achados.items():
+            for k in np.flatnonzero(bloco == valor)[:2].tolist():
+                lista.append((a + k // colunas, k % colunas))
+    return tuple(lista[0] if len(lista) == 1 else None for lista in achados.values())
+
+
+# Grava o grid (list of lists ou array) num arquivo .lab. compactar=True usa 1 bit por
+# célula e exige um grid só de paredes/células livres com no máximo um S e um E.
+def salvar_labirinto(
+    caminho: str, grid, conectividade: int = 4, compactar: bool = False
+) -> CabecalhoLabirinto:
+    if conectividade not in (4, 8):
+        raise ValueError("conectividade deve ser 4 ou 8")
+    grade = np.asarray(grid)
+    if grade.ndim != 2:
+        raise ValueError("O grid deve ser bidimensional")
+    if grade.dtype != np.uint8:
+        grade = grade.astype(np.uint8)
+    inicio, fim = _extremos(grade)
+    cabecalho = CabecalhoLabirinto(
+        grade.shape[0],
+        grade.shape[1],
+        inicio,
+        fim,
+        conectividade,
+        BITS if compactar else UINT8,
+    )
+    if compactar:
+        especiais = int(np.count_nonzero(grade > 1))
+        if int(np.count_nonzero(grade > 3)) or especiais != (inicio is not None) + (
+            fim is not None
+        ):
+            raise ValueError("compactar exige só células 0/1 e no máximo um S e um E")
+    with open(caminho, "wb") as arquivo:
+        arquivo.write(cabecalho.empacotar())
+        for a, b in blocos_de_linhas(*grade.shape):
+            bloco = grade[a:b]
+            if compactar:
+                bloco = np.packbits(bloco == 1, axis=1)
+            arquivo.write(np.ascontiguousarray(bloco).tobytes())
+    return cabecalho
+
+
+def ler_cabecalho(caminho: str) -> CabecalhoLabirinto:
+    with open(caminho, "rb") as arquivo:
+        return CabecalhoLabirinto.desempacotar(arquivo.read(TAMANHO_CABECALHO))
+
+
+# Células de um arquivo .lab como matriz (linhas, colunas) de uint8. Na codificação
+# UINT8 é um numpy.memmap: abrir não lê o arquivo, e as páginas são carregadas sob
+# demanda (modo="r+" grava as alterações no próprio arquivo). Na codificação BITS as
+# paredes são descompactadas em memória.
+def carregar_labirinto(
+    caminho: str, modo: str = "r"
+) -> Tuple[np.ndarray, CabecalhoLabirinto]:
+    cabecalho = ler_cabecalho(caminho)
+    if os.path.getsize(caminho) < TAMANHO_CABECALHO + cabecalho.tamanho_dados:
+        raise ValueError("Arquivo .lab truncado")
+    forma = (cabecalho.linhas, cabecalho.colunas)
+    if cabecalho.codificacao == UINT8:
+        grade = np.memmap(
+            caminho, dtype=np.uint8, mode=modo, offset=TAMANHO_CABECALHO, shape=forma
+        )
+        return grade, cabecalho
+    bits = np.memmap(
+        caminho,
+        dtype=np.uint8,
+        mode="r",
+        offset=TAMANHO_CABECALHO,
+        shape=(cabecalho.linhas, (cabecalho.colunas + 7) // 8),
+    )
+    grade = np.unpackbits(np.asarray(bits), axis=1, count=cabecalho.colunas)
+    if cabecalho.inicio is not None:
+        grade[cabecalho.inicio] = 2
+    if cabecalho.fim is not None:
+        grade[cabecalho.fim] = 3
+    return grade, cabecalho
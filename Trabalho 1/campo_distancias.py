@@ -0,0 +1,93 @@
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+
+class CampoDistancias:
+    # Campo de distâncias até a saída (E) mais próxima, calculado uma única vez por
+    # BFS reversa com várias origens (todas as saídas). As distâncias ficam num vetor
+    # plano int32 com borda de paredes (-1 = parede ou sem acesso a nenhuma saída),
+    # e cada consulta desce o gradiente: O(tamanho do caminho).
+    def __init__(
+        self,
+        labirinto: List[List[int]],
+        saidas: Optional[List[Tuple[int, int]]] = None,
+    ):
+        self.labirinto = labirinto
+        self.saidas = saidas
+        self.linhas = len(labirinto)
+        self.colunas = len(labirinto[0]) if self.linhas else 0
+        self.largura = self.colunas + 2
+        self.valido = False
+        self.dist = None
+        self._dist = None
+        self.calcular()
+
+    # (Re)calcula o campo a partir do estado atual do labirinto
+    def calcular(self):
+        largura = self.largura
+        grade = np.ones((self.linhas + 2, largura), dtype=np.int32)
+        if self.linhas and self.colunas:
+            grade[1:-1, 1:-1] = np.asarray(self.labirinto)
+        livre = (grade != 1).reshape(-1)
+        if self.saidas is None:
+            fronteira = np.flatnonzero(grade.reshape(-1) == 3)
+        else:
+            fronteira = np.array(
+                [(x + 1) * largura + y + 1 for x, y in self.saidas], dtype=np.int64
+            )
+            fronteira = np.unique(fronteira[livre[fronteira]])
+
+        dist = np.full(grade.size, -1, dtype=np.int32)
+        dist[fronteira] = 0
+        deslocamentos = (-largura, 1, largura, -1)
+        nivel = 0
+        while fronteira.size:
+            vizinhos = np.concatenate([fronteira + d for d in deslocamentos])
+            vizinhos = vizinhos[livre[vizinhos] & (dist[vizinhos] < 0)]
+            fronteira = np.unique(vizinhos)
+            nivel += 1
+            dist[fronteira] = nivel
+
+        # vista sem borda para uso externo; a consulta usa o vetor plano com borda
+        self.dist = dist.reshape(self.linhas + 2, largura)[1:-1, 1:-1]
+        self._dist = memoryview(dist).cast("B").cast("i")
+        self.valido = True
+
+    # Marca o campo como desatualizado (o labirinto foi editado); a próxima consulta
+    # recalcula
+    def invalidar(self):
+        self.valido = False
+
+    def _garantir(self):
+        if not self.valido:
+            self.calcular()
+
+    # Passos até a saída mais próxima, ou -1 se for parede / não houver saída alcançável
+    def distancia(self, pos: Tuple[int, int]) -> int:
+        self._garantir()
+        x, y = pos
+        if not (0 <= x < self.linhas and 0 <= y < self.colunas):
+            return -1
+        return self._dist[(x + 1) * self.largura + y + 1]
+
+    # Caminho (inclusive) de pos até a saída mais próxima: a cada passo vai para um
+    # vizinho com distância uma unidade menor
+    def caminho(self, pos: Tuple[int, int]) -> Optional[List[Tuple[int, int]]]:
+        restante = self.distancia(pos)
+        if restante < 0:
+            return None
+        dist = self._dist
+        largura = self.largura
+        deslocamentos = (-largura, 1, largura, -1)
+        atual = (pos[0] + 1) * largura + pos[1] + 1
+        caminho = [tuple(pos)]
+        while restante:
+            restante -= 1
+            for d in deslocamentos:
+                if dist[atual + d] == restante:
+                    atual += d
+                    break
+            x, y = divmod(atual, largura)
+            caminho.append((x - 1, y - 1))
+        return caminho
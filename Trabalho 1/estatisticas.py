@@ -0,0 +1,217 @@
+import heapq
+import time
+import tracemalloc
+from typing import Callable, Dict, Optional
+
+# Fases de uma execução, na ordem em que acontecem. "visualizacao" é só o tempo
+# gravando o rastro durante a busca (a janela do matplotlib não entra na conta).
+FASES = ("preparacao", "busca", "reconstrucao", "visualizacao")
+NOMES = {
+    "preparacao": "preparação",
+    "busca": "busca",
+    "reconstrucao": "reconstrução",
+    "visualizacao": "visualização",
+}
+ABREVIACOES = {
+    "preparacao": "prep.",
+    "busca": "busca",
+    "reconstrucao": "reconstr.",
+    "visualizacao": "vis.",
+}
+
+
+class EstatisticasBusca:
+    # Métricas de uma execução de PathFinder / FloodFill (e dos planejadores).
+    # expandidos e o tempo de cada fase são sempre preenchidos: custam só algumas
+    # leituras do relógio por execução. Os sucessores gerados, os contadores da fila
+    # (inserções, remoções, entradas obsoletas, pico da fronteira) e o pico de memória
+    # (tracemalloc) só são coletados com detalhado=True: nesse caso a busca usa as
+    # operações instrumentadas de operacoes_heap/operacoes_fila e soma os sucessores
+    # de cada nó expandido; sem ele recebe as funções originais (heapq, deque) e não
+    # paga nada. Um campo não medido (sem detalhado, ou num motor que não passa por
+    # essas operações, como o LPA* e o HPA*) fica None e sai como "não medido".
+    # gancho(fase, estatisticas), se dado, é chamado ao fim de cada fase.
+    def __init__(
+        self,
+        detalhado: bool = False,
+        gancho: Optional[Callable[[str, "EstatisticasBusca"], None]] = None,
+    ):
+        self.detalhado = detalhado
+        self.gancho = gancho
+        self.expandidos = 0
+        # vizinhos transitáveis (pontos de salto no JPS) produzidos ao expandir cada
+        # nó, entrando ou não na fila
+        self.gerados: Optional[int] = None
+        self.insercoes: Optional[int] = None
+        self.remocoes: Optional[int] = None
+        # entradas retiradas da fila que já estavam fechadas (custo desatualizado)
+        self.obsoletos: Optional[int] = None
+        self.pico_fronteira: Optional[int] = None
+        self.pico_memoria_kb: Optional[float] = None
+        self.tempos_ms: Dict[str, float] = dict.fromkeys(FASES, 0.0)
+        self._marca = time.perf_counter()
+        self._parar_tracemalloc = False
+        if detalhado:
+            if tracemalloc.is_tracing():
+                tracemalloc.reset_peak()
+            else:
+                tracemalloc.start()
+                self._parar_tracemalloc = True
+
+    # Tempo da preparação, da busca e da reconstrução (sem a visualização)
+    @property
+    def total_ms(self) -> float:
+        return sum(ms for fase, ms in self.tempos_ms.items() if fase != "visualizacao")
+
+    # Encerra a fase atual: o tempo desde a última marca vai para `fase`
+    def marcar(self, fase: str):
+        agora = time.perf_counter()
+        self.tempos_ms[fase] += (agora - self._marca) * 1000.0
+        self._marca = agora
+        if self.gancho is not None:
+            self.gancho(fase, self)
+
+    # Move para `para` o tempo (s) medido à parte dentro de outra fase (ex.: o rastro
+    # da visualização ou os caminhos reconstruídos no meio da busca)
+    def transferir(self, segundos: float, para: str, de: str = "busca"):
+        self.tempos_ms[de] -= segundos * 1000.0
+        self.tempos_ms[para] += segundos * 1000.0
+
+    # Zera os contadores da busca e da fila, que passam a ser medidos (só com
+    # detalhado). operacoes_heap/operacoes_fila já chamam; motores com fila própria ou
+    # por camadas chamam antes de somar os sucessores
+    def medir_fila(self):
+        if self.detalhado and self.remocoes is None:
+            self.gerados = self.insercoes = self.remocoes = self.pico_fronteira = 0
+
+    # heappush/heappop que contam as operações e o pico da fila; sem detalhado são
+    # as próprias funções do heapq
+    def operacoes_heap(self):
+        if not self.detalhado:
+            return heapq.heappush, heapq.heappop
+        self.medir_fila()
+        heappush, heappop = heapq.heappush, heapq.heappop
+
+        def push(fila, item):
+            heappush(fila, item)
+            self.insercoes += 1
+            if len(fila) > self.pico_fronteira:
+                self.pico_fronteira = len(fila)
+
+        def pop(fila):
+            self.remocoes += 1
+            return heappop(fila)
+
+        return push, pop
+
+    # append/popleft de uma deque, instrumentados como em operacoes_heap
+    def operacoes_fila(self, fila):
+        if not self.detalhado:
+            return fila.append, fila.popleft
+        self.medir_fila()
+        append, popleft = fila.append, fila.popleft
+
+        def empilhar(item):
+            append(item)
+            self.insercoes += 1
+            if len(fila) > self.pico_fronteira:
+                self.pico_fronteira = len(fila)
+
+        def desempilhar():
+            self.remocoes += 1
+            return popleft()
+
+        return empilhar, desempilhar
+
+    # Para motores que avançam por camadas: registra uma camada de uma vez (os nós
+    # expandidos, os sucessores gerados por eles e os que entraram na próxima camada)
+    def registrar_camada(self, fronteira: int, gerados: int, inseridos: int):
+        if self.detalhado:
+            self.medir_fila()
+            self.gerados += gerados
+            self.insercoes += inseridos
+            self.remocoes += fronteira
+            if fronteira > self.pico_fronteira:
+                self.pico_fronteira = fronteira
+
+    # Para filas próprias que contam as operações localmente (ex.: os baldes do modo
+    # dial): registra os totais de uma vez
+    def registrar_fila(self, inseridos: int, remocoes: int, pico: int):
+        if self.detalhado:
+            self.medir_fila()
+            self.insercoes += inseridos
+            self.remocoes += remocoes
+            if pico > self.pico_fronteira:
+                self.pico_fronteira = pico
+
+    # Fecha a execução: guarda os expandidos e deriva inserções/obsoletos
+    def concluir(self, expandidos: int, raizes: int = 1):
+        self.expandidos = expandidos
+        if not self.detalhado:
+            return
+        if self.remocoes is not None:
+            self.insercoes += raizes
+            self.obsoletos = max(0, self.remocoes - expandidos)
+            self.pico_fronteira = max(self.pico_fronteira, raizes)
+        self.pico_memoria_kb = tracemalloc.get_traced_memory()[1] / 1024.0
+        self.liberar()
+
+    # Desliga o tracemalloc ligado por esta execução (também se a busca for cancelada)
+    def liberar(self):
+        if self._parar_tracemalloc:
+            tracemalloc.stop()
+            self._parar_tracemalloc = False
+
+    # Uma linha para a barra de status (sem os campos não medidos)
+    def resumo(self) -> str:
+        partes = [f"Expandidos: {self.expandidos}"]
+        if self.gerados is not None:
+            partes.append(f"Gerados: {self.gerados}")
+            partes.append(f"Pico da fronteira: {self.pico_fronteira}")
+        if self.pico_memoria_kb is not None:
+            partes.append(f"Memória: {self.pico_memoria_kb:.0f} KiB")
+        tempos = " + ".join(
+            f"{ABREVIACOES[fase]} {ms:.1f}"
+            for fase, ms in self.tempos_ms.items()
+            if ms > 0
+        )
+        partes.append(f"Tempo total: {self.total_ms:.3f} ms ({tempos or '0'})")
+        return " | ".join(partes)
+
+    # Várias linhas para o terminal
+    def relatorio(self) -> str:
+        linhas = [f"Nós expandidos: {self.expandidos}"]
+        if self.gerados is None:
+            motivo = "detalhado desligado" if not self.detalhado else "sem fila única"
+            linhas.append(f"Nós gerados e operações da fila: não medidos ({motivo})")
+        else:
+            linhas.extend(
+                [
+                    f"Nós gerados: {self.gerados}",
+                    f"Inserções/remoções na fila: {self.insercoes}/{self.remocoes}",
+                    f"Entradas obsoletas descartadas: {self.obsoletos}",
+                    f"Pico da fronteira: {self.pico_fronteira}",
+                ]
+            )
+        if self.pico_memoria_kb is None:
+            linhas.append("Pico de memória: não medido")
+        else:
+            linhas.append(f"Pico de memória: {self.pico_memoria_kb:.1f} KiB")
+        for fase, ms in self.tempos_ms.items():
+            linhas.append(f"Tempo de {NOMES[fase]}: {ms:.3f} ms")
+        linhas.append(f"Tempo total (sem visualização): {self.total_ms:.3f} ms")
+        return "\n".join(linhas)
+
+    def como_dicionario(self) -> dict:
+        dados = {"expandidos": self.expandidos, "tempo_total_ms": self.total_ms}
+        dados.update({f"tempo_{fase}_ms": ms for fase, ms in self.tempos_ms.items()})
+        medidos = dict(
+            gerados=self.gerados,
+            insercoes=self.insercoes,
+            remocoes=self.remocoes,
+            obsoletos=self.obsoletos,
+            pico_fronteira=self.pico_fronteira,
+            pico_memoria_kb=self.pico_memoria_kb,
+        )
+        dados.update({k: v for k, v in medidos.items() if v is not None})
+        return dados
@@ -0,0 +1,49 @@
+import threading
+from typing import Any, Callable, Optional, Tuple
+
+# Número de expansões entre duas chamadas do callback de progresso dos motores
+INTERVALO_PROGRESSO = 1024
+
+
+class BuscaCancelada(Exception):
+    # Levantada pelos motores quando o callback de progresso pede a interrupção
+    pass
+
+
+class ExecucaoEmSegundoPlano:
+    # Executa uma busca numa thread separada. A tarefa recebe o callback de progresso
+    # (expandidos, fronteira) -> bool e deve repassá-lo ao motor; o callback só guarda
+    # o último valor e informa se a busca deve continuar. A interface consulta o
+    # estado periodicamente (root.after), sem tocar em widgets fora da thread do Tk.
+    def __init__(self, tarefa: Callable[[Callable[[int, int], bool]], Any]):
+        self.tarefa = tarefa
+        self.resultado = None
+        self.erro: Optional[BaseException] = None
+        self.cancelada = False
+        self.progresso: Optional[Tuple[int, int]] = None
+        self._cancelar = threading.Event()
+        self._terminou = threading.Event()
+        self._thread = threading.Thread(target=self._executar, daemon=True)
+
+    def iniciar(self):
+        self._thread.start()
+
+    def cancelar(self):
+        self._cancelar.set()
+
+    def terminou(self) -> bool:
+        return self._terminou.is_set()
+
+    def _informar_progresso(self, expandidos: int, fronteira: int) -> bool:
+        self.progresso = (expandidos, fronteira)
+        return not self._cancelar.is_set()
+
+    def _executar(self):
+        try:
+            self.resultado = self.tarefa(self._informar_progresso)
+        except BuscaCancelada:
+            self.cancelada = True
+        except Exception as erro:
+            self.erro = erro
+        finally:
+            self._terminou.set()
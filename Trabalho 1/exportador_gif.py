@@ -0,0 +1,261 @@
+import math
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+from PIL import Image
+
+try:
+    # codificadores de quadro do Pillow, semi-privados: sem eles o GIF é montado em
+    # memória e salvo de uma vez por Image.save ao fechar
+    from PIL.GifImagePlugin import getdata, getheader
+except ImportError:
+    getdata = getheader = None
+
+from rastro import EXPANDIR, DESCOBRIR, RastroBusca, ReprodutorRastro
+
+# Mesmas cores do colormap de visualizar_busca (0 livre, 1 parede, 2 início, 3 fim,
+# 4 visitado, 5 caminho, 6 na fila, 7 terreno)
+CORES = [
+    "#ffffff",
+    "#000000",
+    "#008000",
+    "#ff0000",
+    "#87cefa",
+    "#ffd700",
+    "#ff69b4",
+    "#d2b48c",
+]
+# Maior lado da imagem gerada, em pixels
+TAMANHO_MAX = 800
+DURACAO_MS = 80
+# Tempo em que o quadro final (com o caminho) fica parado
+DURACAO_FINAL_MS = 5000
+
+
+def _paleta(cores: Sequence[str]) -> List[int]:
+    paleta = []
+    for cor in cores:
+        paleta.extend(int(cor[k : k + 2], 16) for k in (1, 3, 5))
+    return paleta
+
+
+# n índices de 0..total-1 igualmente espaçados (centro de cada faixa)
+def _amostrar(total: int, n: int) -> np.ndarray:
+    n = max(1, n)
+    return ((np.arange(n) + 0.5) * total / n).astype(np.intp)
+
+
+class ExportadorGif:
+    # Grava um GIF animado direto no disco, quadro a quadro, sem passar por uma figura
+    # do matplotlib. Cada grid vira uma imagem de paleta (o valor da célula é o índice
+    # da cor), ampliada por vizinho mais próximo; só o retângulo de células que mudou
+    # em relação ao quadro anterior é codificado, e quadros repetidos somam a duração.
+    # Em memória ficam apenas o último grid e o último quadro ainda não escrito (sem os
+    # codificadores do Pillow, todos os quadros, salvos juntos ao fechar). Valores além
+    # da paleta ficam com a última cor, ou reutilizam as cores a partir do índice
+    # reciclar_de.
+    def __init__(
+        self,
+        caminho: str,
+        linhas: int,
+        colunas: int,
+        tamanho_max: int = TAMANHO_MAX,
+        duracao_ms: int = DURACAO_MS,
+        a_cada: int = 1,
+        cores: Sequence[str] = CORES,
+        repetir: bool = True,
+        reciclar_de: Optional[int] = None,
+    ):
+        maior = max(linhas, colunas, 1)
+        if maior <= tamanho_max:
+            self.escala = tamanho_max // maior
+            self._amostragem = None
+        else:
+            # grid maior que a imagem: reduz amostrando linhas/colunas (vizinho mais
+            # próximo), um pixel por célula amostrada
+            self.escala = 1
+            self._amostragem = np.ix_(
+                _amostrar(linhas, linhas * tamanho_max // maior),
+                _amostrar(colunas, colunas * tamanho_max // maior),
+            )
+        self.caminho = caminho
+        self.duracao_ms = duracao_ms
+        self.a_cada = max(1, a_cada)
+        self.num_cores = len(cores)
+        self.paleta = _paleta(cores)
+        self.repetir = repetir
+        self.reciclar_de = reciclar_de
+        self.quadros = 0
+        self._recebidos = 0
+        self._descartado = None
+        self._anterior = None
+        # quadro já codificado aguardando a duração final: (imagem, posição, duração)
+        self._pendente = None
+        # quadros inteiros guardados quando não há como escrevê-los um a um
+        self._guardados = []
+        self._arquivo = open(caminho, "wb")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+
+    # Recebe o próximo estado do grid. Com a_cada > 1 só um a cada a_cada quadros é
+    # gravado (o último recebido sempre entra, ao fechar); forcar ignora o descarte.
+    def adicionar(self, grid, duracao_ms: Optional[int] = None, forcar: bool = False):
+        self._recebidos += 1
+        if not forcar and (self._recebidos - 1) % self.a_cada:
+            self._descartado = (np.array(grid, copy=True), duracao_ms)
+            return
+        self._descartado = None
+        self._gravar(grid, self.duracao_ms if duracao_ms is None else duracao_ms)
+
+    # Índices de cor das células que aparecem na imagem
+    def _valores(self, grid) -> np.ndarray:
+        valores = np.asarray(grid)
+        if self._amostragem is not None:
+            valores = valores[self._amostragem]
+        if self.reciclar_de is not None:
+            inicio = self.reciclar_de
+            valores = np.where(
+                valores < self.num_cores,
+                valores,
+                inicio + (valores - inicio) % (self.num_cores - inicio),
+            )
+        return np.clip(valores, 0, self.num_cores - 1).astype(np.uint8)
+
+    def _imagem(self, valores: np.ndarray) -> Image.Image:
+        imagem = Image.fromarray(valores)
+        imagem.putpalette(self.paleta)
+        if self.escala > 1:
+            altura, largura = valores.shape
+            imagem = imagem.resize(
+                (largura * self.escala, altura * self.escala), Image.Resampling.NEAREST
+            )
+        return imagem
+
+    def _gravar(self, grid, duracao_ms: int):
+        valores = self._valores(grid)
+        if self._anterior is None:
+            imagem = self._imagem(valores)
+            if getheader is not None:
+                info = {"duration": duracao_ms}
+                if self.repetir:
+                    info["loop"] = 0
+                cabecalho, _ = getheader(imagem, info=info)
+                self._arquivo.write(b"".join(cabecalho))
+            self._pendente = (imagem, (0, 0), duracao_ms)
+        else:
+            linhas, colunas = np.nonzero(valores != self._anterior)
+            if not len(linhas):
+                imagem, posicao, duracao = self._pendente
+                self._pendente = (imagem, posicao, duracao + duracao_ms)
+                return
+            self._escrever_pendente()
+            if getdata is None:
+                self._pendente = (self._imagem(valores), (0, 0), duracao_ms)
+            else:
+                r0, c0 = int(linhas.min()), int(colunas.min())
+                r1, c1 = int(linhas.max()) + 1, int(colunas.max()) + 1
+                imagem = self._imagem(valores[r0:r1, c0:c1])
+                posicao = (c0 * self.escala, r0 * self.escala)
+                self._pendente = (imagem, posicao, duracao_ms)
+        self._anterior = valores
+        self.quadros += 1
+
+    def _escrever_pendente(self):
+        if self._pendente is None:
+            return
+        if getdata is None:
+            self._guardados.append(self._pendente)
+        else:
+            imagem, posicao, duracao = self._pendente
+            # disposal=1: o quadro seguinte é desenhado por cima deste
+            self._arquivo.write(
+                b"".join(getdata(imagem, offset=posicao, duration=duracao, disposal=1))
+            )
+        self._pendente = None
+
+    def fechar(self):
+        if self._arquivo.closed:
+            return
+        if self._descartado is not None:
+            grid, duracao_ms = self._descartado
+            self._descartado = None
+            self._gravar(grid, self.duracao_ms if duracao_ms is None else duracao_ms)
+        self._escrever_pendente()
+        if self._guardados:
+            self._salvar_guardados()
+        elif self._anterior is not None:
+            self._arquivo.write(b";")
+        self._arquivo.close()
+
+    def _salvar_guardados(self):
+        imagens = [imagem for imagem, _, _ in self._guardados]
+        info = {"duration": [duracao for _, _, duracao in self._guardados]}
+        if self.repetir:
+            info["loop"] = 0
+        imagens[0].save(
+            self._arquivo,
+            format="GIF",
+            save_all=True,
+            append_images=imagens[1:],
+            **info,
+        )
+        self._guardados = []
+
+
+# Últimos frames de cada camada do rastro. A camada de um frame é o custo da célula
+# expandida, vindo do próprio evento EXPANDIR (A*) ou do DESCOBRIR anterior da célula
+# (BFS do Flood Fill); sem custo conhecido, cada expansão é uma camada.
+def _fim_das_camadas(rastro: RastroBusca) -> List[int]:
+    custo_celula = {}
+    camadas = []
+    for tipo, celula, custo in zip(rastro.tipos, rastro.celulas, rastro.custos):
+        if tipo == DESCOBRIR:
+            custo_celula[celula] = custo
+        elif tipo == EXPANDIR:
+            if math.isnan(custo):
+                custo = custo_celula.get(celula, math.nan)
+            camadas.append(custo)
+    return [
+        f
+        for f in range(len(camadas))
+        if f == len(camadas) - 1 or not camadas[f + 1] == camadas[f]
+    ]
+
+
+# Exporta a animação de um rastro de busca (o mesmo de visualizar_busca) para um GIF.
+# por_camada grava um quadro por camada da BFS (ao fim de cada valor de custo) em vez
+# de um por expansão; a_cada descarta quadros intermediários. Os caminhos são pintados
+# no quadro final, que fica parado por DURACAO_FINAL_MS.
+def exportar_rastro(
+    rastro: RastroBusca,
+    base: np.ndarray,
+    caminho_saida: str,
+    caminhos: Optional[List[List[Tuple[int, int]]]] = None,
+    por_camada: bool = False,
+    a_cada: int = 1,
+    tamanho_max: int = TAMANHO_MAX,
+    duracao_ms: int = DURACAO_MS,
+) -> int:
+    base = np.asarray(base)
+    linhas, colunas = base.shape
+    reprodutor = ReprodutorRastro(rastro, base, 1)
+    frames = _fim_das_camadas(rastro) if por_camada else range(len(rastro))
+
+    with ExportadorGif(
+        caminho_saida, linhas, colunas, tamanho_max, duracao_ms, a_cada
+    ) as exportador:
+        exportador.adicionar(base, forcar=True)
+        for frame in frames:
+            reprodutor.avancar_para(frame)
+            exportador.adicionar(reprodutor.matriz)
+        final = reprodutor.matriz.copy()
+        for caminho in caminhos or []:
+            for r, c in caminho:
+                if final[r, c] not in (2, 3):
+                    final[r, c] = 5
+        exportador.adicionar(final, duracao_ms=DURACAO_FINAL_MS, forcar=True)
+    return exportador.quadros
@@ -1,5 +1,5 @@
 from collections import deque
-from typing import List, Tuple, Dict
+from typing import List, Tuple, Dict, Optional
 import time
 import matplotlib.pyplot as plt
 import matplotlib.animation as animation
@@ -7,22 +7,109 @@ from matplotlib.colors import ListedColormap
 import numpy as np
 import matplotlib.patches as mpatches
 import matplotlib.patheffects as path_effects
+from exportador_gif import exportar_rastro
+from rastro import RastroBusca, ReprodutorRastro
+from execucao import INTERVALO_PROGRESSO, BuscaCancelada
+from estatisticas import EstatisticasBusca
+from terreno import PESO_BASE
+
+MOTORES = ("padrao", "numpy")
+
+
+class ArvoreCaminhos:
+    # Árvore de caminhos mínimos compartilhada por todos os alvos de um BFS:
+    # predecessores e distâncias em vetores planos int32 (r*colunas+c, -1 = ausente)
+    def __init__(
+        self,
+        veio_de: np.ndarray,
+        dist: np.ndarray,
+        colunas: int,
+        alcancados: List[Tuple[int, int]],
+    ):
+        self.veio_de = veio_de
+        self.dist = dist
+        self.colunas = colunas
+        self.alcancados = alcancados
+
+    # Distância (em passos) desde S, ou -1 se a célula não foi alcançada
+    def distancia(self, alvo: Tuple[int, int]) -> int:
+        return int(self.dist[alvo[0] * self.colunas + alvo[1]])
+
+    def caminho(self, alvo: Tuple[int, int]) -> Optional[List[Tuple[int, int]]]:
+        return self.caminhos([alvo]).get(tuple(alvo))
+
+    # Reconstrói os caminhos de vários alvos numa única subida vetorizada pela árvore.
+    # Os alvos sobem juntos em ordem decrescente de profundidade, então os que ainda
+    # não chegaram a S formam um prefixo, e cada passo grava o predecessor direto na
+    # posição final do seu caminho num vetor plano com exatamente as células da saída
+    def caminhos(
+        self, alvos: List[Tuple[int, int]]
+    ) -> Dict[Tuple[int, int], List[Tuple[int, int]]]:
+        ids = np.array(
+            [a[0] * self.colunas + a[1] for a in alvos], dtype=np.int64
+        ).reshape(-1)
+        ids = ids[self.dist[ids] >= 0] if ids.size else ids
+        if not ids.size:
+            return {}
+        profundidades = self.dist[ids].astype(np.int64)
+        fins = np.cumsum(profundidades + 1)
+        ordem = np.argsort(-profundidades, kind="stable")
+        # ativos[p]: quantos alvos têm profundidade >= p
+        ativos = np.searchsorted(
+            -profundidades[ordem], -np.arange(profundidades.max() + 1), side="right"
+        ).tolist()
+        ultimas = fins[ordem] - 1
+        plano = np.empty(int(fins[-1]), dtype=np.int64)
+        atual = ids[ordem]
+        for passo, n in enumerate(ativos):
+            atual = atual[:n]
+            plano[ultimas[:n] - passo] = atual
+            atual = self.veio_de[atual]
+        linhas, colunas = np.divmod(plano, self.colunas)
+        rs, cs = linhas.tolist(), colunas.tolist()
+        caminhos: Dict[Tuple[int, int], List[Tuple[int, int]]] = {}
+        inicio = 0
+        for fim in fins.tolist():
+            caminhos[(rs[fim - 1], cs[fim - 1])] = list(
+                zip(rs[inicio:fim], cs[inicio:fim])
+            )
+            inicio = fim
+        return caminhos
 
 
 class FloodFill:
     # Inicialização da classe FloodFill
-    def __init__(self, labirinto: List[List[int]]):
+    # motor="numpy" usa a grade contígua (uint8) e vetores planos indexados por r*colunas+c
+    def __init__(self, labirinto: List[List[int]], motor: str = "padrao"):
+        if motor not in MOTORES:
+            raise ValueError(f"Motor desconhecido: {motor}")
         self.labirinto = labirinto
         self.linhas = len(labirinto)
-        self.colunas = len(labirinto[0]) if labirinto else 0
+        self.colunas = len(labirinto[0]) if self.linhas else 0
+        self.motor = motor
         self.inicio = None
         self.fins: List[Tuple[int, int]] = []
+        # métricas do último run, como em PathFinder (estatisticas_detalhadas conta as
+        # operações da fila, gancho_fase é chamado ao fim de cada fase)
+        self.estatisticas = EstatisticasBusca()
+        self.estatisticas_detalhadas = False
+        self.gancho_fase = None
+        # atalhos de estatisticas: tempo (ms) sem a visualização e células expandidas
+        # (retiradas da fila / da fronteira) no último run
         self.last_elapsed_ms: float = 0.0
+        self.last_expandidos: int = 0
+        # callback opcional (expandidos, tamanho da fila) -> bool, chamado a cada
+        # INTERVALO_PROGRESSO expansões (ou camada, no motor numpy); devolver False
+        # cancela a busca (BuscaCancelada)
+        self.progresso = None
+        self._grade = None
 
     # Encontra as posições de início (S) e fim (E) no labirinto
     def encontrar_posicoes(self) -> bool:
         self.inicio = None
         self.fins = []
+        if self.motor == "numpy" or isinstance(self.labirinto, np.ndarray):
+            return self._encontrar_posicoes_numpy()
         for i in range(self.linhas):
             for j in range(self.colunas):
                 if self.labirinto[i][j] == 2:
@@ -37,45 +124,83 @@ class FloodFill:
     ) -> Dict[Tuple[int, int], List[Tuple[int, int]]]:
         if not self.encontrar_posicoes():
             return {}
-        start_time = time.perf_counter()
+        estatisticas = self._iniciar_estatisticas()
+        try:
+            # a visualização precisa do histórico célula a célula do motor padrão; um
+            # array (ex.: memmap) usa o motor numpy, que consome a fronteira na mesma
+            # ordem
+            numpy = self.motor == "numpy" or isinstance(self.labirinto, np.ndarray)
+            if numpy and not visualizar:
+                return self._buscar_caminho_numpy(estatisticas, todos_encontrados)
+            return self._buscar_caminho_padrao(
+                estatisticas, visualizar, todos_encontrados, salvar_gif
+            )
+        finally:
+            self._encerrar_estatisticas(estatisticas)
+
+    def _iniciar_estatisticas(self) -> EstatisticasBusca:
+        self.estatisticas = EstatisticasBusca(
+            self.estatisticas_detalhadas, self.gancho_fase
+        )
+        return self.estatisticas
+
+    def _encerrar_estatisticas(self, estatisticas: EstatisticasBusca):
+        estatisticas.liberar()
+        self.last_elapsed_ms = estatisticas.total_ms
+        self.last_expandidos = estatisticas.expandidos
+
+    # BFS com tuplas (linha, coluna), dicionários e o rastro para a visualização
+    def _buscar_caminho_padrao(
+        self,
+        estatisticas: EstatisticasBusca,
+        visualizar: bool,
+        todos_encontrados: bool,
+        salvar_gif: bool,
+    ) -> Dict[Tuple[int, int], List[Tuple[int, int]]]:
         viz_time = 0.0
+        reconstrucao_time = 0.0
 
         fila = deque([self.inicio])
+        empilhar, desempilhar = estatisticas.operacoes_fila(fila)
+        detalhado = estatisticas.detalhado
         visitados = {self.inicio}
         veio_de = {self.inicio: None}
         dist = {self.inicio: 0}
 
         direcoes = [(-1, 0), (0, 1), (1, 0), (0, -1)]
-        historico_exploracao = [] if visualizar else None
+        rastro = RastroBusca(self.colunas) if visualizar else None
+        if visualizar:
+            rastro.descobrir(self.inicio, 0)
 
         fins_set = set(self.fins)
         caminhos_encontrados: Dict[Tuple[int, int], List[Tuple[int, int]]] = {}
+        progresso = self.progresso
+        expandidos = 0
+        completo = False
+        estatisticas.marcar("preparacao")
 
         while fila:
-            atual = fila.popleft()
+            atual = desempilhar()
+            expandidos += 1
+            if progresso is not None and expandidos % INTERVALO_PROGRESSO == 0:
+                self._reportar_progresso(expandidos, len(fila))
 
             if visualizar:
                 t_v0 = time.perf_counter()
-                custos_visitados = {pos: dist[pos] for pos in visitados}
-                historico_exploracao.append(
-                    (atual, set(visitados.copy()), custos_visitados)
-                )
+                rastro.expandir(atual)
                 viz_time += time.perf_counter() - t_v0
 
-            if atual in self.fins and atual not in caminhos_encontrados:
+            if atual in fins_set and atual not in caminhos_encontrados:
+                t_r0 = time.perf_counter()
                 caminho = self.reconstruir_caminho(veio_de, atual)
                 caminhos_encontrados[atual] = caminho
+                reconstrucao_time += time.perf_counter() - t_r0
                 if todos_encontrados and len(caminhos_encontrados) == len(fins_set):
-                    total = (time.perf_counter() - start_time) - viz_time
-                    self.last_elapsed_ms = total * 1000.0
-                    if visualizar:
-                        caminhos_lista = list(caminhos_encontrados.values())
-                        self.visualizar_busca(
-                            historico_exploracao, caminhos_lista, True
-                        )
-                    return caminhos_encontrados
+                    completo = True
+                    break
 
             x, y = atual
+            tamanho_fila = len(fila)
             for dx, dy in direcoes:
                 nx, ny = x + dx, y + dy
                 if (
@@ -84,23 +209,192 @@ class FloodFill:
                     and (nx, ny) not in visitados
                     and self.labirinto[nx][ny] != 1
                 ):
-                    fila.append((nx, ny))
+                    empilhar((nx, ny))
                     visitados.add((nx, ny))
                     veio_de[(nx, ny)] = atual
                     dist[(nx, ny)] = dist[atual] + 1
+            if detalhado:
+                estatisticas.gerados += sum(
+                    0 <= x + dx < self.linhas
+                    and 0 <= y + dy < self.colunas
+                    and self.labirinto[x + dx][y + dy] != 1
+                    for dx, dy in direcoes
+                )
+
+            if visualizar:
+                t_v0 = time.perf_counter()
+                # as células descobertas agora são as últimas da fila
+                for k in range(len(fila) - tamanho_fila, 0, -1):
+                    novo = fila[-k]
+                    rastro.descobrir(novo, dist[novo])
+                viz_time += time.perf_counter() - t_v0
 
-        total = (time.perf_counter() - start_time) - viz_time
-        self.last_elapsed_ms = total * 1000.0
-        if visualizar and historico_exploracao:
+        estatisticas.marcar("busca")
+        estatisticas.transferir(viz_time, "visualizacao")
+        estatisticas.transferir(reconstrucao_time, "reconstrucao")
+        estatisticas.concluir(expandidos)
+        if completo:
+            if visualizar:
+                caminhos_lista = list(caminhos_encontrados.values())
+                self.visualizar_busca(rastro, caminhos_lista, True)
+            return caminhos_encontrados
+        if visualizar and len(rastro):
             caminhos_lista = (
                 list(caminhos_encontrados.values()) if caminhos_encontrados else None
             )
             tem_solucao = bool(caminhos_encontrados)
-            self.visualizar_busca(
-                historico_exploracao, caminhos_lista, tem_solucao, salvar_gif
-            )
+            self.visualizar_busca(rastro, caminhos_lista, tem_solucao, salvar_gif)
         return caminhos_encontrados
 
+    # Converte o labirinto para a grade contígua e localiza S/E de forma vetorizada
+    def _encontrar_posicoes_numpy(self) -> bool:
+        self._grade = np.ascontiguousarray(self.labirinto, dtype=np.uint8)
+        plano = self._grade.reshape(-1)
+        inicios = np.flatnonzero(plano == 2)
+        if inicios.size:
+            # mantém a semântica do laço: o último S em ordem de linha prevalece
+            self.inicio = divmod(int(inicios[-1]), self.colunas)
+        self.fins = [divmod(int(k), self.colunas) for k in np.flatnonzero(plano == 3)]
+        return self.inicio is not None
+
+    # Caminhos até os fins usando o motor por camadas (motor="numpy")
+    def _buscar_caminho_numpy(
+        self, estatisticas: EstatisticasBusca, todos_encontrados: bool
+    ) -> Dict[Tuple[int, int], List[Tuple[int, int]]]:
+        arvore = self._bfs_camadas(self.fins, todos_encontrados, estatisticas)
+        caminhos_encontrados = arvore.caminhos(arvore.alcancados)
+        estatisticas.marcar("reconstrucao")
+        return caminhos_encontrados
+
+    # Busca de múltiplos alvos: um único BFS a partir de S que termina assim que o
+    # último alvo é fixado (no BFS a distância é final no momento da descoberta).
+    # Sem alvos explícitos, usa todas as células E. Retorna {alvo: caminho} na ordem
+    # em que os alvos foram alcançados.
+    def buscar_alvos(
+        self, alvos: Optional[List[Tuple[int, int]]] = None
+    ) -> Dict[Tuple[int, int], List[Tuple[int, int]]]:
+        arvore = self.arvore_caminhos(alvos)
+        if arvore is None:
+            return {}
+        return arvore.caminhos(arvore.alcancados)
+
+    # Como buscar_alvos, mas devolve a árvore de caminhos mínimos compartilhada
+    # (vetor plano de predecessores) em vez de materializar cada caminho
+    def arvore_caminhos(
+        self, alvos: Optional[List[Tuple[int, int]]] = None
+    ) -> Optional["ArvoreCaminhos"]:
+        if not self._encontrar_posicoes_numpy():
+            return None
+        estatisticas = self._iniciar_estatisticas()
+        try:
+            alvos = self.fins if alvos is None else alvos
+            return self._bfs_camadas(alvos, True, estatisticas)
+        finally:
+            self._encerrar_estatisticas(estatisticas)
+
+    # BFS por camadas sobre índices planos (r*colunas+c) com vetores int32 pré-alocados.
+    # Com parar=True a busca termina na camada em que o último alvo é alcançado; sem
+    # nenhum alvo livre ela nem começa. Um alvo fora do labirinto é um ValueError.
+    def _bfs_camadas(
+        self, alvos: List[Tuple[int, int]], parar: bool, estatisticas: EstatisticasBusca
+    ) -> "ArvoreCaminhos":
+        colunas = self.colunas
+        total = self.linhas * colunas
+        livre = self._grade.reshape(-1) != 1
+        dist = np.full(total, -1, dtype=np.int32)
+        veio_de = np.full(total, -1, dtype=np.int32)
+        eh_alvo = np.zeros(total, dtype=bool)
+        for ax, ay in alvos:
+            if not (0 <= ax < self.linhas and 0 <= ay < colunas):
+                raise ValueError(f"Alvo fora do labirinto: {(ax, ay)}")
+            eh_alvo[ax * colunas + ay] = True
+        # um alvo numa parede nunca é alcançado
+        eh_alvo &= livre
+        total_alvos = int(np.count_nonzero(eh_alvo))
+
+        origem = self.inicio[0] * colunas + self.inicio[1]
+        dist[origem] = 0
+        estatisticas.medir_fila()
+        if total_alvos == 0:
+            estatisticas.marcar("busca")
+            estatisticas.concluir(0)
+            return ArvoreCaminhos(veio_de, dist, colunas, [])
+        # a fronteira é mantida na mesma ordem em que a fila do motor padrão seria consumida
+        fronteira = np.array([origem], dtype=np.int64)
+        direcoes = [(-1, 0), (0, 1), (1, 0), (0, -1)]
+        encontrados: List[int] = []
+        nivel = 0
+        alcancados = 1
+        expandidos = 0
+        detalhado = estatisticas.detalhado
+        estatisticas.marcar("preparacao")
+
+        while fronteira.size:
+            if self.progresso is not None:
+                self._reportar_progresso(alcancados - fronteira.size, fronteira.size)
+            achados = fronteira[eh_alvo[fronteira]]
+            if achados.size:
+                encontrados.extend(achados.tolist())
+                if parar and len(encontrados) == total_alvos:
+                    break
+
+            expandidos += int(fronteira.size)
+            linha_f = fronteira // colunas
+            coluna_f = fronteira - linha_f * colunas
+            candidatos = []
+            chaves = []
+            gerados = 0
+            for k, (dx, dy) in enumerate(direcoes):
+                if dx == -1:
+                    valido = linha_f > 0
+                elif dx == 1:
+                    valido = linha_f < self.linhas - 1
+                elif dy == 1:
+                    valido = coluna_f < colunas - 1
+                else:
+                    valido = coluna_f > 0
+                pos_pai = np.flatnonzero(valido)
+                vizinhos = fronteira[pos_pai] + (dx * colunas + dy)
+                livres = livre[vizinhos]
+                if detalhado:
+                    gerados += int(np.count_nonzero(livres))
+                novos = livres & (dist[vizinhos] < 0)
+                candidatos.append(vizinhos[novos])
+                # chave = (posição do pai na fila, direção): reproduz a ordem de descoberta
+                chaves.append(pos_pai[novos] * 4 + k)
+
+            candidatos = np.concatenate(candidatos)
+            if not candidatos.size:
+                estatisticas.registrar_camada(int(fronteira.size), gerados, 0)
+                break
+            chaves = np.concatenate(chaves)
+            ordem = np.argsort(chaves)
+            candidatos = candidatos[ordem]
+            chaves = chaves[ordem]
+            # cada célula fica com o primeiro pai que a descobriu
+            _, primeiros = np.unique(candidatos, return_index=True)
+            primeiros.sort()
+
+            nivel += 1
+            estatisticas.registrar_camada(
+                int(fronteira.size), gerados, int(primeiros.size)
+            )
+            pais = fronteira[chaves[primeiros] // 4]
+            fronteira = candidatos[primeiros]
+            dist[fronteira] = nivel
+            veio_de[fronteira] = pais
+            alcancados += fronteira.size
+
+        estatisticas.marcar("busca")
+        estatisticas.concluir(expandidos)
+        alcancados = [divmod(alvo, colunas) for alvo in encontrados]
+        return ArvoreCaminhos(veio_de, dist, colunas, alcancados)
+
+    # Repassa o progresso ao callback; se ele devolver False a busca é interrompida
+    def _reportar_progresso(self, expandidos: int, fronteira: int):
+        if not self.progresso(expandidos, fronteira):
+            raise BuscaCancelada()
+
     # Reconstrói o caminho a partir do dicionário de predecessores
     def reconstruir_caminho(
         self, veio_de: dict, alvo: Tuple[int, int]
@@ -117,7 +411,8 @@ class FloodFill:
     def mostrar_labirinto_com_caminho(
         self, caminhos: Dict[Tuple[int, int], List[Tuple[int, int]]]
     ):
-        labirinto_visual = [linha[:] for linha in self.labirinto]
+        # list(linha) copia tanto listas quanto linhas de um ndarray
+        labirinto_visual = [list(linha) for linha in self.labirinto]
         for caminho in caminhos.values():
             for pos in caminho:
                 if labirinto_visual[pos[0]][pos[1]] == 0:
@@ -136,10 +431,8 @@ class FloodFill:
                     linha_str += str(celula) + " "
             print(linha_str)
 
-    # Cria animação visual da busca Flood Fill
-    def visualizar_busca(
-        self, historico_exploracao, caminho_final, tem_solucao, salvar_gif=False
-    ):
+    # Cria animação visual da busca Flood Fill a partir do rastro de eventos
+    def visualizar_busca(self, rastro, caminho_final, tem_solucao, salvar_gif=False):
 
         from matplotlib.widgets import Button
         import datetime
@@ -184,6 +477,8 @@ class FloodFill:
         )
 
         base = np.array(self.labirinto, dtype=float)
+        # o BFS ignora os pesos do terreno: essas células aparecem como livres
+        base[base > PESO_BASE] = 0
         img = ax.imshow(
             base, cmap=cmap, vmin=0, vmax=6, alpha=0.9, animated=True, zorder=1
         )
@@ -209,28 +504,22 @@ class FloodFill:
                 return f"{int(round(custo))}"
             return f"{custo:.1f}"
 
-        total_frames = len(historico_exploracao) + 62
+        total_frames = len(rastro) + 62
+        reprodutor = ReprodutorRastro(rastro, base, TOP_K)
 
         # Seleciona quais custos exibir na visualização
-        def selecionar_subconjunto_de_custos(
-            custos_dict, frame_idx, final_frame, caminhos_finais
-        ):
+        def selecionar_subconjunto_de_custos(final_frame, caminhos_finais):
+            custos_dict = reprodutor.custos
             if not custos_dict:
                 return {}
             if final_frame and tem_solucao and caminhos_finais:
-                protectect_positions = set()
+                subset = {}
                 for caminho in caminhos_finais:
-                    protectect_positions.update(caminho)
-                subset = {
-                    pos: custos_dict[pos]
-                    for pos in custos_dict.keys()
-                    if pos in protectect_positions
-                }
+                    for pos in caminho:
+                        if pos in custos_dict:
+                            subset[pos] = custos_dict[pos]
                 return subset
-            items = sorted(custos_dict.items(), key=lambda x: x[1], reverse=True)
-            if len(items) <= TOP_K:
-                return dict(items)
-            return dict(items[:TOP_K])
+            return reprodutor.maiores_custos()
 
         # Mantém cache de textos em MAX_CACHE removendo custos menores não protegidos
         def evict_remove_smallest_costs(protected_positions: set):
@@ -258,17 +547,12 @@ class FloodFill:
         # Atualiza cada frame da animação
         def atualizar_frame(frame):
             nonlocal path_lines
-            matriz_visual = base.copy()
-            if frame < len(historico_exploracao):
-                _, visitados, custos_visitados = historico_exploracao[frame]
-                final_frame = False
-            else:
-                _, visitados, custos_visitados = historico_exploracao[-1]
-                final_frame = True
-
-            for r, c in visitados:
-                if matriz_visual[r, c] == 0:
-                    matriz_visual[r, c] = 4
+            final_frame = frame >= len(rastro)
+            # os frames finais repetem o estado da última expansão
+            reprodutor.avancar_para(min(frame, len(rastro) - 1))
+            matriz_visual = reprodutor.matriz
+            if final_frame:
+                matriz_visual = matriz_visual.copy()
 
             if not final_frame:
                 for ln in path_lines:
@@ -304,9 +588,7 @@ class FloodFill:
 
             # Escolhe subconjunto de custos para exibir
 
-            subset_custos = selecionar_subconjunto_de_custos(
-                custos_visitados, frame, final_frame, caminho_final
-            )
+            subset_custos = selecionar_subconjunto_de_custos(final_frame, caminho_final)
 
             novos = set(subset_custos.keys())
             existentes = set(textos.keys())
@@ -389,19 +671,25 @@ class FloodFill:
         except Exception:
             plt.tight_layout()
 
+        # Exporta o rastro direto para GIF (sem renderizar a figura quadro a quadro)
+        def salvar_gif_rastro():
+            now = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+            filename = f"floodfill_animation_{now}.gif"
+            caminhos = caminho_final if tem_solucao and caminho_final else None
+            exportar_rastro(rastro, base, filename, caminhos)
+            return filename
+
+        if salvar_gif:
+            print(f"GIF salvo como '{salvar_gif_rastro()}'")
+
         # Adiciona botão Salvar GIF
         ax_button = fig.add_axes([0.83, 0.05, 0.13, 0.06])
         btn = Button(ax_button, "Salvar GIF", color="#FFD700", hovercolor="#FFEC8B")
 
         def on_save_gif(event):
-            if self.ultima_animacao is None:
-                print("Nenhuma animacao disponivel para salvar.")
-                return
-            print("Salvando animacao como GIF (isso pode demorar)...")
+            print("Salvando animacao como GIF...")
             try:
-                now = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-                filename = f"floodfill_animation_{now}.gif"
-                self.ultima_animacao.save(filename, writer="pillow", fps=12, dpi=80)
+                filename = salvar_gif_rastro()
                 print(f"GIF salvo como '{filename}'")
                 # Aviso visual no Matplotlib
                 ax.text(
@@ -0,0 +1,305 @@
+import os
+import sys
+from typing import Optional, Tuple
+
+import numpy as np
+
+# A rotulação por trechos vem de Trabalho 2/floodfill2.py (acrescentado ao fim do
+# caminho de busca, para não esconder os módulos deste diretório)
+sys.path.append(
+    os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Trabalho 2"
+    )
+)
+from floodfill2 import unir_trechos  # noqa: E402
+
+# Todos os geradores devolvem uma matriz uint8 (0 livre, 1 parede), montada em poucas
+# operações vetorizadas, e aceitam uma semente (int, None ou np.random.Generator)
+# para que o mesmo mapa possa ser reproduzido.
+
+
+# Campo aberto, sem nenhuma parede
+def gerar_aberto(linhas: int, colunas: int, semente=None):
+    return np.zeros((linhas, colunas), dtype=np.uint8)
+
+
+def gerar_densidade(linhas: int, colunas: int, densidade: float = 0.3, semente=None):
+    rng = np.random.default_rng(semente)
+    sorteio = rng.random((linhas, colunas), dtype=np.float32)
+    return (sorteio < densidade).astype(np.uint8)
+
+
+# Cavernas por autômato celular: parte de um sorteio com a densidade dada e, a cada
+# iteração, uma célula vira parede se houver 5 ou mais paredes na sua vizinhança 3x3
+# (contando ela mesma; fora do mapa conta como parede)
+def gerar_cavernas(
+    linhas: int,
+    colunas: int,
+    densidade: float = 0.45,
+    iteracoes: int = 4,
+    semente=None,
+):
+    grid = gerar_densidade(linhas, colunas, densidade, semente)
+    soma = np.empty((linhas + 2, colunas + 2), dtype=np.uint8)
+    for _ in range(iteracoes):
+        soma.fill(1)
+        soma[1:-1, 1:-1] = grid
+        # soma da janela 3x3 separada em linhas e colunas
+        linhas_3 = soma[:-2] + soma[1:-1] + soma[2:]
+        janela = linhas_3[:, :-2] + linhas_3[:, 1:-1] + linhas_3[:, 2:]
+        grid = (janela >= 5).astype(np.uint8)
+    return grid
+
+
+# Labirinto perfeito (um único caminho entre duas células quaisquer) pelo algoritmo
+# sidewinder. As células ficam nos índices ímpares e as paredes entre elas nos pares.
+# Em cada linha, trechos consecutivos de células são unidos para leste e cada trecho
+# abre uma passagem para o norte numa célula sorteada; tudo de uma vez para o mapa.
+def gerar_labirinto(linhas: int, colunas: int, semente=None):
+    rng = np.random.default_rng(semente)
+    celulas_i = (linhas - 1) // 2
+    celulas_j = (colunas - 1) // 2
+    grid = np.ones((linhas, colunas), dtype=np.uint8)
+    grid[1 : 2 * celulas_i : 2, 1 : 2 * celulas_j : 2] = 0
+    _, _, ni, nj = _arestas_sidewinder(celulas_i, celulas_j, rng)
+    grid[ni + 1, nj + 1] = 0
+    return grid
+
+
+# Arestas de uma árvore geradora (sidewinder) sobre uma grade de celulas_i x celulas_j
+# nós. Devolve vetores (ci, cj, ni, nj): a aresta sai do nó (ci, cj) e (ni, nj) é a
+# passagem na grade dobrada (2 * nó + direção), ou seja, a parede entre os dois nós.
+def _arestas_sidewinder(celulas_i: int, celulas_j: int, rng):
+    vazio = np.zeros(0, dtype=np.intp)
+    if celulas_i <= 0 or celulas_j <= 0:
+        return vazio, vazio, vazio, vazio
+    # fecha[i, j]: o trecho da linha i termina na célula j (e não segue para leste)
+    fecha = rng.random((celulas_i, celulas_j), dtype=np.float32) < 0.5
+    fecha[:, -1] = True
+    # a primeira linha não tem norte: é um único corredor
+    fecha[0, :-1] = False
+    leste_i, leste_j = np.nonzero(~fecha)
+
+    plano = fecha[1:].reshape(-1)
+    fins = np.flatnonzero(plano)
+    inicios = np.concatenate(([0], fins[:-1] + 1))
+    sorteio = rng.random(fins.size)
+    escolhidos = inicios + (sorteio * (fins - inicios + 1)).astype(np.intp)
+    norte_i, norte_j = np.divmod(escolhidos, celulas_j)
+    norte_i += 1
+
+    ci = np.concatenate((leste_i, norte_i))
+    cj = np.concatenate((leste_j, norte_j))
+    # passagem na grade dobrada: leste (2i, 2j + 1), norte (2i - 1, 2j)
+    ni = np.concatenate((leste_i, norte_i - 1)) + ci
+    nj = np.concatenate((leste_j + 1, norte_j)) + cj
+    return ci, cj, ni, nj
+
+
+# Labirinto por divisão recursiva: cada câmara é cortada por uma parede (horizontal
+# se for mais alta que larga, vertical se mais larga, sorteado se quadrada) com uma
+# única passagem. A recursão é feita por nível: todas as câmaras de um nível são
+# divididas juntas com operações sobre vetores de câmaras.
+def gerar_divisao_recursiva(linhas: int, colunas: int, semente=None):
+    rng = np.random.default_rng(semente)
+    celulas_i = (linhas - 1) // 2
+    celulas_j = (colunas - 1) // 2
+    grid = np.ones((linhas, colunas), dtype=np.uint8)
+    if celulas_i <= 0 or celulas_j <= 0:
+        return grid
+    grid[1 : 2 * celulas_i, 1 : 2 * celulas_j] = 0
+    # câmaras em coordenadas de célula: [i0, i1) x [j0, j1)
+    i0 = np.array([0])
+    i1 = np.array([celulas_i])
+    j0 = np.array([0])
+    j1 = np.array([celulas_j])
+    while i0.size:
+        altura = i1 - i0
+        largura = j1 - j0
+        horizontal = altura > largura
+        empate = altura == largura
+        horizontal[empate] = rng.random(int(empate.sum())) < 0.5
+        horizontal &= altura > 1
+        horizontal |= largura == 1
+
+        # horizontal: parede entre as linhas de célula k-1 e k, passagem na coluna p
+        h = np.flatnonzero(horizontal)
+        k = i0[h] + 1 + (rng.random(h.size) * (altura[h] - 1)).astype(np.intp)
+        p = j0[h] + (rng.random(h.size) * largura[h]).astype(np.intp)
+        _tracar(grid, 2 * k, 2 * j0[h] + 1, 2 * j1[h] - 1, horizontal=True)
+        grid[2 * k, 2 * p + 1] = 0
+
+        v = np.flatnonzero(~horizontal)
+        kv = j0[v] + 1 + (rng.random(v.size) * (largura[v] - 1)).astype(np.intp)
+        pv = i0[v] + (rng.random(v.size) * altura[v]).astype(np.intp)
+        _tracar(grid, 2 * kv, 2 * i0[v] + 1, 2 * i1[v] - 1, horizontal=False)
+        grid[2 * pv + 1, 2 * kv] = 0
+
+        i0 = np.concatenate((i0[h], k, i0[v], i0[v]))
+        i1 = np.concatenate((k, i1[h], i1[v], i1[v]))
+        j0 = np.concatenate((j0[h], j0[h], j0[v], kv))
+        j1 = np.concatenate((j1[h], j1[h], kv, j1[v]))
+        # numa câmara de uma linha (ou coluna) de células toda parede nova teria só a
+        # própria passagem: ela já é um corredor pronto
+        divisivel = (i1 - i0 > 1) & (j1 - j0 > 1)
+        i0, i1, j0, j1 = i0[divisivel], i1[divisivel], j0[divisivel], j1[divisivel]
+    return grid
+
+
+# Pinta segmentos retos de parede/corredor: para cada k, a linha (horizontal) ou
+# coluna fixa fixo[k], do índice inicio[k] ao fim[k] inclusive. Os índices planos de
+# todos os segmentos saem de uma única soma acumulada de incrementos.
+def _tracar(grid, fixo, inicio, fim, horizontal: bool, valor: int = 1):
+    if not len(fixo):
+        return
+    colunas = grid.shape[1]
+    baixo = np.minimum(inicio, fim)
+    comprimentos = np.abs(fim - inicio) + 1
+    if horizontal:
+        base, passo = fixo * colunas + baixo, 1
+    else:
+        base, passo = baixo * colunas + fixo, colunas
+    posicoes = np.cumsum(comprimentos) - comprimentos
+    incrementos = np.full(int(comprimentos.sum()), passo, dtype=np.int64)
+    incrementos[posicoes[0]] = base[0]
+    # salto do fim de um segmento ao começo do seguinte
+    incrementos[posicoes[1:]] = base[1:] - base[:-1] - (comprimentos[:-1] - 1) * passo
+    grid.reshape(-1)[np.cumsum(incrementos)] = valor
+
+
+# Salas e corredores: o mapa é dividido em blocos de lado x lado, cada bloco recebe uma
+# sala de tamanho sorteado e as salas vizinhas escolhidas por uma árvore geradora
+# (sidewinder sobre os blocos) são ligadas por corredores em L entre os centros
+def gerar_salas(linhas: int, colunas: int, lado: int = 12, semente=None):
+    rng = np.random.default_rng(semente)
+    grid = np.ones((linhas, colunas), dtype=np.uint8)
+    blocos_i = max(1, linhas // lado)
+    blocos_j = max(1, colunas // lado)
+    lado_i = min(lado, linhas)
+    lado_j = min(lado, colunas)
+    minimo_i = max(1, lado_i // 3)
+    minimo_j = max(1, lado_j // 3)
+    altura = rng.integers(minimo_i, max(minimo_i, lado_i - 2) + 1, (blocos_i, blocos_j))
+    largura = rng.integers(
+        minimo_j, max(minimo_j, lado_j - 2) + 1, (blocos_i, blocos_j)
+    )
+    # posição da sala relativa ao bloco, com ao menos uma parede de margem
+    topo = 1 + (rng.random((blocos_i, blocos_j)) * (lado_i - 1 - altura)).astype(int)
+    esquerda = 1 + (rng.random((blocos_i, blocos_j)) * (lado_j - 1 - largura)).astype(
+        int
+    )
+
+    # máscara das salas na área dos blocos vista como (bloco_i, linha, bloco_j, coluna):
+    # as condições de linha e de coluna são combinadas por broadcasting
+    linha = np.arange(lado_i)[None, :, None, None]
+    coluna = np.arange(lado_j)[None, None, None, :]
+    t = topo[:, None, :, None]
+    e = esquerda[:, None, :, None]
+    dentro = (linha >= t) & (linha < t + altura[:, None, :, None])
+    dentro = dentro & (coluna >= e) & (coluna < e + largura[:, None, :, None])
+    area_i = blocos_i * lado_i
+    area_j = blocos_j * lado_j
+    grid[:area_i, :area_j][dentro.reshape(area_i, area_j)] = 0
+
+    topo += np.arange(blocos_i)[:, None] * lado_i
+    esquerda += np.arange(blocos_j)[None, :] * lado_j
+    centro_i = topo + altura // 2
+    centro_j = esquerda + largura // 2
+    ai, aj, ni, nj = _arestas_sidewinder(blocos_i, blocos_j, rng)
+    # (ni, nj) está na grade dobrada; o bloco vizinho é (ni - ai, nj - aj)
+    bi, bj = ni - ai, nj - aj
+    y_a, x_a = centro_i[ai, aj], centro_j[ai, aj]
+    y_b, x_b = centro_i[bi, bj], centro_j[bi, bj]
+    _tracar(grid, y_a, x_a, x_b, horizontal=True, valor=0)
+    _tracar(grid, x_b, y_a, y_b, horizontal=False, valor=0)
+    return grid
+
+
+GERADORES = {
+    "aberto": gerar_aberto,
+    "densidade": gerar_densidade,
+    "cavernas": gerar_cavernas,
+    "labirinto": gerar_labirinto,
+    "divisao": gerar_divisao_recursiva,
+    "salas": gerar_salas,
+}
+# Geradores cujas células livres formam sempre uma única região
+CONEXOS = ("aberto", "labirinto", "divisao", "salas")
+
+
+# Gera um mapa do tipo pedido; com extremos=True também posiciona S (2) e E (3) de
+# forma que E seja alcançável a partir de S
+def gerar(
+    tipo: str,
+    linhas: int,
+    colunas: int,
+    semente=None,
+    extremos: bool = False,
+    **opcoes,
+) -> np.ndarray:
+    if tipo not in GERADORES:
+        raise ValueError(f"Gerador desconhecido: {tipo}")
+    grid = GERADORES[tipo](linhas, colunas, semente=semente, **opcoes)
+    if extremos:
+        posicionar_extremos(grid, conexo=tipo in CONEXOS)
+    return grid
+
+
+# Coloca S na célula livre mais próxima do canto superior esquerdo e E na mais próxima
+# do inferior direito, ambas na maior região livre (com conexo=True o mapa já é uma
+# região só e a rotulação é dispensada). Devolve (inicio, fim) ou None se não houver
+# duas células livres ligadas. Tudo é feito por trechos horizontais de células livres:
+# S é o início de um trecho e E o fim de outro, e só as linhas que ainda podem vencer
+# o primeiro início e o último fim da região são examinadas.
+def posicionar_extremos(
+    grid: np.ndarray, conexo: bool = False
+) -> Optional[Tuple[Tuple[int, int], Tuple[int, int]]]:
+    linhas, colunas = grid.shape
+    livre = grid == 0
+    inicio_trecho = livre.copy()
+    inicio_trecho[:, 1:] &= ~livre[:, :-1]
+    fim_trecho = livre.copy()
+    fim_trecho[:, :-1] &= ~livre[:, 1:]
+    inicios = np.flatnonzero(inicio_trecho)
+    fins = np.flatnonzero(fim_trecho)
+    if conexo or not inicios.size:
+        regiao = None
+        primeiro, ultimo = 0, inicios.size - 1
+        tamanho = int(np.count_nonzero(livre))
+    else:
+        _, pai = unir_trechos(livre)
+        # a raiz é o primeiro trecho da componente: argmax fica com a primeira das
+        # maiores na ordem linha a linha
+        tamanhos = np.bincount(pai, weights=fins - inicios + 1)
+        primeiro = int(np.argmax(tamanhos))
+        regiao = pai == primeiro
+        ultimo = regiao.size - 1 - int(np.argmax(regiao[::-1]))
+        tamanho = int(tamanhos[primeiro])
+    if tamanho < 2:
+        return None
+
+    # nenhuma célula abaixo da linha i + j do primeiro início tem i + j menor
+    i, j = divmod(int(inicios[primeiro]), colunas)
+    ate = int(np.searchsorted(inicios, (i + j + 1) * colunas))
+    candidatos = inicios[primeiro:ate]
+    if regiao is not None:
+        candidatos = candidatos[regiao[primeiro:ate]]
+    inicio = candidatos[np.argmin(_diagonal(candidatos, colunas))]
+
+    # e nenhuma acima da linha i + j - (colunas - 1) do último fim tem i + j maior
+    i, j = divmod(int(fins[ultimo]), colunas)
+    de = int(np.searchsorted(fins, (i + j - colunas + 1) * colunas))
+    candidatos = fins[de : ultimo + 1]
+    if regiao is not None:
+        candidatos = candidatos[regiao[de : ultimo + 1]]
+    fim = candidatos[np.argmax(_diagonal(candidatos, colunas))]
+
+    grid.reshape(-1)[inicio] = 2
+    grid.reshape(-1)[fim] = 3
+    return divmod(int(inicio), colunas), divmod(int(fim), colunas)
+
+
+# i + j das células dadas por índice linear
+def _diagonal(celulas: np.ndarray, colunas: int) -> np.ndarray:
+    i, j = np.divmod(celulas, colunas)
+    return i + j
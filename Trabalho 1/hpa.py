@@ -0,0 +1,505 @@
+import heapq
+import math
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from estatisticas import EstatisticasBusca
+from execucao import INTERVALO_PROGRESSO, BuscaCancelada
+
+# Lado (em células) de cada cluster da abstração
+TAMANHO_CLUSTER = 16
+# Passagens entre clusters com pelo menos este comprimento ganham duas transições, uma
+# em cada ponta; as mais curtas ganham uma só, no meio (o limiar de Botea et al.)
+LIMIAR_PASSAGEM = 6
+
+
+# Células escolhidas como transição nas bordas verticais entre clusters (entre as
+# colunas j - 1 e j, j múltiplo de tamanho). Uma passagem é uma sequência de linhas do
+# mesmo cluster em que as duas células são livres; nela ficam uma ou duas transições
+# (ver LIMIAR_PASSAGEM) ou, com espacamento, uma a cada espacamento linhas a partir do
+# início, mais a última linha. Retorna (linhas, colunas) das células do lado esquerdo.
+# Para as bordas horizontais, basta passar livre.T.
+def _transicoes(livre: np.ndarray, tamanho: int, espacamento: Optional[int]):
+    linhas, colunas = livre.shape
+    js = np.arange(tamanho, colunas, tamanho)
+    if not js.size or not linhas:
+        vazio = np.zeros(0, dtype=np.int64)
+        return vazio, vazio
+    # uma linha de `ambos` por borda
+    ambos = (livre[:, js - 1] & livre[:, js]).T
+    r = np.arange(linhas)
+    continua_antes = np.zeros_like(ambos)
+    continua_antes[:, 1:] = ambos[:, :-1]
+    continua_antes[:, r % tamanho == 0] = False
+    continua_depois = np.zeros_like(ambos)
+    continua_depois[:, :-1] = ambos[:, 1:]
+    continua_depois[:, r % tamanho == tamanho - 1] = False
+    inicio = np.maximum.accumulate(np.where(ambos & ~continua_antes, r, 0), axis=1)
+    if espacamento is None:
+        # fim de cada passagem, acumulado da direita para a esquerda
+        fim = np.minimum.accumulate(
+            np.where(ambos & ~continua_depois, r, linhas)[:, ::-1], axis=1
+        )[:, ::-1]
+        comprimento = fim - inicio + 1
+        escolhido = ambos & np.where(
+            comprimento < LIMIAR_PASSAGEM,
+            r == inicio + (comprimento - 1) // 2,
+            (r == inicio) | (r == fim),
+        )
+    else:
+        escolhido = ambos & (((r - inicio) % espacamento == 0) | ~continua_depois)
+    borda, linha = np.nonzero(escolhido)
+    return linha, js[borda] - 1
+
+
+class PlanejadorHPA:
+    # Busca hierárquica (HPA*, Botea, Müller & Schaeffer). O grid é dividido em clusters
+    # de tamanho_cluster x tamanho_cluster; cada passagem livre entre clusters vizinhos
+    # vira um ou dois pares de transições (nós abstratos), e dentro de cada cluster a
+    # distância entre todos os seus nós é pré-calculada (busca restrita ao cluster) e
+    # guardada como lista de arestas (nó, distância). Uma consulta liga S e E aos nós
+    # dos seus clusters, roda A* no grafo abstrato e refina cada trecho com uma busca
+    # local dentro de um único cluster (os trechos entre dois nós ficam guardados).
+    #
+    # A abstração é calculada na primeira consulta e guardada; notificar_alteracao
+    # marca o cluster da célula editada e, na consulta seguinte, só ele e os vizinhos
+    # cujas transições mudaram são recalculados.
+    #
+    # Subotimalidade: cada vez que o caminho ótimo atravessa uma borda, ele pode ser
+    # desviado ao longo da passagem até uma das transições dela (ida e volta). Sem
+    # espacamento (o padrão), numa passagem de comprimento L a transição do meio (L <
+    # LIMIAR_PASSAGEM) fica a no máximo L // 2 linhas e a ponta mais próxima (L >=
+    # LIMIAR_PASSAGEM) a no máximo (L - 1) // 2: o desvio é no máximo L por travessia,
+    # e L <= tamanho_cluster. Com espacamento=k as transições ficam a cada k linhas da
+    # passagem e o desvio é no máximo 2 * (k // 2) por travessia; com espacamento=1 o
+    # caminho é ótimo, com um grafo abstrato bem maior. Com diagonal soma-se 1 por
+    # travessia diagonal, que passa a ortogonal por uma das duas células da quina; se
+    # as duas forem paredes (a diagonal corta a quina) não há passagem e nem limite.
+    # refinar=True refaz a busca no corredor de clusters do caminho abstrato (mais os
+    # vizinhos), o que nunca piora o custo. Se o grafo abstrato não ligar S a E (só
+    # possível com diagonais que cortam a quina entre dois clusters), a consulta cai
+    # para uma busca no grid inteiro.
+    def __init__(
+        self,
+        labirinto,
+        diagonal: bool = False,
+        tamanho_cluster: int = TAMANHO_CLUSTER,
+        espacamento: Optional[int] = None,
+    ):
+        self.labirinto = labirinto
+        self.linhas = len(labirinto)
+        self.colunas = len(labirinto[0]) if self.linhas else 0
+        self.diagonal = diagonal
+        self.tamanho_cluster = max(2, tamanho_cluster)
+        self.espacamento = None if espacamento is None else max(1, espacamento)
+        self.largura = self.colunas + 2
+        livre = np.zeros((self.linhas + 2, self.largura), dtype=bool)
+        if self.linhas and self.colunas:
+            livre[1:-1, 1:-1] = np.asarray(labirinto) != 1
+        self._livre = livre
+        self.livre = bytearray(livre.tobytes())
+
+        tamanho = self.tamanho_cluster
+        self.clusters_i = -(-self.linhas // tamanho)
+        self.clusters_j = -(-self.colunas // tamanho)
+        cluster = np.full(livre.shape, -1, dtype=np.int32)
+        cluster[1:-1, 1:-1] = (np.arange(self.linhas)[:, None] // tamanho) * (
+            self.clusters_j
+        ) + np.arange(self.colunas)[None, :] // tamanho
+        self._cluster = cluster.reshape(-1)
+        self.cluster = memoryview(self._cluster).cast("B").cast("i")
+
+        direcoes = [(0, 1), (1, 0), (0, -1), (-1, 0)]
+        if diagonal:
+            direcoes.extend([(1, 1), (1, -1), (-1, 1), (-1, -1)])
+        raiz2 = math.sqrt(2)
+        self.vizinhanca = [
+            (dx * self.largura + dy, raiz2 if abs(dx) + abs(dy) == 2 else 1)
+            for dx, dy in direcoes
+        ]
+        self.ortogonais = (1, self.largura, -1, -self.largura)
+
+        # nós de cada cluster (índices planos com borda, em ordem crescente), a matriz
+        # de distâncias entre eles e a posição de cada nó na matriz (-1 se não é nó)
+        self.nos: Optional[List[np.ndarray]] = None
+        self.distancias: List[Optional[np.ndarray]] = []
+        self._posicao = np.full(livre.size, -1, dtype=np.int32)
+        self.posicao = memoryview(self._posicao).cast("B").cast("i")
+        self._sujos: Set[int] = set(range(self.clusters_i * self.clusters_j))
+        # arestas (nó, custo) de cada nó abstrato: as internas, com a distância
+        # pré-calculada, e as que cruzam a borda até o nó vizinho, com custo 1
+        self._grafo: Dict[int, List[Tuple[int, float]]] = {}
+        # trechos já refinados entre dois nós de um mesmo cluster, por cluster
+        self._trechos: Dict[int, Dict[Tuple[int, int], List[int]]] = {}
+
+        # callback opcional (expandidos, tamanho da fila) -> bool, chamado a cada
+        # INTERVALO_PROGRESSO expansões; devolver False cancela a busca (BuscaCancelada)
+        self.progresso = None
+        self.last_elapsed_ms: float = 0.0
+        # tempo (ms) gasto recalculando a abstração na última consulta
+        self.last_construcao_ms: float = 0.0
+        # nós abstratos mais células expandidas nas buscas locais da última consulta
+        self.last_expandidos: int = 0
+        self.ultimo_custo: float = math.inf
+        # tempos por fase da última consulta (a reconstrução da abstração é a
+        # preparação)
+        self.estatisticas = EstatisticasBusca()
+
+    @property
+    def total_nos(self) -> int:
+        return sum(len(nos) for nos in self.nos) if self.nos is not None else 0
+
+    # Avisa que a célula (x, y) foi editada; o cluster dela é recalculado na próxima
+    # consulta (junto com os vizinhos, se as transições da borda mudarem)
+    def notificar_alteracao(self, x: int, y: int):
+        u = (x + 1) * self.largura + y + 1
+        livre = self.labirinto[x][y] != 1
+        if self.livre[u] == livre:
+            return
+        self.livre[u] = livre
+        self._livre.reshape(-1)[u] = livre
+        self._sujos.add(self.cluster[u])
+
+    def _clusters_vizinhos(self, c: int) -> List[int]:
+        ci, cj = divmod(c, self.clusters_j)
+        return [
+            ni * self.clusters_j + nj
+            for ni, nj in ((ci - 1, cj), (ci + 1, cj), (ci, cj - 1), (ci, cj + 1))
+            if 0 <= ni < self.clusters_i and 0 <= nj < self.clusters_j
+        ]
+
+    # Calcula (ou atualiza) a abstração; chamado automaticamente por caminho(). O
+    # estado só muda depois de calculadas as distâncias: uma construção cancelada pelo
+    # callback de progresso é refeita por inteiro na próxima consulta.
+    def construir(self):
+        if not self._sujos:
+            return
+        start_time = time.perf_counter()
+        nos = self._calcular_nos()
+        if self.nos is None:
+            afetados = list(range(len(nos)))
+        else:
+            candidatos = set(self._sujos)
+            for c in self._sujos:
+                candidatos.update(self._clusters_vizinhos(c))
+            afetados = sorted(
+                c
+                for c in candidatos
+                if c in self._sujos or not np.array_equal(nos[c], self.nos[c])
+            )
+        distancias = self._calcular_distancias(nos, afetados)
+        if self.nos is None:
+            self.distancias = [None] * len(nos)
+        else:
+            for c in afetados:
+                self._posicao[self.nos[c]] = -1
+                for u in self.nos[c].tolist():
+                    del self._grafo[u]
+                self._trechos.pop(c, None)
+        for c, matriz in zip(afetados, distancias):
+            self._posicao[nos[c]] = np.arange(len(nos[c]), dtype=np.int32)
+            self.distancias[c] = matriz
+        self.nos = nos
+        self._montar_grafo(afetados)
+        self._sujos.clear()
+        self.last_construcao_ms = (time.perf_counter() - start_time) * 1000.0
+
+    # Transições de todas as bordas, agrupadas por cluster
+    def _calcular_nos(self) -> List[np.ndarray]:
+        livre = self._livre[1:-1, 1:-1]
+        largura = self.largura
+        linhas, colunas = _transicoes(livre, self.tamanho_cluster, self.espacamento)
+        esquerda = (linhas + 1) * largura + colunas + 1
+        colunas, linhas = _transicoes(livre.T, self.tamanho_cluster, self.espacamento)
+        acima = (linhas + 1) * largura + colunas + 1
+        nos = np.unique(
+            np.concatenate([esquerda, esquerda + 1, acima, acima + largura])
+        )
+        cluster = self._cluster[nos]
+        ordem = np.argsort(cluster, kind="stable")
+        contagens = np.bincount(cluster, minlength=self.clusters_i * self.clusters_j)
+        return np.split(nos[ordem], np.cumsum(contagens)[:-1])
+
+    # Distâncias entre os nós de cada cluster afetado. A rodada k propaga, ao mesmo
+    # tempo em todos os clusters, as distâncias a partir do k-ésimo nó de cada um
+    # (vetorizado sobre a fronteira, sem passar para fora do cluster). O progresso
+    # conta as origens já propagadas e as que faltam.
+    def _calcular_distancias(
+        self, nos: List[np.ndarray], afetados: List[int]
+    ) -> List[np.ndarray]:
+        quantidades = np.array([len(nos[c]) for c in afetados], dtype=np.int64)
+        blocos = np.zeros(len(afetados) + 1, dtype=np.int64)
+        np.cumsum(quantidades * quantidades, out=blocos[1:])
+        tabela = np.full(int(blocos[-1]), math.inf)
+        todos = np.concatenate([nos[c] for c in afetados] + [[]]).astype(np.int64)
+        dono = np.repeat(np.arange(len(afetados)), quantidades)
+        coluna = np.arange(len(todos)) - np.repeat(
+            np.cumsum(quantidades) - quantidades, quantidades
+        )
+        propagadas = 0
+        for k in range(int(quantidades.max(initial=0))):
+            if self.progresso is not None:
+                self._reportar_progresso(propagadas, len(todos) - propagadas)
+            origens = todos[coluna == k]
+            dist = self._propagar(origens)
+            propagadas += len(origens)
+            # linha k da matriz de cada cluster com pelo menos k + 1 nós
+            selecao = (quantidades > k)[dono]
+            posicoes = (
+                blocos[dono[selecao]] + k * quantidades[dono[selecao]] + coluna[selecao]
+            )
+            tabela[posicoes] = dist[todos[selecao]]
+        return [
+            tabela[blocos[i] : blocos[i + 1]].reshape(int(n), int(n))
+            for i, n in enumerate(quantidades)
+        ]
+
+    # Distâncias (dentro do próprio cluster) de cada origem até as células do cluster.
+    # Como todo passo custa pelo menos 1, as células com distância em [b, b + 1) não
+    # melhoram umas às outras: cada faixa b é expandida de uma vez (Dijkstra por
+    # faixas, vetorizado) e cada célula é expandida uma única vez.
+    def _propagar(self, origens: np.ndarray) -> np.ndarray:
+        livre = self._livre.reshape(-1)
+        cluster = self._cluster
+        deslocamentos = np.array([d for d, _ in self.vizinhanca], dtype=np.int64)
+        custos = np.array([c for _, c in self.vizinhanca])
+        dist = np.full(livre.size, math.inf)
+        dist[origens] = 0.0
+        # marca[v] = posição de v na lista; remove repetições sem ordenar
+        marca = np.empty(livre.size, dtype=np.int64)
+        pendentes = origens
+        limite = 1.0
+        while pendentes.size:
+            faixa = dist[pendentes] < limite
+            fronteira, pendentes = pendentes[faixa], pendentes[~faixa]
+            if fronteira.size:
+                vizinhos = fronteira[:, None] + deslocamentos
+                validos = livre[vizinhos] & (
+                    cluster[vizinhos] == cluster[fronteira][:, None]
+                )
+                novo = (dist[fronteira][:, None] + custos)[validos]
+                vizinhos = vizinhos[validos]
+                melhora = novo < dist[vizinhos]
+                vizinhos = vizinhos[melhora]
+                np.minimum.at(dist, vizinhos, novo[melhora])
+                pendentes = np.concatenate([pendentes, vizinhos])
+                posicoes = np.arange(pendentes.size)
+                marca[pendentes] = posicoes
+                pendentes = pendentes[marca[pendentes] == posicoes]
+            limite += 1.0
+        return dist
+
+    # Listas de arestas dos nós dos clusters afetados e dos clusters vizinhos, cujas
+    # arestas de borda podem apontar para nós que mudaram
+    def _montar_grafo(self, afetados: List[int]):
+        clusters = set(afetados)
+        if len(clusters) < len(self.nos):
+            for c in afetados:
+                clusters.update(self._clusters_vizinhos(c))
+        posicao, cluster = self.posicao, self.cluster
+        for c in clusters:
+            nos = self.nos[c].tolist()
+            for u, linha in zip(nos, self.distancias[c].tolist()):
+                arestas = [
+                    (v, d) for v, d in zip(nos, linha) if d < math.inf and v != u
+                ]
+                for deslocamento in self.ortogonais:
+                    v = u + deslocamento
+                    if posicao[v] >= 0 and cluster[v] != c:
+                        arestas.append((v, 1.0))
+                self._grafo[u] = arestas
+
+    # Distância octil (ou Manhattan, sem diagonal): admissível e mais justa que a
+    # euclidiana no grafo abstrato, cujas arestas seguem o grid
+    def _heuristica(self, u: int, alvo: int) -> float:
+        dx, dy = divmod(u, self.largura)
+        ax, ay = divmod(alvo, self.largura)
+        dx, dy = abs(dx - ax), abs(dy - ay)
+        if self.diagonal:
+            return max(dx, dy) + (math.sqrt(2) - 1) * min(dx, dy)
+        return dx + dy
+
+    # A* (ou Dijkstra, sem destino) que só entra nas células dos clusters permitidos
+    # (todos, se permitidos for None). Retorna (custo g, predecessores, expandidos).
+    def _busca_local(
+        self, origem: int, permitidos: Optional[Set[int]], destino: int = -1
+    ) -> Tuple[Dict[int, float], Dict[int, int], int]:
+        livre, cluster, vizinhanca = self.livre, self.cluster, self.vizinhanca
+        progresso = self.progresso
+        com_destino = destino >= 0
+        g = {origem: 0.0}
+        veio_de = {}
+        fechados = set()
+        fila = [(0.0, origem)]
+        while fila:
+            _, u = heapq.heappop(fila)
+            if u in fechados:
+                continue
+            fechados.add(u)
+            if u == destino:
+                break
+            if progresso is not None and len(fechados) % INTERVALO_PROGRESSO == 0:
+                self._reportar_progresso(
+                    self.last_expandidos + len(fechados), len(fila)
+                )
+            gu = g[u]
+            for deslocamento, custo in vizinhanca:
+                v = u + deslocamento
+                if not livre[v] or v in fechados:
+                    continue
+                if permitidos is not None and cluster[v] not in permitidos:
+                    continue
+                novo = gu + custo
+                if novo < g.get(v, math.inf):
+                    g[v] = novo
+                    veio_de[v] = u
+                    f = novo + self._heuristica(v, destino) if com_destino else novo
+                    heapq.heappush(fila, (f, v))
+        return g, veio_de, len(fechados)
+
+    def _celulas(self, veio_de: Dict[int, int], origem: int, destino: int) -> List[int]:
+        trecho = [destino]
+        while trecho[-1] != origem:
+            trecho.append(veio_de[trecho[-1]])
+        trecho.reverse()
+        return trecho
+
+    # Células de u até v, dois nós do cluster c, pela busca local; o trecho fica
+    # guardado até o cluster ser recalculado
+    def _trecho(self, c: int, u: int, v: int) -> List[int]:
+        trechos = self._trechos.setdefault(c, {})
+        trecho = trechos.get((u, v))
+        if trecho is None:
+            _, veio_de, expandidos = self._busca_local(u, {c}, v)
+            self.last_expandidos += expandidos
+            trecho = trechos[(u, v)] = self._celulas(veio_de, u, v)
+        return trecho
+
+    # Repassa o progresso ao callback; se ele devolver False a busca é interrompida
+    def _reportar_progresso(self, expandidos: int, fronteira: int):
+        if not self.progresso(expandidos, fronteira):
+            raise BuscaCancelada()
+
+    # Caminho de inicio até fim (None se não houver), pela abstração hierárquica
+    def caminho(
+        self, inicio: Tuple[int, int], fim: Tuple[int, int], refinar: bool = False
+    ) -> Optional[List[Tuple[int, int]]]:
+        estatisticas = self.estatisticas = EstatisticasBusca()
+        self.construir()
+        estatisticas.marcar("preparacao")
+        largura = self.largura
+        origem = (inicio[0] + 1) * largura + inicio[1] + 1
+        destino = (fim[0] + 1) * largura + fim[1] + 1
+        self.ultimo_custo = math.inf
+        self.last_expandidos = 0
+        if not (self.livre[origem] and self.livre[destino]):
+            estatisticas.marcar("busca")
+            estatisticas.concluir(0)
+            self.last_elapsed_ms = estatisticas.total_ms
+            return None
+
+        celulas = self._caminho_abstrato(origem, destino)
+        if celulas is None:
+            # só acontece se a ligação depender de uma diagonal entre clusters
+            g, veio_de, expandidos = self._busca_local(origem, None, destino)
+            self.last_expandidos += expandidos
+            if destino in g:
+                celulas = self._celulas(veio_de, origem, destino)
+        elif refinar and len(celulas) > 2:
+            corredor = set()
+            for u in celulas:
+                ci, cj = divmod(self.cluster[u], self.clusters_j)
+                for ni in range(max(0, ci - 1), min(self.clusters_i, ci + 2)):
+                    for nj in range(max(0, cj - 1), min(self.clusters_j, cj + 2)):
+                        corredor.add(ni * self.clusters_j + nj)
+            _, veio_de, expandidos = self._busca_local(origem, corredor, destino)
+            self.last_expandidos += expandidos
+            celulas = self._celulas(veio_de, origem, destino)
+        estatisticas.marcar("busca")
+
+        caminho = None
+        if celulas is not None:
+            caminho = [((u // largura) - 1, (u % largura) - 1) for u in celulas]
+            self.ultimo_custo = sum(
+                math.sqrt(2) if a[0] != b[0] and a[1] != b[1] else 1
+                for a, b in zip(caminho, caminho[1:])
+            )
+        estatisticas.marcar("reconstrucao")
+        estatisticas.concluir(self.last_expandidos)
+        self.last_elapsed_ms = estatisticas.total_ms
+        return caminho
+
+    # A* no grafo abstrato com S e E ligados aos nós dos seus clusters, seguido do
+    # refinamento de cada trecho. Retorna as células (índices planos) ou None.
+    def _caminho_abstrato(self, origem: int, destino: int) -> Optional[List[int]]:
+        cluster_origem = self.cluster[origem]
+        cluster_destino = self.cluster[destino]
+        g_origem, veio_origem, expandidos_origem = self._busca_local(
+            origem, {cluster_origem}
+        )
+        g_destino, veio_destino, expandidos_destino = self._busca_local(
+            destino, {cluster_destino}
+        )
+        self.last_expandidos += expandidos_origem + expandidos_destino
+        grafo = self._grafo
+
+        def arestas(u):
+            if u == origem:
+                for v in self.nos[cluster_origem].tolist():
+                    if v in g_origem and v != u:
+                        yield v, g_origem[v]
+                if destino in g_origem:
+                    yield destino, g_origem[destino]
+            if self.posicao[u] >= 0:
+                yield from grafo[u]
+                if self.cluster[u] == cluster_destino and u in g_destino:
+                    yield destino, g_destino[u]
+
+        # empates em f saem pelo menor h (o nó mais perto de E)
+        heuristica = self._heuristica
+        progresso = self.progresso
+        g = {origem: 0.0}
+        veio_de = {}
+        fechados = set()
+        fila = [(heuristica(origem, destino), 0.0, origem)]
+        while fila:
+            _, _, u = heapq.heappop(fila)
+            if u in fechados:
+                continue
+            fechados.add(u)
+            if u == destino:
+                break
+            if progresso is not None and len(fechados) % INTERVALO_PROGRESSO == 0:
+                self._reportar_progresso(
+                    self.last_expandidos + len(fechados), len(fila)
+                )
+            gu = g[u]
+            for v, custo in arestas(u):
+                novo = gu + custo
+                if v not in fechados and novo < g.get(v, math.inf):
+                    g[v] = novo
+                    veio_de[v] = u
+                    h = heuristica(v, destino)
+                    heapq.heappush(fila, (novo + h, h, v))
+        self.last_expandidos += len(fechados)
+        if destino not in fechados:
+            return None
+
+        # os trechos a partir de S e até E saem das buscas que ligaram S e E à abstração
+        abstrato = self._celulas(veio_de, origem, destino)
+        celulas = [origem]
+        for u, v in zip(abstrato, abstrato[1:]):
+            c = self.cluster[u]
+            if c != self.cluster[v]:
+                celulas.append(v)
+            elif u == origem:
+                celulas.extend(self._celulas(veio_origem, origem, v)[1:])
+            elif v == destino:
+                trecho = self._celulas(veio_destino, destino, u)
+                trecho.reverse()
+                celulas.extend(trecho[1:])
+            else:
+                celulas.extend(self._trecho(c, u, v)[1:])
+        return celulas
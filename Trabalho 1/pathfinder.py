@@ -1,6 +1,6 @@
-import heapq
 import math
 import time
+from array import array
 from typing import List, Tuple, Optional, Dict
 import matplotlib.pyplot as plt
 import matplotlib.animation as animation
@@ -8,22 +8,76 @@ from matplotlib.colors import ListedColormap
 import numpy as np
 import matplotlib.patches as mpatches
 import matplotlib.patheffects as path_effects
+from exportador_gif import exportar_rastro
+from rastro import RastroBusca, ReprodutorRastro
+from planejador_incremental import PlanejadorIncremental
+from hpa import PlanejadorHPA
+from execucao import INTERVALO_PROGRESSO, BuscaCancelada
+from estatisticas import EstatisticasBusca
+from terreno import (
+    PESO_BASE,
+    custo_minimo,
+    mapa_de_pesos,
+    peso_da_celula,
+    tem_terreno,
+)
+
+MODOS = ("padrao", "array", "bidirecional", "jps", "hpa", "dial")
+# Modos que supõem custo uniforme por célula e recusam labirintos com terreno
+MODOS_UNIFORMES = ("bidirecional", "jps", "hpa")
 
 
 class PathFinder:
     # Inicialização da classe PathFinder
-    def __init__(self, labirinto: List[List[int]], diagonal: bool = False):
+    # modo="array" usa a tabela de vizinhos pré-calculada e vetores planos (sem tuplas por nó)
+    # modo="bidirecional" busca a partir de S e de E ao mesmo tempo (BFS sem diagonal,
+    # A* bidirecional com diagonal)
+    # modo="jps" usa Jump Point Search: só os pontos de salto entram na fila
+    # modo="hpa" responde pela abstração hierárquica de hpa.PlanejadorHPA, guardada
+    # entre chamadas (caminho quase ótimo; sem visualização, cai no modo padrão)
+    # modo="dial" troca o heap por uma fila de baldes indexada pelo custo (pesos
+    # inteiros pequenos); é o modo usado pelas tabelas planas em labirintos com
+    # terreno (ver terreno.py: células PESO_BASE + k custam k)
+    def __init__(
+        self, labirinto: List[List[int]], diagonal: bool = False, modo: str = "padrao"
+    ):
+        if modo not in MODOS:
+            raise ValueError(f"Modo desconhecido: {modo}")
         self.labirinto = labirinto
         self.linhas = len(labirinto)
-        self.colunas = len(labirinto[0]) if labirinto else 0
+        self.colunas = len(labirinto[0]) if self.linhas else 0
         self.inicio = None
         self.fim = None
         self.diagonal = diagonal
-        # tempo (ms) gasto pelo último run do algoritmo (exclui overhead de visualização)
+        self.modo = modo
+        # métricas do último run (ver estatisticas.EstatisticasBusca); com
+        # estatisticas_detalhadas=True a busca também conta as operações da fila e
+        # mede o pico de memória. gancho_fase(fase, estatisticas) é chamado ao fim de
+        # cada fase (preparação, busca, reconstrução)
+        self.estatisticas = EstatisticasBusca()
+        self.estatisticas_detalhadas = False
+        self.gancho_fase = None
+        # atalhos de estatisticas: tempo (ms) do último run sem a visualização e nós
+        # expandidos (retirados da fila e processados)
         self.last_elapsed_ms: float = 0.0
+        self.last_expandidos: int = 0
+        # pontos de salto do último caminho encontrado com modo="jps"
+        self.ultimos_pontos_salto: List[Tuple[int, int]] = []
+        # callback opcional (expandidos, tamanho da fila) -> bool, chamado a cada
+        # INTERVALO_PROGRESSO expansões; devolver False cancela a busca (BuscaCancelada)
+        self.progresso = None
+        # labirinto com terreno (pesos > 1) e menor custo de entrada de uma célula
+        # comum, que escala a heurística; calculados em a_estrela
+        self.ponderado = False
+        self.custo_minimo = 1.0
+        self._tabela = None
+        self._pesos = None
+        self._hpa: Optional[PlanejadorHPA] = None
 
     # Encontra as posições de início (S) e fim (E) no labirinto
     def encontrar_posicoes(self) -> bool:
+        if isinstance(self.labirinto, np.ndarray):
+            return self._encontrar_posicoes_array()
         count_inicio = 0
         count_fim = 0
         for i in range(self.linhas):
@@ -38,15 +92,34 @@ class PathFinder:
             raise ValueError("Labirinto deve ter apenas um ponto S e um ponto E")
         return self.inicio is not None and self.fim is not None
 
-    # Calcula a distância heurística até o ponto final
+    # Mesma busca de S/E sobre um array (ex.: numpy.memmap de arquivo_labirinto),
+    # vetorizada e sem converter o grid para listas
+    def _encontrar_posicoes_array(self) -> bool:
+        plano = self.labirinto.reshape(-1)
+        inicios = np.flatnonzero(plano == 2)
+        fins = np.flatnonzero(plano == 3)
+        if inicios.size > 1 or fins.size > 1:
+            raise ValueError("Labirinto deve ter apenas um ponto S e um ponto E")
+        if inicios.size:
+            self.inicio = divmod(int(inicios[0]), self.colunas)
+        if fins.size:
+            self.fim = divmod(int(fins[0]), self.colunas)
+        return self.inicio is not None and self.fim is not None
+
+    # Calcula a distância heurística até o ponto final. Com terreno, o trecho além do
+    # último passo (que entra em E, de custo 1) custa ao menos custo_minimo por unidade
+    # de distância: a heurística continua admissível e consistente.
     def heuristica(self, atual: Tuple[int, int]) -> float:
         if self.fim is None:
             return 0
         dx = abs(atual[0] - self.fim[0])
         dy = abs(atual[1] - self.fim[1])
-        if self.diagonal:
-            return math.sqrt(dx * dx + dy * dy)
-        return dx + dy
+        h = math.sqrt(dx * dx + dy * dy) if self.diagonal else dx + dy
+        if self.custo_minimo > 1:
+            alcance = math.sqrt(2) if self.diagonal else 1
+            if h > alcance:
+                h += (self.custo_minimo - 1) * (h - alcance)
+        return h
 
     # Retorna os vizinhos válidos de uma posição
     def vizinhos_validos(
@@ -60,8 +133,11 @@ class PathFinder:
         for dx, dy in direcoes:
             nx, ny = x + dx, y + dy
             if 0 <= nx < self.linhas and 0 <= ny < self.colunas:
-                if self.labirinto[nx][ny] != 1:
+                valor = self.labirinto[nx][ny]
+                if valor != 1:
                     custo = math.sqrt(2) if abs(dx) + abs(dy) == 2 else 1
+                    if valor > PESO_BASE:
+                        custo *= valor - PESO_BASE
                     vizinhos.append(((nx, ny), custo))
         return vizinhos
 
@@ -71,57 +147,669 @@ class PathFinder:
     ) -> Optional[List[Tuple[int, int]]]:
         if not self.encontrar_posicoes():
             return None
-        start_time = time.perf_counter()
+        hpa = self.modo == "hpa" and not visualizar
+        # o HPA* não passa por uma fila única: os contadores da fila ficam não medidos
+        estatisticas = EstatisticasBusca(self.estatisticas_detalhadas, self.gancho_fase)
+        self.estatisticas = estatisticas
+        try:
+            self._detectar_terreno()
+            if self.ponderado and self.modo in MODOS_UNIFORMES:
+                raise ValueError(
+                    f"O modo {self.modo} supõe custo uniforme; use padrao, array ou "
+                    "dial em labirintos com terreno"
+                )
+            if self.modo == "bidirecional":
+                return self._busca_bidirecional(estatisticas, visualizar, salvar_gif)
+            if self.modo == "jps":
+                return self._a_estrela_jps(estatisticas, visualizar, salvar_gif)
+            if hpa:
+                return self._a_estrela_hpa(estatisticas)
+            # a visualização precisa do histórico do modo padrão; um array (ex.:
+            # memmap) vai direto para as tabelas planas, que dão o mesmo caminho (com
+            # terreno, pela fila de baldes)
+            array = self.modo == "array" or isinstance(self.labirinto, np.ndarray)
+            if (self.modo == "dial" or (array and self.ponderado)) and not visualizar:
+                return self._a_estrela_dial(estatisticas)
+            if array and not visualizar:
+                return self._a_estrela_array(estatisticas)
+            return self._a_estrela_padrao(estatisticas, visualizar, salvar_gif)
+        finally:
+            estatisticas.liberar()
+            self.last_elapsed_ms = estatisticas.total_ms
+            self.last_expandidos = estatisticas.expandidos
+
+    # A* com tuplas (linha, coluna), dicionários e o rastro para a visualização
+    def _a_estrela_padrao(
+        self, estatisticas: EstatisticasBusca, visualizar=False, salvar_gif=False
+    ) -> Optional[List[Tuple[int, int]]]:
         viz_time = 0.0
-        fila_prioridade = []
-        heapq.heappush(fila_prioridade, (0, self.inicio))
+        push, pop = estatisticas.operacoes_heap()
+        detalhado = estatisticas.detalhado
+        fila_prioridade = [(0, self.inicio)]
         veio_de = {}
         custo_g = {self.inicio: 0}
         visitados = set()
-        historico_exploracao = [] if visualizar else None
+        rastro = RastroBusca(self.colunas) if visualizar else None
+        if visualizar:
+            rastro.empilhar(self.inicio)
+            empilhados = []
+        progresso = self.progresso
+        caminho = None
+        estatisticas.marcar("preparacao")
         while fila_prioridade:
-            _, atual = heapq.heappop(fila_prioridade)
+            _, atual = pop(fila_prioridade)
             if atual in visitados:
+                if visualizar:
+                    rastro.desempilhar(atual)
                 continue
             visitados.add(atual)
+            if progresso is not None and len(visitados) % INTERVALO_PROGRESSO == 0:
+                self._reportar_progresso(len(visitados), len(fila_prioridade))
             if visualizar:
                 t_v0 = time.perf_counter()
-                custos_visitados = {pos: custo_g[pos] for pos in visitados}
-                na_fila = [pos for _, pos in fila_prioridade]
-                posicoes_fila = {pos: idx + 1 for idx, pos in enumerate(na_fila)}
-                historico_exploracao.append(
-                    (
-                        atual,
-                        set(visitados.copy()),
-                        custos_visitados,
-                        set(na_fila),
-                        posicoes_fila,
-                    )
-                )
+                rastro.desempilhar(atual)
+                rastro.expandir(atual, custo_g[atual])
                 viz_time += time.perf_counter() - t_v0
             if atual == self.fim:
+                estatisticas.marcar("busca")
                 caminho = self.reconstruir_caminho(veio_de)
-                total = (time.perf_counter() - start_time) - viz_time
-                self.last_elapsed_ms = total * 1000.0
-                if visualizar:
-                    self.visualizar_busca(
-                        historico_exploracao, caminho, True, salvar_gif
-                    )
-                return caminho
-            for vizinho, custo_movimento in self.vizinhos_validos(atual):
+                estatisticas.marcar("reconstrucao")
+                break
+            vizinhos = self.vizinhos_validos(atual)
+            if detalhado:
+                estatisticas.gerados += len(vizinhos)
+            for vizinho, custo_movimento in vizinhos:
                 if vizinho in visitados:
                     continue
                 novo_custo = custo_g[atual] + custo_movimento
                 if vizinho not in custo_g or novo_custo < custo_g[vizinho]:
                     custo_g[vizinho] = novo_custo
                     f = novo_custo + self.heuristica(vizinho)
-                    heapq.heappush(fila_prioridade, (f, vizinho))
+                    push(fila_prioridade, (f, vizinho))
                     veio_de[vizinho] = atual
-        total = (time.perf_counter() - start_time) - viz_time
-        self.last_elapsed_ms = total * 1000.0
-        if visualizar and historico_exploracao:
-            self.visualizar_busca(historico_exploracao, None, False, salvar_gif)
-        return None
+                    if visualizar:
+                        empilhados.append(vizinho)
+            if visualizar:
+                t_v0 = time.perf_counter()
+                for vizinho in empilhados:
+                    rastro.empilhar(vizinho)
+                empilhados.clear()
+                viz_time += time.perf_counter() - t_v0
+        else:
+            estatisticas.marcar("busca")
+        estatisticas.transferir(viz_time, "visualizacao")
+        estatisticas.concluir(len(visitados))
+        if visualizar and len(rastro):
+            self.visualizar_busca(rastro, caminho, caminho is not None, salvar_gif)
+        return caminho
+
+    # Planejador LPA* persistente para este labirinto: após editar células, chame
+    # notificar_alteracao(x, y) e caminho() repara só a parte afetada da busca
+    def planejador_incremental(self) -> PlanejadorIncremental:
+        planejador = PlanejadorIncremental(self.labirinto, self.diagonal)
+        if self.encontrar_posicoes():
+            planejador.definir_extremos(self.inicio, self.fim)
+        return planejador
+
+    # Planejador HPA* deste labirinto, criado na primeira chamada e reaproveitado: a
+    # abstração só é recalculada nos clusters marcados por notificar_alteracao(x, y)
+    def planejador_hpa(self) -> PlanejadorHPA:
+        if self._hpa is None:
+            self._hpa = PlanejadorHPA(self.labirinto, self.diagonal)
+        return self._hpa
+
+    # Avisa que a célula (x, y) do labirinto foi editada depois de uma busca: as
+    # tabelas planas já calculadas (células livres e pesos) são corrigidas só nessa
+    # célula e o HPA* marca o cluster dela, como em PlanejadorIncremental
+    def notificar_alteracao(self, x: int, y: int):
+        valor = self.labirinto[x][y]
+        if self._tabela is not None:
+            livre, _, largura = self._tabela
+            livre[(x + 1) * largura + y + 1] = int(valor != 1)
+        if self._pesos is not None:
+            pesos, maximo = self._pesos
+            peso = math.inf if valor == 1 else float(peso_da_celula(valor))
+            pesos[(x + 1) * (self.colunas + 2) + y + 1] = peso
+            # o maior peso só precisa ser um limite superior
+            if peso != math.inf and peso > maximo:
+                self._pesos = (pesos, peso)
+        if self._hpa is not None:
+            self._hpa.notificar_alteracao(x, y)
+
+    # Descarta as tabelas planas e a abstração do HPA* (o labirinto foi trocado ou
+    # reescrito de uma vez); a próxima busca as recalcula
+    def limpar_cache(self):
+        self._tabela = None
+        self._pesos = None
+        self._hpa = None
+
+    # Os tempos vêm do planejador (a abstração recalculada conta como preparação); o
+    # callback de progresso é repassado a ele
+    def _a_estrela_hpa(
+        self, estatisticas: EstatisticasBusca
+    ) -> Optional[List[Tuple[int, int]]]:
+        planejador = self.planejador_hpa()
+        planejador.progresso = self.progresso
+        caminho = planejador.caminho(self.inicio, self.fim)
+        estatisticas.tempos_ms.update(planejador.estatisticas.tempos_ms)
+        estatisticas.concluir(planejador.last_expandidos)
+        return caminho
+
+    # Repassa o progresso ao callback; se ele devolver False a busca é interrompida
+    def _reportar_progresso(self, expandidos: int, fronteira: int):
+        if not self.progresso(expandidos, fronteira):
+            raise BuscaCancelada()
+
+    # Pré-calcula, uma vez por grade, a máscara de células livres (com borda de paredes)
+    # e os deslocamentos planos/custos de cada direção, na mesma ordem de vizinhos_validos;
+    # edições posteriores chegam por notificar_alteracao ou limpar_cache
+    def _preparar_tabela(self):
+        if self._tabela is not None:
+            return self._tabela
+        largura = self.colunas + 2
+        livre = np.zeros((self.linhas + 2, largura), dtype=np.uint8)
+        livre[1:-1, 1:-1] = np.asarray(self.labirinto) != 1
+        direcoes = [(0, 1), (1, 0), (0, -1), (-1, 0)]
+        if self.diagonal:
+            direcoes.extend([(1, 1), (1, -1), (-1, 1), (-1, -1)])
+        raiz2 = math.sqrt(2)
+        vizinhanca = [
+            (dx * largura + dy, raiz2 if abs(dx) + abs(dy) == 2 else 1)
+            for dx, dy in direcoes
+        ]
+        self._tabela = (bytearray(livre.tobytes()), vizinhanca, largura)
+        return self._tabela
+
+    # Detecta o terreno e o custo mínimo que escala a heurística. Sem terreno o
+    # labirinto não é convertido: o max de cada linha é uma passada em C.
+    def _detectar_terreno(self):
+        self.ponderado = tem_terreno(self.labirinto)
+        self.custo_minimo = custo_minimo(self.labirinto) if self.ponderado else 1.0
+
+    # Pré-calcula, uma vez por grade, o custo de entrada de cada célula num vetor plano
+    # com a mesma borda de _preparar_tabela, e o maior custo de uma célula livre
+    def _preparar_pesos(self):
+        if self._pesos is not None:
+            return self._pesos
+        pesos = np.ones((self.linhas + 2, self.colunas + 2))
+        pesos[1:-1, 1:-1] = mapa_de_pesos(self.labirinto)
+        maximo = float(np.max(pesos, where=np.isfinite(pesos), initial=1.0))
+        self._pesos = (memoryview(pesos.reshape(-1)).cast("B").cast("d"), maximo)
+        return self._pesos
+
+    # A* sobre índices planos: custo_g/veio_de em vetores e ids inteiros no heap.
+    # Como os ids crescem na mesma ordem das tuplas (linha, coluna), os empates
+    # no heap são resolvidos exatamente como no modo padrão.
+    def _a_estrela_array(
+        self, estatisticas: EstatisticasBusca
+    ) -> Optional[List[Tuple[int, int]]]:
+        livre, vizinhanca, largura = self._preparar_tabela()
+        total = len(livre)
+        custo_g = array("d", [math.inf]) * total
+        veio_de = array("i", [-1]) * total
+        fechado = bytearray(total)
+        origem = (self.inicio[0] + 1) * largura + self.inicio[1] + 1
+        destino = (self.fim[0] + 1) * largura + self.fim[1] + 1
+        # coordenadas do fim no sistema com borda, para a heurística
+        fim_x, fim_y = self.fim[0] + 1, self.fim[1] + 1
+        diagonal = self.diagonal
+        sqrt = math.sqrt
+        push, pop = estatisticas.operacoes_heap()
+        detalhado = estatisticas.detalhado
+
+        custo_g[origem] = 0.0
+        fila_prioridade = [(0, origem)]
+        caminho = None
+        progresso = self.progresso
+        expandidos = 0
+        estatisticas.marcar("preparacao")
+        while fila_prioridade:
+            _, atual = pop(fila_prioridade)
+            if fechado[atual]:
+                continue
+            fechado[atual] = 1
+            expandidos += 1
+            if progresso is not None and expandidos % INTERVALO_PROGRESSO == 0:
+                self._reportar_progresso(expandidos, len(fila_prioridade))
+            if atual == destino:
+                estatisticas.marcar("busca")
+                caminho = self._reconstruir_caminho_indices(veio_de, destino, largura)
+                estatisticas.marcar("reconstrucao")
+                break
+            g_atual = custo_g[atual]
+            if detalhado:
+                estatisticas.gerados += sum(livre[atual + k] for k, _ in vizinhanca)
+            for deslocamento, custo_movimento in vizinhanca:
+                vizinho = atual + deslocamento
+                if not livre[vizinho] or fechado[vizinho]:
+                    continue
+                novo_custo = g_atual + custo_movimento
+                if novo_custo < custo_g[vizinho]:
+                    custo_g[vizinho] = novo_custo
+                    vx, vy = divmod(vizinho, largura)
+                    dx = abs(vx - fim_x)
+                    dy = abs(vy - fim_y)
+                    h = sqrt(dx * dx + dy * dy) if diagonal else dx + dy
+                    push(fila_prioridade, (novo_custo + h, vizinho))
+                    veio_de[vizinho] = atual
+        else:
+            estatisticas.marcar("busca")
+        estatisticas.concluir(expandidos)
+        return caminho
+
+    # A* com fila de baldes (Dial) para custos inteiros pequenos: cada entrada vai para
+    # o balde int(f) de um vetor circular de listas, em vez de um heap, e push/pop custam
+    # O(1) amortizado. Com a heurística consistente, o f de um nó gerado fica a menos de
+    # 2 * (maior passo) do balde atual, o que limita o número de baldes. Dentro de um
+    # balde a ordem não é exata (as diagonais dão f fracionário): um nó já fechado
+    # cujo custo melhora volta a ser aberto, e a busca só para quando o balde atual
+    # alcança o custo do fim, o que mantém o caminho ótimo.
+    def _a_estrela_dial(
+        self, estatisticas: EstatisticasBusca
+    ) -> Optional[List[Tuple[int, int]]]:
+        livre, vizinhanca, largura = self._preparar_tabela()
+        pesos, peso_maximo = self._preparar_pesos()
+        total = len(livre)
+        custo_g = array("d", [math.inf]) * total
+        veio_de = array("i", [-1]) * total
+        fechado = bytearray(total)
+        origem = (self.inicio[0] + 1) * largura + self.inicio[1] + 1
+        destino = (self.fim[0] + 1) * largura + self.fim[1] + 1
+        fim_x, fim_y = self.fim[0] + 1, self.fim[1] + 1
+        diagonal = self.diagonal
+        sqrt = math.sqrt
+        # a heurística é a de self.heuristica, escrita em linha
+        alcance = sqrt(2) if diagonal else 1
+        excesso = self.custo_minimo - 1
+        maior_passo = max(custo for _, custo in vizinhanca) * peso_maximo
+        num_baldes = int(2 * maior_passo) + 3
+        baldes = [[] for _ in range(num_baldes)]
+        detalhado = estatisticas.detalhado
+        estatisticas.medir_fila()
+
+        custo_g[origem] = 0.0
+        balde_atual = int(self.heuristica(self.inicio))
+        baldes[balde_atual % num_baldes].append(origem)
+        pendentes = pico = 1
+        removidos = 0
+        progresso = self.progresso
+        expandidos = 0
+        estatisticas.marcar("preparacao")
+        while pendentes and balde_atual < custo_g[destino]:
+            balde = baldes[balde_atual % num_baldes]
+            while balde:
+                atual = balde.pop()
+                pendentes -= 1
+                removidos += 1
+                if fechado[atual]:
+                    continue
+                fechado[atual] = 1
+                expandidos += 1
+                if progresso is not None and expandidos % INTERVALO_PROGRESSO == 0:
+                    self._reportar_progresso(expandidos, pendentes)
+                if atual == destino:
+                    continue
+                g_atual = custo_g[atual]
+                if detalhado:
+                    estatisticas.gerados += sum(livre[atual + k] for k, _ in vizinhanca)
+                for deslocamento, custo_movimento in vizinhanca:
+                    vizinho = atual + deslocamento
+                    if not livre[vizinho]:
+                        continue
+                    novo_custo = g_atual + custo_movimento * pesos[vizinho]
+                    if novo_custo < custo_g[vizinho]:
+                        custo_g[vizinho] = novo_custo
+                        veio_de[vizinho] = atual
+                        fechado[vizinho] = 0
+                        vx, vy = divmod(vizinho, largura)
+                        dx = abs(vx - fim_x)
+                        dy = abs(vy - fim_y)
+                        h = sqrt(dx * dx + dy * dy) if diagonal else dx + dy
+                        if excesso and h > alcance:
+                            h += excesso * (h - alcance)
+                        # o max protege de um f arredondado para baixo do balde atual
+                        chave = max(int(novo_custo + h), balde_atual)
+                        baldes[chave % num_baldes].append(vizinho)
+                        pendentes += 1
+                        if detalhado and pendentes > pico:
+                            pico = pendentes
+            balde_atual += 1
+        estatisticas.marcar("busca")
+        caminho = None
+        if custo_g[destino] < math.inf:
+            caminho = self._reconstruir_caminho_indices(veio_de, destino, largura)
+        estatisticas.marcar("reconstrucao")
+        estatisticas.registrar_fila(removidos + pendentes - 1, removidos, pico)
+        estatisticas.concluir(expandidos)
+        return caminho
+
+    # Busca bidirecional: uma frente parte de S e outra de E sobre os mesmos vetores planos
+    def _busca_bidirecional(
+        self, estatisticas: EstatisticasBusca, visualizar=False, salvar_gif=False
+    ) -> Optional[List[Tuple[int, int]]]:
+        livre, vizinhanca, largura = self._preparar_tabela()
+        origem = (self.inicio[0] + 1) * largura + self.inicio[1] + 1
+        destino = (self.fim[0] + 1) * largura + self.fim[1] + 1
+        rastro = RastroBusca(self.colunas) if visualizar else None
+        if self.diagonal:
+            encontro, veio_de, expandidos = self._a_estrela_bidirecional(
+                livre, vizinhanca, largura, origem, destino, rastro, estatisticas
+            )
+        else:
+            encontro, veio_de, expandidos = self._bfs_bidirecional(
+                livre, vizinhanca, largura, origem, destino, rastro, estatisticas
+            )
+        estatisticas.marcar("busca")
+        caminho = None
+        if encontro >= 0:
+            ida = self._reconstruir_caminho_indices(veio_de[0], encontro, largura)
+            volta = self._reconstruir_caminho_indices(veio_de[1], encontro, largura)
+            volta.reverse()
+            caminho = ida + volta[1:]
+        estatisticas.marcar("reconstrucao")
+        estatisticas.concluir(expandidos, raizes=2)
+        if visualizar and len(rastro):
+            self.visualizar_busca(rastro, caminho, caminho is not None, salvar_gif)
+        return caminho
+
+    # BFS bidirecional por camadas (sem diagonal, custo unitário): expande sempre a
+    # menor fronteira e, ao detectar encontro, termina a camada e fica com o menor total
+    def _bfs_bidirecional(
+        self, livre, vizinhanca, largura, origem, destino, rastro, estatisticas
+    ):
+        total = len(livre)
+        dist = (array("i", [-1]) * total, array("i", [-1]) * total)
+        veio_de = (array("i", [-1]) * total, array("i", [-1]) * total)
+        dist[0][origem] = 0
+        dist[1][destino] = 0
+        fronteiras = [[origem], [destino]]
+        expandidos = 0
+        detalhado = estatisticas.detalhado
+        estatisticas.medir_fila()
+        melhor = math.inf
+        encontro = origem if origem == destino else -1
+        estatisticas.marcar("preparacao")
+        while encontro < 0 and fronteiras[0] and fronteiras[1]:
+            if self.progresso is not None:
+                self._reportar_progresso(
+                    expandidos, len(fronteiras[0]) + len(fronteiras[1])
+                )
+            lado = 0 if len(fronteiras[0]) <= len(fronteiras[1]) else 1
+            camada = len(fronteiras[lado])
+            dist_lado, dist_outro = dist[lado], dist[1 - lado]
+            pais = veio_de[lado]
+            nova = []
+            gerados = 0
+            for atual in fronteiras[lado]:
+                expandidos += 1
+                d = dist_lado[atual] + 1
+                if detalhado:
+                    gerados += sum(livre[atual + k] for k, _ in vizinhanca)
+                if rastro is not None:
+                    x, y = divmod(atual, largura)
+                    rastro.expandir((x - 1, y - 1), d - 1)
+                for deslocamento, _ in vizinhanca:
+                    vizinho = atual + deslocamento
+                    if not livre[vizinho] or dist_lado[vizinho] >= 0:
+                        continue
+                    dist_lado[vizinho] = d
+                    pais[vizinho] = atual
+                    nova.append(vizinho)
+                    if dist_outro[vizinho] >= 0 and d + dist_outro[vizinho] < melhor:
+                        melhor = d + dist_outro[vizinho]
+                        encontro = vizinho
+            fronteiras[lado] = nova
+            estatisticas.registrar_camada(camada, gerados, len(nova))
+        return encontro, veio_de, expandidos
+
+    # A* bidirecional (com diagonal): cada frente usa a heurística até o extremo oposto.
+    # Com heurísticas consistentes, quando o topo de qualquer fila atinge o melhor
+    # custo de encontro (mu) já não existe caminho mais curto.
+    def _a_estrela_bidirecional(
+        self, livre, vizinhanca, largura, origem, destino, rastro, estatisticas
+    ):
+        total = len(livre)
+        custo_g = (array("d", [math.inf]) * total, array("d", [math.inf]) * total)
+        veio_de = (array("i", [-1]) * total, array("i", [-1]) * total)
+        fechado = (bytearray(total), bytearray(total))
+        alvos = (divmod(destino, largura), divmod(origem, largura))
+        custo_g[0][origem] = 0.0
+        custo_g[1][destino] = 0.0
+        filas = ([(0, origem)], [(0, destino)])
+        sqrt = math.sqrt
+        push, pop = estatisticas.operacoes_heap()
+        detalhado = estatisticas.detalhado
+        mu = 0.0 if origem == destino else math.inf
+        encontro = origem if origem == destino else -1
+        expandidos = 0
+        estatisticas.marcar("preparacao")
+        while filas[0] and filas[1]:
+            if filas[0][0][0] >= mu or filas[1][0][0] >= mu:
+                break
+            lado = 0 if len(filas[0]) <= len(filas[1]) else 1
+            fila = filas[lado]
+            _, atual = pop(fila)
+            fechado_lado = fechado[lado]
+            if fechado_lado[atual]:
+                continue
+            fechado_lado[atual] = 1
+            expandidos += 1
+            if self.progresso is not None and expandidos % INTERVALO_PROGRESSO == 0:
+                self._reportar_progresso(expandidos, len(filas[0]) + len(filas[1]))
+            g_lado, g_outro = custo_g[lado], custo_g[1 - lado]
+            pais = veio_de[lado]
+            alvo_x, alvo_y = alvos[lado]
+            g_atual = g_lado[atual]
+            if rastro is not None:
+                x, y = divmod(atual, largura)
+                rastro.expandir((x - 1, y - 1), g_atual)
+            if detalhado:
+                estatisticas.gerados += sum(livre[atual + k] for k, _ in vizinhanca)
+            for deslocamento, custo_movimento in vizinhanca:
+                vizinho = atual + deslocamento
+                if not livre[vizinho] or fechado_lado[vizinho]:
+                    continue
+                novo_custo = g_atual + custo_movimento
+                if novo_custo < g_lado[vizinho]:
+                    g_lado[vizinho] = novo_custo
+                    pais[vizinho] = atual
+                    vx, vy = divmod(vizinho, largura)
+                    dx = abs(vx - alvo_x)
+                    dy = abs(vy - alvo_y)
+                    push(fila, (novo_custo + sqrt(dx * dx + dy * dy), vizinho))
+                    if novo_custo + g_outro[vizinho] < mu:
+                        mu = novo_custo + g_outro[vizinho]
+                        encontro = vizinho
+        return encontro, veio_de, expandidos
+
+    # A* com Jump Point Search (Harabor & Grastien): em grades de custo uniforme, segue
+    # em linha reta (ou diagonal) até encontrar um vizinho forçado, e só esse ponto de
+    # salto vai para a fila. O caminho devolvido é interpolado célula a célula; os
+    # pontos de salto ficam em self.ultimos_pontos_salto.
+    def _a_estrela_jps(
+        self, estatisticas: EstatisticasBusca, visualizar=False, salvar_gif=False
+    ) -> Optional[List[Tuple[int, int]]]:
+        livre, vizinhanca, largura = self._preparar_tabela()
+        total = len(livre)
+        custo_g = array("d", [math.inf]) * total
+        veio_de = array("i", [-1]) * total
+        fechado = bytearray(total)
+        origem = (self.inicio[0] + 1) * largura + self.inicio[1] + 1
+        destino = (self.fim[0] + 1) * largura + self.fim[1] + 1
+        fim_x, fim_y = self.fim[0] + 1, self.fim[1] + 1
+        diagonal = self.diagonal
+        raiz2 = math.sqrt(2)
+        push, pop = estatisticas.operacoes_heap()
+        detalhado = estatisticas.detalhado
+        rastro = RastroBusca(self.colunas) if visualizar else None
+
+        custo_g[origem] = 0.0
+        fila_prioridade = [(0, origem)]
+        pontos = None
+        progresso = self.progresso
+        expandidos = 0
+        estatisticas.marcar("preparacao")
+        while fila_prioridade:
+            _, atual = pop(fila_prioridade)
+            if fechado[atual]:
+                continue
+            fechado[atual] = 1
+            expandidos += 1
+            if progresso is not None and expandidos % INTERVALO_PROGRESSO == 0:
+                self._reportar_progresso(expandidos, len(fila_prioridade))
+            ax, ay = divmod(atual, largura)
+            if rastro is not None:
+                rastro.expandir((ax - 1, ay - 1), custo_g[atual])
+            if atual == destino:
+                estatisticas.marcar("busca")
+                pontos = self._reconstruir_caminho_indices(veio_de, destino, largura)
+                break
+            g_atual = custo_g[atual]
+            for dx, dy in self._direcoes_jps(livre, largura, atual, veio_de[atual]):
+                salto = self._saltar(livre, largura, atual, dx, dy, destino)
+                if salto < 0:
+                    continue
+                if detalhado:
+                    estatisticas.gerados += 1
+                if fechado[salto]:
+                    continue
+                sx, sy = divmod(salto, largura)
+                passos_x, passos_y = abs(sx - ax), abs(sy - ay)
+                novo_custo = g_atual + (
+                    max(passos_x, passos_y) + (raiz2 - 1) * min(passos_x, passos_y)
+                )
+                if novo_custo < custo_g[salto]:
+                    custo_g[salto] = novo_custo
+                    veio_de[salto] = atual
+                    hx, hy = abs(sx - fim_x), abs(sy - fim_y)
+                    if diagonal:
+                        h = max(hx, hy) + (raiz2 - 1) * min(hx, hy)
+                    else:
+                        h = hx + hy
+                    push(fila_prioridade, (novo_custo + h, salto))
+        else:
+            estatisticas.marcar("busca")
+        self.ultimos_pontos_salto = pontos or []
+        caminho = self._interpolar_pontos(pontos) if pontos else None
+        estatisticas.marcar("reconstrucao")
+        estatisticas.concluir(expandidos)
+        if visualizar and len(rastro):
+            self.visualizar_busca(rastro, caminho, caminho is not None, salvar_gif)
+        return caminho
+
+    # Direções a explorar a partir de um ponto de salto: os vizinhos "naturais" na
+    # direção de chegada mais os forçados por paredes adjacentes (sem pai: todas)
+    def _direcoes_jps(self, livre, largura, atual, pai) -> List[Tuple[int, int]]:
+        if pai < 0:
+            direcoes = [(0, 1), (1, 0), (0, -1), (-1, 0)]
+            if self.diagonal:
+                direcoes.extend([(1, 1), (1, -1), (-1, 1), (-1, -1)])
+            return direcoes
+        ax, ay = divmod(atual, largura)
+        px, py = divmod(pai, largura)
+        dx = (ax > px) - (ax < px)
+        dy = (ay > py) - (ay < py)
+        if not self.diagonal:
+            if dx:
+                return [(0, -1), (0, 1), (dx, 0)]
+            return [(-1, 0), (1, 0), (0, dy)]
+        if dx and dy:
+            direcoes = [(0, dy), (dx, 0), (dx, dy)]
+            if not livre[atual - dy]:
+                direcoes.append((dx, -dy))
+            if not livre[atual - dx * largura]:
+                direcoes.append((-dx, dy))
+            return direcoes
+        if dy:
+            direcoes = [(0, dy)]
+            if not livre[atual + largura]:
+                direcoes.append((1, dy))
+            if not livre[atual - largura]:
+                direcoes.append((-1, dy))
+            return direcoes
+        direcoes = [(dx, 0)]
+        if not livre[atual + 1]:
+            direcoes.append((dx, 1))
+        if not livre[atual - 1]:
+            direcoes.append((dx, -1))
+        return direcoes
+
+    # Avança de `atual` na direção (dx, dy) até o próximo ponto de salto (-1 se bater
+    # numa parede). A borda de paredes da tabela dispensa testes de limite.
+    def _saltar(self, livre, largura, atual, dx, dy, destino) -> int:
+        passo = dx * largura + dy
+        no = atual
+        while True:
+            no += passo
+            if not livre[no]:
+                return -1
+            if no == destino:
+                return no
+            if dx and dy:
+                if (livre[no + dx * largura - dy] and not livre[no - dy]) or (
+                    livre[no - dx * largura + dy] and not livre[no - dx * largura]
+                ):
+                    return no
+                # na diagonal, um salto reto bem-sucedido torna este nó um ponto de salto
+                if (
+                    self._saltar(livre, largura, no, dx, 0, destino) >= 0
+                    or self._saltar(livre, largura, no, 0, dy, destino) >= 0
+                ):
+                    return no
+            elif self.diagonal:
+                if dy:
+                    if (livre[no + largura + dy] and not livre[no + largura]) or (
+                        livre[no - largura + dy] and not livre[no - largura]
+                    ):
+                        return no
+                elif (livre[no + dx * largura + 1] and not livre[no + 1]) or (
+                    livre[no + dx * largura - 1] and not livre[no - 1]
+                ):
+                    return no
+            elif dy:
+                if (livre[no - largura] and not livre[no - largura - dy]) or (
+                    livre[no + largura] and not livre[no + largura - dy]
+                ):
+                    return no
+            else:
+                if (livre[no - 1] and not livre[no - 1 - dx * largura]) or (
+                    livre[no + 1] and not livre[no + 1 - dx * largura]
+                ):
+                    return no
+                # sem diagonal, o movimento vertical procura pontos de salto laterais
+                if (
+                    self._saltar(livre, largura, no, 0, 1, destino) >= 0
+                    or self._saltar(livre, largura, no, 0, -1, destino) >= 0
+                ):
+                    return no
+
+    # Preenche as células entre pontos de salto consecutivos (retas ou diagonais)
+    def _interpolar_pontos(
+        self, pontos: List[Tuple[int, int]]
+    ) -> List[Tuple[int, int]]:
+        caminho = [pontos[0]]
+        for (x0, y0), (x1, y1) in zip(pontos, pontos[1:]):
+            dx = (x1 > x0) - (x1 < x0)
+            dy = (y1 > y0) - (y1 < y0)
+            x, y = x0, y0
+            while (x, y) != (x1, y1):
+                x += dx
+                y += dy
+                caminho.append((x, y))
+        return caminho
+
+    # Reconstrói o caminho a partir do vetor plano de predecessores (índices com borda)
+    def _reconstruir_caminho_indices(
+        self, veio_de: array, alvo: int, largura: int
+    ) -> List[Tuple[int, int]]:
+        caminho = []
+        atual = alvo
+        while atual >= 0:
+            x, y = divmod(atual, largura)
+            caminho.append((x - 1, y - 1))
+            atual = veio_de[atual]
+        caminho.reverse()
+        return caminho
 
     # Reconstrói o caminho a partir do dicionário de predecessores
     def reconstruir_caminho(self, veio_de: dict) -> List[Tuple[int, int]]:
@@ -135,7 +823,7 @@ class PathFinder:
 
     # Exibe o labirinto com o caminho encontrado no console
     def mostrar_labirinto_com_caminho(self, caminho: List[Tuple[int, int]]):
-        labirinto_visual = [linha[:] for linha in self.labirinto]
+        labirinto_visual = [list(linha) for linha in self.labirinto]
         for pos in caminho:
             if labirinto_visual[pos[0]][pos[1]] == 0:
                 labirinto_visual[pos[0]][pos[1]] = "*"
@@ -153,10 +841,8 @@ class PathFinder:
                     linha_str += str(celula) + " "
             print(linha_str)
 
-    # Cria animação visual da busca A*
-    def visualizar_busca(
-        self, historico_exploracao, caminho_final, tem_solucao, salvar_gif=False
-    ):
+    # Cria animação visual da busca A* a partir do rastro de eventos
+    def visualizar_busca(self, rastro, caminho_final, tem_solucao, salvar_gif=False):
 
         from matplotlib.widgets import Button
         import datetime
@@ -184,7 +870,16 @@ class PathFinder:
         MAX_CACHE = 100
 
         cmap = ListedColormap(
-            ["white", "black", "green", "red", "#87CEFA", "#FFD700", "#FF69B4"]
+            [
+                "white",
+                "black",
+                "green",
+                "red",
+                "#87CEFA",
+                "#FFD700",
+                "#FF69B4",
+                "#D2B48C",
+            ]
         )
         legend_elements = [
             mpatches.Patch(color="green", label="Start (S)"),
@@ -193,6 +888,8 @@ class PathFinder:
             mpatches.Patch(color="#FF69B4", label="In queue"),
             mpatches.Patch(color="#FFD700", label="Final path"),
         ]
+        if self.ponderado:
+            legend_elements.append(mpatches.Patch(color="#D2B48C", label="Terrain"))
         ax.legend(
             handles=legend_elements,
             loc="center left",
@@ -202,8 +899,10 @@ class PathFinder:
         )
 
         base = np.array(self.labirinto, dtype=float)
+        # o terreno aparece numa cor só (o peso fica no custo exibido)
+        base[base > PESO_BASE] = 7
         img = ax.imshow(
-            base, cmap=cmap, vmin=0, vmax=6, alpha=0.9, animated=True, zorder=1
+            base, cmap=cmap, vmin=0, vmax=7, alpha=0.9, animated=True, zorder=1
         )
         (path_line,) = ax.plot(
             [],
@@ -237,12 +936,14 @@ class PathFinder:
                 return f"{int(round(custo))}"
             return f"{custo:.1f}"
 
-        total_frames = len(historico_exploracao) + 62
+        total_frames = len(rastro) + 62
+        reprodutor = ReprodutorRastro(rastro, base, TOP_K)
 
         # Seleciona quais custos exibir na visualização
-        def selecionar_subconjunto_de_custos(custos_dict, final_frame, caminho_final):
+        def selecionar_subconjunto_de_custos(final_frame, caminho_final):
             # Se for frame final com solução: mostra custos do caminho final
             # Caso contrário: mostra até TOP_K nós visitados com maior custo
+            custos_dict = reprodutor.custos
             if not custos_dict:
                 return {}
             if final_frame and tem_solucao and caminho_final:
@@ -250,10 +951,7 @@ class PathFinder:
                     pos: custos_dict[pos] for pos in caminho_final if pos in custos_dict
                 }
                 return subset
-            items = sorted(custos_dict.items(), key=lambda x: x[1], reverse=True)
-            if len(items) <= TOP_K:
-                return dict(items)
-            return dict(items[:TOP_K])
+            return reprodutor.maiores_custos()
 
         # Mantém cache de textos em MAX_CACHE removendo custos menores não protegidos
         def evict_remove_smallest_costs(protected_positions: set):
@@ -281,24 +979,12 @@ class PathFinder:
 
         # Atualiza cada frame da animação
         def atualizar_frame(frame):
-            matriz_visual = base.copy()
-            if frame < len(historico_exploracao):
-                _, visitados, custos_visitados, na_fila, posicoes_fila = (
-                    historico_exploracao[frame]
-                )
-                final_frame = False
-            else:
-                _, visitados, custos_visitados, na_fila, posicoes_fila = (
-                    historico_exploracao[-1]
-                )
-                final_frame = True
-
-            for r, c in visitados:
-                if matriz_visual[r, c] == 0:
-                    matriz_visual[r, c] = 4
-            for r, c in na_fila:
-                if matriz_visual[r, c] == 0:
-                    matriz_visual[r, c] = 6
+            final_frame = frame >= len(rastro)
+            # os frames finais repetem o estado da última expansão
+            reprodutor.avancar_para(min(frame, len(rastro) - 1))
+            matriz_visual = reprodutor.matriz
+            if final_frame:
+                matriz_visual = matriz_visual.copy()
 
             if final_frame and tem_solucao and caminho_final:
                 for r, c in caminho_final:
@@ -314,9 +1000,7 @@ class PathFinder:
             img.set_data(matriz_visual)
 
             # Escolhe subconjunto de custos para exibir (seleção estável)
-            subset_custos = selecionar_subconjunto_de_custos(
-                custos_visitados, final_frame, caminho_final
-            )
+            subset_custos = selecionar_subconjunto_de_custos(final_frame, caminho_final)
 
             novos = set(subset_custos.keys())
             existentes = set(textos.keys())
@@ -402,19 +1086,25 @@ class PathFinder:
         except Exception:
             plt.tight_layout()
 
+        # Exporta o rastro direto para GIF (sem renderizar a figura quadro a quadro)
+        def salvar_gif_rastro():
+            now = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+            filename = f"astar_animation_{now}.gif"
+            caminhos = [caminho_final] if tem_solucao and caminho_final else None
+            exportar_rastro(rastro, base, filename, caminhos)
+            return filename
+
+        if salvar_gif:
+            print(f"GIF salvo como '{salvar_gif_rastro()}'")
+
         # Adiciona botão Salvar GIF
         ax_button = fig.add_axes([0.83, 0.05, 0.13, 0.06])
         btn = Button(ax_button, "Salvar GIF", color="#FFD700", hovercolor="#FFEC8B")
 
         def on_save_gif(event):
-            if self.ultima_animacao is None:
-                print("Nenhuma animacao disponivel para salvar.")
-                return
-            print("Salvando animacao como GIF (isso pode demorar)...")
+            print("Salvando animacao como GIF...")
             try:
-                now = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-                filename = f"astar_animation_{now}.gif"
-                self.ultima_animacao.save(filename, writer="pillow", fps=12, dpi=80)
+                filename = salvar_gif_rastro()
                 print(f"GIF salvo como '{filename}'")
                 # Aviso visual no Matplotlib
                 ax.text(
@@ -0,0 +1,167 @@
+import heapq
+import math
+from array import array
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from estatisticas import EstatisticasBusca
+
+EPSILON = 1e-9
+
+
+class PlanejadorIncremental:
+    # Replanejamento incremental com Lifelong Planning A* (LPA*, Koenig & Likhachev).
+    # O estado da busca (g, rhs e a fila) é mantido entre consultas; a cada célula
+    # editada só os vértices afetados voltam para a fila, em vez de refazer o A* inteiro.
+    # Mesma vizinhança, custos e heurística do PathFinder, sobre índices planos com borda.
+    def __init__(self, labirinto: List[List[int]], diagonal: bool = False):
+        self.labirinto = labirinto
+        self.linhas = len(labirinto)
+        self.colunas = len(labirinto[0]) if self.linhas else 0
+        self.diagonal = diagonal
+        self.largura = self.colunas + 2
+        livre = np.zeros((self.linhas + 2, self.largura), dtype=np.uint8)
+        if self.linhas and self.colunas:
+            livre[1:-1, 1:-1] = np.asarray(labirinto) != 1
+        self.livre = bytearray(livre.tobytes())
+        direcoes = [(0, 1), (1, 0), (0, -1), (-1, 0)]
+        if diagonal:
+            direcoes.extend([(1, 1), (1, -1), (-1, 1), (-1, -1)])
+        raiz2 = math.sqrt(2)
+        self.vizinhanca = [
+            (dx * self.largura + dy, raiz2 if abs(dx) + abs(dy) == 2 else 1)
+            for dx, dy in direcoes
+        ]
+        self.inicio = None
+        self.fim = None
+        self.origem = -1
+        self.destino = -1
+        self.g = None
+        self.rhs = None
+        self.fila = []
+        # tempo (ms) e vértices expandidos na última consulta, e os tempos por fase
+        self.last_elapsed_ms: float = 0.0
+        self.last_expandidos: int = 0
+        self.estatisticas = EstatisticasBusca()
+
+    # Define S e E; se algum mudar, a busca recomeça do zero (as chaves dependem de E)
+    def definir_extremos(self, inicio: Tuple[int, int], fim: Tuple[int, int]):
+        inicio, fim = tuple(inicio), tuple(fim)
+        if inicio == self.inicio and fim == self.fim:
+            return
+        self.inicio = inicio
+        self.fim = fim
+        self.origem = (inicio[0] + 1) * self.largura + inicio[1] + 1
+        self.destino = (fim[0] + 1) * self.largura + fim[1] + 1
+        self.reiniciar()
+
+    def reiniciar(self):
+        total = len(self.livre)
+        self.g = array("d", [math.inf]) * total
+        self.rhs = array("d", [math.inf]) * total
+        self.rhs[self.origem] = 0.0
+        self.fila = [self._chave(self.origem) + (self.origem,)]
+
+    # Avisa que a célula (x, y) do labirinto foi editada. Só a passagem livre/parede
+    # importa; se ela mudou, a célula e seus vizinhos são reavaliados.
+    def notificar_alteracao(self, x: int, y: int):
+        u = (x + 1) * self.largura + y + 1
+        livre = 1 if self.labirinto[x][y] != 1 else 0
+        if self.livre[u] == livre:
+            return
+        self.livre[u] = livre
+        if self.g is None:
+            return
+        self._atualizar_vertice(u)
+        for deslocamento, _ in self.vizinhanca:
+            if self.livre[u + deslocamento]:
+                self._atualizar_vertice(u + deslocamento)
+
+    def _heuristica(self, u: int) -> float:
+        x, y = divmod(u, self.largura)
+        dx = abs(x - self.fim[0] - 1)
+        dy = abs(y - self.fim[1] - 1)
+        if self.diagonal:
+            return math.sqrt(dx * dx + dy * dy)
+        return dx + dy
+
+    def _chave(self, u: int) -> Tuple[float, float]:
+        m = min(self.g[u], self.rhs[u])
+        return (m + self._heuristica(u), m)
+
+    # rhs = melhor custo via um predecessor; vértices inconsistentes (g != rhs) vão
+    # para a fila. Entradas antigas ficam no heap e são descartadas ao sair.
+    def _atualizar_vertice(self, u: int):
+        g, rhs, livre = self.g, self.rhs, self.livre
+        if u != self.origem:
+            melhor = math.inf
+            if livre[u]:
+                for deslocamento, custo in self.vizinhanca:
+                    p = u - deslocamento
+                    if livre[p] and g[p] + custo < melhor:
+                        melhor = g[p] + custo
+            rhs[u] = melhor
+        if g[u] != rhs[u]:
+            heapq.heappush(self.fila, self._chave(u) + (u,))
+
+    def _calcular_caminho_minimo(self) -> int:
+        g, rhs, livre, fila = self.g, self.rhs, self.livre, self.fila
+        destino = self.destino
+        pop = heapq.heappop
+        expandidos = 0
+        while fila:
+            k1, k2, u = fila[0]
+            if g[u] == rhs[u] or (k1, k2) != self._chave(u):
+                pop(fila)
+                continue
+            if rhs[destino] == g[destino]:
+                # com a heurística euclidiana, somas iguais podem diferir no último bit;
+                # empates no primeiro termo (dentro de EPSILON) seguem para o segundo
+                d1, d2 = self._chave(destino)
+                if k1 > d1 + EPSILON or (k1 >= d1 - EPSILON and k2 >= d2):
+                    break
+            pop(fila)
+            expandidos += 1
+            if g[u] > rhs[u]:
+                g[u] = rhs[u]
+            else:
+                g[u] = math.inf
+                self._atualizar_vertice(u)
+            for deslocamento, _ in self.vizinhanca:
+                v = u + deslocamento
+                if livre[v]:
+                    self._atualizar_vertice(v)
+        return expandidos
+
+    # Caminho mínimo atual de S até E (None se não houver), reaproveitando a busca anterior
+    def caminho(self) -> Optional[List[Tuple[int, int]]]:
+        if self.g is None:
+            raise ValueError("Defina início e fim com definir_extremos")
+        estatisticas = self.estatisticas = EstatisticasBusca()
+        self.last_expandidos = self._calcular_caminho_minimo()
+        estatisticas.marcar("busca")
+        caminho = None
+        if self.livre[self.origem] and self.g[self.destino] < math.inf:
+            caminho = self._reconstruir_caminho()
+        estatisticas.marcar("reconstrucao")
+        estatisticas.concluir(self.last_expandidos)
+        self.last_elapsed_ms = estatisticas.total_ms
+        return caminho
+
+    # Volta de E até S escolhendo sempre o predecessor com menor g + custo da aresta
+    def _reconstruir_caminho(self) -> List[Tuple[int, int]]:
+        g, livre, largura = self.g, self.livre, self.largura
+        caminho = [self.fim]
+        u = self.destino
+        while u != self.origem:
+            melhor, anterior = math.inf, -1
+            for deslocamento, custo in self.vizinhanca:
+                p = u - deslocamento
+                if livre[p] and g[p] + custo < melhor:
+                    melhor, anterior = g[p] + custo, p
+            u = anterior
+            x, y = divmod(u, largura)
+            caminho.append((x - 1, y - 1))
+        caminho.reverse()
+        return caminho
@@ -0,0 +1,129 @@
+import heapq
+import math
+from array import array
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+# Tipos de evento do rastro
+EXPANDIR = 0
+DESCOBRIR = 1
+EMPILHAR = 2
+DESEMPILHAR = 3
+
+
+class RastroBusca:
+    # Registro incremental da exploração: em vez de copiar visitados/custos/fila a cada
+    # passo, guarda apenas os eventos (tipo, célula, custo) em vetores append-only.
+    # Cada evento EXPANDIR fecha um frame da animação.
+    def __init__(self, colunas: int):
+        self.colunas = colunas
+        self.tipos = array("b")
+        self.celulas = array("i")
+        self.custos = array("d")
+        self.total_expandidos = 0
+
+    def _registrar(self, tipo: int, pos: Tuple[int, int], custo: float):
+        self.tipos.append(tipo)
+        self.celulas.append(pos[0] * self.colunas + pos[1])
+        self.custos.append(custo)
+
+    # Célula retirada para expansão (custo opcional: A* informa o custo g final)
+    def expandir(self, pos: Tuple[int, int], custo: float = math.nan):
+        self._registrar(EXPANDIR, pos, custo)
+        self.total_expandidos += 1
+
+    # Célula alcançada pela primeira vez, com seu custo
+    def descobrir(self, pos: Tuple[int, int], custo: float):
+        self._registrar(DESCOBRIR, pos, custo)
+
+    def empilhar(self, pos: Tuple[int, int]):
+        self._registrar(EMPILHAR, pos, math.nan)
+
+    def desempilhar(self, pos: Tuple[int, int]):
+        self._registrar(DESEMPILHAR, pos, math.nan)
+
+    # Número de frames (uma expansão por frame)
+    def __len__(self) -> int:
+        return self.total_expandidos
+
+
+class ReprodutorRastro:
+    # Reconstrói o estado de cada frame aplicando os eventos do rastro em ordem.
+    # Avançar é incremental; voltar (repetição da animação) reinicia do começo.
+    def __init__(self, rastro: RastroBusca, base: np.ndarray, top_k: int):
+        self.rastro = rastro
+        self.base = base
+        self.top_k = top_k
+        self.reiniciar()
+
+    def reiniciar(self):
+        self.matriz = self.base.copy()
+        self._livre_na_base = self.base.reshape(-1) == 0
+        self._visitado = np.zeros(self.base.size, dtype=bool)
+        self._na_fila = np.zeros(self.base.size, dtype=np.int32)
+        self.custos: Dict[Tuple[int, int], float] = {}
+        # min-heap com os TOP_K maiores custos: (custo, -ordem, pos); em empates
+        # permanecem os inseridos primeiro, como na ordenação estável original
+        self._maiores: List[Tuple[float, int, Tuple[int, int]]] = []
+        self._ordem = 0
+        self._evento = 0
+        self.frame = -1
+
+    def _marcar_visitado(self, celula: int, custo: float):
+        plano = self.matriz.reshape(-1)
+        if not self._visitado[celula]:
+            self._visitado[celula] = True
+            if self._livre_na_base[celula]:
+                plano[celula] = 4
+        if math.isnan(custo):
+            return
+        pos = divmod(celula, self.rastro.colunas)
+        self.custos[pos] = custo
+        chave = (custo, -self._ordem, pos)
+        self._ordem += 1
+        if len(self._maiores) < self.top_k:
+            heapq.heappush(self._maiores, chave)
+        elif chave > self._maiores[0]:
+            heapq.heapreplace(self._maiores, chave)
+
+    # Aplica os eventos até o frame pedido (inclusive); além do último frame aplica tudo
+    def avancar_para(self, frame: int):
+        if frame < self.frame:
+            self.reiniciar()
+        tipos = self.rastro.tipos
+        celulas = self.rastro.celulas
+        custos = self.rastro.custos
+        plano = self.matriz.reshape(-1)
+        total_eventos = len(tipos)
+        while self._evento < total_eventos and self.frame < frame:
+            tipo = tipos[self._evento]
+            celula = celulas[self._evento]
+            if tipo == EXPANDIR:
+                self._marcar_visitado(celula, custos[self._evento])
+                self.frame += 1
+                # eventos seguintes pertencem ao próximo frame
+                if self.frame == frame:
+                    self._evento += 1
+                    break
+            elif tipo == DESCOBRIR:
+                self._marcar_visitado(celula, custos[self._evento])
+            elif tipo == EMPILHAR:
+                self._na_fila[celula] += 1
+                if self._livre_na_base[celula] and not self._visitado[celula]:
+                    plano[celula] = 6
+            else:
+                self._na_fila[celula] -= 1
+                if (
+                    self._na_fila[celula] == 0
+                    and self._livre_na_base[celula]
+                    and not self._visitado[celula]
+                ):
+                    plano[celula] = 0
+            self._evento += 1
+        self.frame = max(self.frame, min(frame, len(self.rastro) - 1))
+
+    # Maiores custos visitados até o frame atual, em ordem decrescente
+    def maiores_custos(self) -> Dict[Tuple[int, int], float]:
+        ordenados = sorted(self._maiores, reverse=True)
+        return {pos: custo for custo, _, pos in ordenados}
@@ -0,0 +1,322 @@
+import tkinter as tk
+from typing import List, Optional
+
+import numpy as np
+
+from terreno import PESO_BASE, PESO_MAXIMO
+
+COR_GRADE = "#bebebe"
+# Extremos do degradê do terreno: peso 1 (claro) até PESO_MAXIMO (escuro)
+TERRENO_CLARO = (0xF0, 0xE0, 0xC0)
+TERRENO_ESCURO = (0x5C, 0x3A, 0x1E)
+
+
+def _cor_terreno(peso: int) -> str:
+    t = (peso - 1) / (PESO_MAXIMO - 1)
+    return "#" + "".join(
+        f"{round(a + (b - a) * t):02x}" for a, b in zip(TERRENO_CLARO, TERRENO_ESCURO)
+    )
+
+
+# Cores por valor de célula (0 livre, 1 parede, 2 início, 3 fim, 4 visitado, 5 caminho;
+# de 6 a PESO_BASE não usados; PESO_BASE + k terreno de peso k). Valores acima do
+# último ficam com a cor mais escura.
+CORES = ["#ffffff", "#000000", "#00ff00", "#ff0000", "#add8e6", "#ffff00"]
+CORES += ["#ffffff"] * (PESO_BASE + 1 - len(CORES))
+CORES += [_cor_terreno(peso) for peso in range(1, PESO_MAXIMO + 1)]
+
+
+def _rgb(cor: str) -> List[int]:
+    return [int(cor[k : k + 2], 16) for k in (1, 3, 5)]
+
+
+PALETA = np.array([_rgb(cor) for cor in CORES], dtype=np.uint8)
+# Acima desta fração de células alteradas (da área desenhada) compensa refazer a imagem
+FRACAO_REDESENHO = 0.05
+# Maior lado (px) da imagem do RenderizadorBitmap, qualquer que seja o grid ou o zoom
+LADO_MAXIMO = 4096
+# Margem (px) desenhada além da área visível, para pequenas rolagens não refazerem a
+# imagem
+MARGEM_BITMAP = 256
+
+
+# Índices da paleta só das células [i0:i1, j0:j1]: um grid em listas não é convertido
+# inteiro a cada redesenho
+def _valores(grid, i0: int, i1: int, j0: int, j1: int) -> np.ndarray:
+    if isinstance(grid, np.ndarray):
+        valores = grid[i0:i1, j0:j1]
+    else:
+        valores = np.array([linha[j0:j1] for linha in grid[i0:i1]])
+    return np.clip(valores, 0, len(CORES) - 1).astype(np.uint8)
+
+
+# Células (i0, i1, j0, j1) visíveis no canvas, mais `margem` células de cada lado
+def _janela_visivel(
+    canvas: tk.Canvas,
+    linhas: int,
+    colunas: int,
+    tamanho: int,
+    offset_x,
+    offset_y,
+    margem: int,
+):
+    x0 = canvas.canvasx(0) - offset_x
+    y0 = canvas.canvasy(0) - offset_y
+    largura = max(1, canvas.winfo_width())
+    altura = max(1, canvas.winfo_height())
+    i0 = max(0, int(y0 // tamanho) - margem)
+    j0 = max(0, int(x0 // tamanho) - margem)
+    i1 = min(linhas, int((y0 + altura) // tamanho) + 1 + margem)
+    j1 = min(colunas, int((x0 + largura) // tamanho) + 1 + margem)
+    return i0, i1, j0, j1
+
+
+class RenderizadorBitmap:
+    # Desenha a área visível do grid (mais uma margem) numa única tk.PhotoImage em vez
+    # de um retângulo por célula. A imagem é montada por consulta à paleta no NumPy e
+    # ampliada para o tamanho de célula do zoom, com no máximo LADO_MAXIMO pixels por
+    # lado: memória e tempo dependem da tela, não do grid. Só a janela desenhada é
+    # convertida e guardada; depois só as células que mudaram nela são repintadas com
+    # PhotoImage.put, e rolar para fora da área desenhada refaz a imagem.
+    def __init__(self, canvas: tk.Canvas):
+        self.canvas = canvas
+        self.imagem = None
+        self.item = None
+        self.cell_size = 0
+        self.offset_x = 0
+        self.offset_y = 0
+        # células (i0, i1, j0, j1) presentes na imagem, o tamanho do grid e os valores
+        # da janela com que a imagem foi pintada
+        self.janela = (0, 0, 0, 0)
+        self.forma = (0, 0)
+        self._valores = None
+
+    # Sincroniza a imagem com o grid: refaz se o zoom/tamanho mudou, se a área visível
+    # saiu da imagem ou se muitas células mudaram; caso contrário repinta só as
+    # diferenças
+    def desenhar(self, grid: List[List[int]], cell_size: int, offset_x, offset_y):
+        forma = (len(grid), len(grid[0]) if len(grid) else 0)
+        geometria = (cell_size, offset_x, offset_y, forma) != (
+            self.cell_size,
+            self.offset_x,
+            self.offset_y,
+            self.forma,
+        )
+        self.cell_size, self.offset_x, self.offset_y = cell_size, offset_x, offset_y
+        self.forma = forma
+        if self.imagem is None or geometria or not self._cobre_visivel():
+            self._recriar(grid)
+            return
+        i0, i1, j0, j1 = self.janela
+        valores = _valores(grid, i0, i1, j0, j1)
+        alteradas = np.argwhere(valores != self._valores)
+        if len(alteradas) > FRACAO_REDESENHO * ((i1 - i0) * (j1 - j0)):
+            self._recriar(grid, valores)
+            return
+        self._valores = valores
+        for i, j in alteradas.tolist():
+            self._pintar(i + i0, j + j0, valores[i, j])
+
+    # Repinta uma única célula (edição com o mouse, caminho encontrado)
+    def atualizar_celula(self, i: int, j: int, valor: int):
+        if self.imagem is None:
+            return
+        valor = min(max(valor, 0), len(CORES) - 1)
+        i0, i1, j0, j1 = self.janela
+        # fora da janela não há o que repintar: a imagem refeita relê o grid
+        if i0 <= i < i1 and j0 <= j < j1 and self._valores[i - i0, j - j0] != valor:
+            self._valores[i - i0, j - j0] = valor
+            self._pintar(i, j, valor)
+
+    # (i, j) em coordenadas do grid; a imagem começa na célula (i0, j0) da janela
+    def _pintar(self, i: int, j: int, valor: int):
+        tamanho = self.cell_size
+        x0 = (j - self.janela[2]) * tamanho
+        y0 = (i - self.janela[0]) * tamanho
+        # a primeira linha/coluna de pixels de cada célula é a linha da grade
+        borda = 1 if tamanho >= 4 else 0
+        self.imagem.put(
+            CORES[valor], to=(x0 + borda, y0 + borda, x0 + tamanho, y0 + tamanho)
+        )
+
+    # Janela a desenhar: a área visível com a margem, limitada a LADO_MAXIMO pixels
+    def _janela(self, margem: int):
+        linhas, colunas = self.forma
+        tamanho = self.cell_size
+        i0, i1, j0, j1 = _janela_visivel(
+            self.canvas,
+            linhas,
+            colunas,
+            tamanho,
+            self.offset_x,
+            self.offset_y,
+            margem,
+        )
+        limite = max(1, LADO_MAXIMO // tamanho)
+        i0 = min(i0, linhas - 1)
+        j0 = min(j0, colunas - 1)
+        i1 = max(i0 + 1, min(i1, i0 + limite))
+        j1 = max(j0 + 1, min(j1, j0 + limite))
+        return i0, i1, j0, j1
+
+    def _cobre_visivel(self) -> bool:
+        i0, i1, j0, j1 = self._janela(0)
+        a0, a1, b0, b1 = self.janela
+        return a0 <= i0 and i1 <= a1 and b0 <= j0 and j1 <= b1
+
+    # Refaz a imagem na janela atual; `valores` reaproveita a conversão já feita pelo
+    # chamador quando a janela não mudou
+    def _recriar(self, grid: List[List[int]], valores: Optional[np.ndarray] = None):
+        tamanho = self.cell_size
+        janela = self._janela(MARGEM_BITMAP // tamanho + 1)
+        if valores is None or janela != self.janela:
+            valores = _valores(grid, *janela)
+        i0, i1, j0, j1 = self.janela = janela
+        self._valores = valores
+        self.imagem = tk.PhotoImage(
+            master=self.canvas,
+            data=rasterizar(valores, tamanho),
+            format="PPM",
+        )
+        x = self.offset_x + j0 * tamanho
+        y = self.offset_y + i0 * tamanho
+        if self.item is None:
+            self.item = self.canvas.create_image(x, y, image=self.imagem, anchor=tk.NW)
+        else:
+            self.canvas.itemconfig(self.item, image=self.imagem)
+            self.canvas.coords(self.item, x, y)
+
+    # Rolar para fora da área desenhada refaz a imagem na nova posição
+    def rolar(self, grid: List[List[int]]):
+        if self.imagem is not None and not self._cobre_visivel():
+            self._recriar(grid)
+
+    def limpar(self):
+        if self.item is not None:
+            self.canvas.delete(self.item)
+        self.item = None
+        self.imagem = None
+        self._valores = None
+
+
+class RenderizadorVirtual:
+    # Canvas virtualizado: só existem retângulos para as células da área visível (mais
+    # uma margem). Ao rolar, os itens das células que saíram da janela são reciclados
+    # para as que entraram; memória e tempo de redesenho dependem do tamanho da tela,
+    # não do grid.
+    MARGEM = 2
+
+    def __init__(self, canvas: tk.Canvas):
+        self.canvas = canvas
+        self.cell_size = 0
+        self.offset_x = 0
+        self.offset_y = 0
+        # (i, j) -> item do canvas, e o valor com que cada célula foi pintada
+        self.itens = {}
+        self.pintado = {}
+        self.livres = []
+
+    def desenhar(self, grid: List[List[int]], cell_size: int, offset_x, offset_y):
+        if (cell_size, offset_x, offset_y) != (
+            self.cell_size,
+            self.offset_x,
+            self.offset_y,
+        ):
+            # geometria mudou (zoom/redimensionamento): todos os itens são reposicionados
+            self.cell_size = cell_size
+            self.offset_x = offset_x
+            self.offset_y = offset_y
+            self.livres.extend(self.itens.values())
+            self.itens.clear()
+            self.pintado.clear()
+        self._sincronizar(grid, True)
+
+    # Após rolar: só as células que entraram na janela recebem itens
+    def rolar(self, grid: List[List[int]]):
+        if self.cell_size:
+            self._sincronizar(grid, False)
+
+    def atualizar_celula(self, i: int, j: int, valor: int):
+        item = self.itens.get((i, j))
+        if item is not None and self.pintado[(i, j)] != valor:
+            self.pintado[(i, j)] = valor
+            self.canvas.itemconfig(item, fill=cor_celula(valor))
+
+    def _janela(self, linhas: int, colunas: int):
+        return _janela_visivel(
+            self.canvas,
+            linhas,
+            colunas,
+            self.cell_size,
+            self.offset_x,
+            self.offset_y,
+            self.MARGEM,
+        )
+
+    def _sincronizar(self, grid: List[List[int]], recolorir: bool):
+        canvas = self.canvas
+        linhas = len(grid)
+        colunas = len(grid[0]) if linhas else 0
+        i0, i1, j0, j1 = self._janela(linhas, colunas)
+        for chave in [
+            c for c in self.itens if not (i0 <= c[0] < i1 and j0 <= c[1] < j1)
+        ]:
+            self.livres.append(self.itens.pop(chave))
+            del self.pintado[chave]
+        # itens soltos de uma geometria anterior já não estão no lugar certo
+        reposicionar = set(self.livres)
+        tamanho = self.cell_size
+        for i in range(i0, i1):
+            linha = grid[i]
+            y = i * tamanho + self.offset_y
+            for j in range(j0, j1):
+                valor = linha[j]
+                item = self.itens.get((i, j))
+                if item is None:
+                    x = j * tamanho + self.offset_x
+                    if self.livres:
+                        item = self.livres.pop()
+                        canvas.coords(item, x, y, x + tamanho, y + tamanho)
+                        canvas.itemconfig(item, fill=cor_celula(valor), state=tk.NORMAL)
+                        reposicionar.discard(item)
+                    else:
+                        item = canvas.create_rectangle(
+                            x,
+                            y,
+                            x + tamanho,
+                            y + tamanho,
+                            fill=cor_celula(valor),
+                            outline="gray",
+                        )
+                    self.itens[(i, j)] = item
+                    self.pintado[(i, j)] = valor
+                elif recolorir and self.pintado[(i, j)] != valor:
+                    self.pintado[(i, j)] = valor
+                    canvas.itemconfig(item, fill=cor_celula(valor))
+        # sobras ficam escondidas até a próxima rolagem
+        for item in reposicionar:
+            canvas.itemconfig(item, state=tk.HIDDEN)
+
+    def limpar(self):
+        for item in list(self.itens.values()) + self.livres:
+            self.canvas.delete(item)
+        self.itens.clear()
+        self.pintado.clear()
+        self.livres = []
+
+
+def cor_celula(valor: int) -> str:
+    return CORES[min(max(valor, 0), len(CORES) - 1)]
+
+
+# Converte a matriz de valores numa imagem PPM binária (P6) com cell_size pixels por
+# célula e a linha da grade no topo/esquerda de cada célula
+def rasterizar(valores: np.ndarray, cell_size: int) -> bytes:
+    rgb = PALETA[valores]
+    rgb = np.repeat(np.repeat(rgb, cell_size, axis=0), cell_size, axis=1)
+    if cell_size >= 4:
+        rgb[::cell_size, :, :] = _rgb(COR_GRADE)
+        rgb[:, ::cell_size, :] = _rgb(COR_GRADE)
+    altura, largura = rgb.shape[:2]
+    cabecalho = f"P6 {largura} {altura} 255\n".encode("ascii")
+    return cabecalho + np.ascontiguousarray(rgb).tobytes()
@@ -0,0 +1,51 @@
+from typing import Optional
+
+import numpy as np
+
+# Terreno com custo: o valor PESO_BASE + k (k >= 1) é uma célula livre cujo custo de
+# entrada é k (k·√2 na diagonal). As demais células livres (0, S, E e as marcações
+# 4/5) custam 1; 1 continua sendo parede. O editor pinta pesos de 2 a PESO_MAXIMO.
+PESO_BASE = 10
+PESO_MAXIMO = 9
+
+
+# Valor de célula que representa o peso dado (peso 1 é a célula livre comum)
+def valor_do_peso(peso: int) -> int:
+    if not 1 <= peso <= PESO_MAXIMO:
+        raise ValueError(f"Peso deve estar entre 1 e {PESO_MAXIMO}: {peso}")
+    return 0 if peso == 1 else PESO_BASE + peso
+
+
+def eh_terreno(valor: int) -> bool:
+    return valor > PESO_BASE
+
+
+# Custo de entrar numa célula livre
+def peso_da_celula(valor: int) -> int:
+    return valor - PESO_BASE if valor > PESO_BASE else 1
+
+
+def tem_terreno(grid) -> bool:
+    if isinstance(grid, np.ndarray):
+        return grid.size > 0 and int(grid.max()) > PESO_BASE
+    return any(max(linha, default=0) > PESO_BASE for linha in grid)
+
+
+# Custo de entrada de cada célula (float; inf nas paredes)
+def mapa_de_pesos(grid) -> np.ndarray:
+    valores = np.asarray(grid)
+    pesos = np.ones(valores.shape, dtype=np.float64)
+    terreno = valores > PESO_BASE
+    pesos[terreno] = valores[terreno].astype(np.float64) - PESO_BASE
+    pesos[valores == 1] = np.inf
+    return pesos
+
+
+# Menor custo de entrada entre as células livres fora S e E (que custam sempre 1 e
+# são tratadas à parte pela heurística); 1 se não houver nenhuma
+def custo_minimo(grid, pesos: Optional[np.ndarray] = None) -> float:
+    valores = np.asarray(grid)
+    if pesos is None:
+        pesos = mapa_de_pesos(valores)
+    comuns = pesos[(valores != 2) & (valores != 3) & (valores != 1)]
+    return float(comuns.min()) if comuns.size else 1.0
@@ -0,0 +1,556 @@
+import heapq
+import math
+import random
+import unittest
+from collections import deque
+
+import numpy as np
+from campo_distancias import CampoDistancias
+from floodfill import FloodFill
+from geradores import gerar
+from hpa import TAMANHO_CLUSTER
+from pathfinder import PathFinder
+from terreno import peso_da_celula, valor_do_peso
+
+SEMENTES = range(8)
+DENSIDADES = (0.15, 0.3, 0.4)
+SEM_SOLUCAO = [
+    [2, 0, 1, 0],
+    [0, 0, 1, 0],
+    [1, 1, 1, 3],
+]
+
+
+# Labirinto aleatório reproduzível (list of lists) com S e E na maior região livre
+def labirinto(semente, densidade=0.3, linhas=30, colunas=40):
+    return gerar(
+        "densidade",
+        linhas,
+        colunas,
+        densidade=densidade,
+        semente=semente,
+        extremos=True,
+    ).tolist()
+
+
+# Labirinto com S e vários E em células livres sorteadas
+def labirinto_com_fins(semente, n_fins=6):
+    rng = random.Random(semente)
+    grid = labirinto(semente, 0.3)
+    livres = [
+        (i, j)
+        for i, linha in enumerate(grid)
+        for j, valor in enumerate(linha)
+        if valor == 0
+    ]
+    for x, y in rng.sample(livres, n_fins):
+        grid[x][y] = 3
+    return grid
+
+
+def copia(grid):
+    return [linha[:] for linha in grid]
+
+
+# Custo de um caminho: cada passo custa 1 (√2 na diagonal)
+def custo(caminho):
+    return sum(
+        math.sqrt(2) if abs(x1 - x0) + abs(y1 - y0) == 2 else 1
+        for (x0, y0), (x1, y1) in zip(caminho, caminho[1:])
+    )
+
+
+# Distâncias em passos (4 vizinhos) a partir de várias origens, por BFS simples
+def distancias_bfs(grid, origens):
+    linhas, colunas = len(grid), len(grid[0])
+    dist = {tuple(o): 0 for o in origens}
+    fila = deque(dist)
+    while fila:
+        x, y = fila.popleft()
+        for dx, dy in ((0, 1), (1, 0), (0, -1), (-1, 0)):
+            nx, ny = x + dx, y + dy
+            if (
+                0 <= nx < linhas
+                and 0 <= ny < colunas
+                and grid[nx][ny] != 1
+                and (nx, ny) not in dist
+            ):
+                dist[(nx, ny)] = dist[(x, y)] + 1
+                fila.append((nx, ny))
+    return dist
+
+
+# Custo de um caminho com terreno: cada passo custa 1 (√2 na diagonal) vezes o peso
+# da célula de destino
+def custo_ponderado(grid, caminho):
+    return sum(
+        (math.sqrt(2) if abs(x1 - x0) + abs(y1 - y0) == 2 else 1)
+        * peso_da_celula(grid[x1][y1])
+        for (x0, y0), (x1, y1) in zip(caminho, caminho[1:])
+    )
+
+
+# Custo mínimo de inicio a fim por um Dijkstra simples, sem heurística (inf se não
+# houver caminho)
+def dijkstra(grid, inicio, fim, diagonal):
+    direcoes = [(0, 1), (1, 0), (0, -1), (-1, 0)]
+    if diagonal:
+        direcoes += [(1, 1), (1, -1), (-1, 1), (-1, -1)]
+    dist = {inicio: 0.0}
+    fila = [(0.0, inicio)]
+    while fila:
+        d, (x, y) = heapq.heappop(fila)
+        if (x, y) == fim:
+            return d
+        if d > dist[(x, y)]:
+            continue
+        for dx, dy in direcoes:
+            nx, ny = x + dx, y + dy
+            if not livre(grid, nx, ny):
+                continue
+            passo = math.sqrt(2) if dx and dy else 1
+            novo = d + passo * peso_da_celula(grid[nx][ny])
+            if novo < dist.get((nx, ny), math.inf):
+                dist[(nx, ny)] = novo
+                heapq.heappush(fila, (novo, (nx, ny)))
+    return math.inf
+
+
+# Labirinto com terreno: cada célula livre vira, com probabilidade `fracao`, terreno
+# de peso sorteado entre 2 e 9 (com fracao=1 o custo_minimo passa de 1)
+def labirinto_com_terreno(semente, fracao=0.4):
+    rng = random.Random(semente)
+    grid = labirinto(semente, 0.2)
+    for linha in grid:
+        for j, valor in enumerate(linha):
+            if valor == 0 and rng.random() < fracao:
+                linha[j] = valor_do_peso(rng.randint(2, 9))
+    return grid
+
+
+def livre(grid, x, y):
+    return 0 <= x < len(grid) and 0 <= y < len(grid[0]) and grid[x][y] != 1
+
+
+# Comprimento da passagem (pares de células livres dos dois lados da borda, dentro do
+# mesmo cluster) por onde o passo ortogonal a -> b muda de cluster
+def comprimento_passagem(grid, a, b, tamanho):
+    (x0, y0), (x1, y1) = a, b
+    posicao = x0 if x0 == x1 else y0
+
+    def par(k):
+        if x0 == x1:
+            return livre(grid, k, y0) and livre(grid, k, y1)
+        return livre(grid, x0, k) and livre(grid, x1, k)
+
+    comprimento = 1
+    for passo in (-1, 1):
+        k = posicao + passo
+        while k // tamanho == posicao // tamanho and par(k):
+            comprimento += 1
+            k += passo
+    return comprimento
+
+
+# Desvio máximo do HPA* (sem espacamento) sobre um caminho ótimo, como documentado em
+# PlanejadorHPA: o comprimento da passagem por travessia de borda, mais 1 em cada
+# travessia diagonal. None se uma diagonal corta a quina entre duas paredes ou
+# atravessa dois clusters de uma vez.
+def desvio_maximo_hpa(grid, caminho, tamanho=TAMANHO_CLUSTER):
+    total = 0
+    for a, b in zip(caminho, caminho[1:]):
+        ca = (a[0] // tamanho, a[1] // tamanho)
+        cb = (b[0] // tamanho, b[1] // tamanho)
+        if ca == cb:
+            continue
+        if abs(b[0] - a[0]) + abs(b[1] - a[1]) == 1:
+            total += comprimento_passagem(grid, a, b, tamanho)
+            continue
+        if ca[0] != cb[0] and ca[1] != cb[1]:
+            return None
+        opcoes = []
+        for m in ((a[0], b[1]), (b[0], a[1])):
+            if livre(grid, *m):
+                # a -> m -> b: só um dos dois passos atravessa a borda
+                if (m[0] // tamanho, m[1] // tamanho) == ca:
+                    opcoes.append(comprimento_passagem(grid, m, b, tamanho) + 1)
+                else:
+                    opcoes.append(comprimento_passagem(grid, a, m, tamanho) + 1)
+        if not opcoes:
+            return None
+        total += min(opcoes)
+    return total
+
+
+class TestFloodFill(unittest.TestCase):
+
+    # Caminho de 4 vizinhos, sem paredes, de S até o fim
+    def assertCaminhoBfs(self, grid, caminho, inicio, fim):
+        self.assertEqual(caminho[0], inicio)
+        self.assertEqual(caminho[-1], fim)
+        for (x0, y0), (x1, y1) in zip(caminho, caminho[1:]):
+            self.assertEqual(abs(x1 - x0) + abs(y1 - y0), 1)
+            self.assertNotEqual(grid[x1][y1], 1)
+
+    def test_motores_alcancam_todos_os_fins_pelo_menor_caminho(self):
+        for semente in SEMENTES:
+            grid = labirinto_com_fins(semente)
+            for motor in ("padrao", "numpy"):
+                with self.subTest(semente=semente, motor=motor):
+                    floodfill = FloodFill(copia(grid), motor=motor)
+                    caminhos = floodfill.buscar_caminho()
+                    dist = distancias_bfs(grid, [floodfill.inicio])
+                    alcancaveis = {fim for fim in floodfill.fins if fim in dist}
+                    self.assertEqual(set(caminhos), alcancaveis)
+                    for fim, caminho in caminhos.items():
+                        self.assertEqual(len(caminho) - 1, dist[fim])
+                        self.assertCaminhoBfs(grid, caminho, floodfill.inicio, fim)
+
+    # O motor numpy consome a fronteira na ordem do padrão: os caminhos são os
+    # mesmos, também com o labirinto num array
+    def test_motor_numpy_igual_ao_padrao(self):
+        for semente in SEMENTES:
+            with self.subTest(semente=semente):
+                grid = labirinto_com_fins(semente)
+                referencia = FloodFill(copia(grid)).buscar_caminho()
+                numpy = FloodFill(copia(grid), motor="numpy").buscar_caminho()
+                self.assertEqual(numpy, referencia)
+                array = FloodFill(np.array(grid, dtype=np.uint8)).buscar_caminho()
+                self.assertEqual(array, referencia)
+
+    def test_sem_solucao(self):
+        for motor in ("padrao", "numpy"):
+            with self.subTest(motor=motor):
+                self.assertEqual(
+                    FloodFill(copia(SEM_SOLUCAO), motor=motor).buscar_caminho(), {}
+                )
+
+    # Parar ao alcançar todos os fins não muda os caminhos encontrados
+    def test_parada_antecipada_igual_a_busca_completa(self):
+        for semente in SEMENTES:
+            grid = labirinto_com_fins(semente)
+            referencia = FloodFill(copia(grid)).buscar_caminho()
+            for motor in ("padrao", "numpy"):
+                with self.subTest(semente=semente, motor=motor):
+                    floodfill = FloodFill(copia(grid), motor=motor)
+                    caminhos = floodfill.buscar_caminho(todos_encontrados=True)
+                    self.assertEqual(caminhos, referencia)
+
+    def test_arvore_igual_a_buscar_alvos(self):
+        for semente in SEMENTES:
+            with self.subTest(semente=semente):
+                grid = labirinto_com_fins(semente)
+                caminhos = FloodFill(copia(grid)).buscar_alvos()
+                arvore = FloodFill(copia(grid)).arvore_caminhos()
+                self.assertEqual(set(arvore.alcancados), set(caminhos))
+                for fim, caminho in caminhos.items():
+                    self.assertEqual(arvore.caminho(fim), caminho)
+                    self.assertEqual(arvore.distancia(fim), len(caminho) - 1)
+
+    # Sem alvo livre não há o que buscar: nenhuma célula é expandida
+    def test_alvos_vazios_ou_em_paredes(self):
+        grid = labirinto(0)
+        paredes = [
+            (i, j)
+            for i, linha in enumerate(grid)
+            for j, valor in enumerate(linha)
+            if valor == 1
+        ]
+        for alvos in ([], paredes[:5]):
+            with self.subTest(alvos=alvos):
+                floodfill = FloodFill(copia(grid))
+                self.assertEqual(floodfill.buscar_alvos(alvos), {})
+                self.assertEqual(floodfill.last_expandidos, 0)
+
+    def test_alvo_fora_do_labirinto(self):
+        grid = labirinto(0)
+        for alvo in ((-1, 0), (0, -1), (len(grid), 0), (0, len(grid[0]))):
+            with self.subTest(alvo=alvo):
+                with self.assertRaises(ValueError):
+                    FloodFill(copia(grid)).buscar_alvos([alvo])
+
+
+class TestCampoDistancias(unittest.TestCase):
+
+    def test_igual_a_bfs_de_varias_origens(self):
+        for semente in SEMENTES:
+            with self.subTest(semente=semente):
+                grid = labirinto_com_fins(semente)
+                fins = [
+                    (i, j)
+                    for i, linha in enumerate(grid)
+                    for j, valor in enumerate(linha)
+                    if valor == 3
+                ]
+                campo = CampoDistancias(grid)
+                dist = distancias_bfs(grid, fins)
+                for i in range(len(grid)):
+                    for j in range(len(grid[0])):
+                        self.assertEqual(campo.distancia((i, j)), dist.get((i, j), -1))
+                for i, j in list(dist)[::7]:
+                    caminho = campo.caminho((i, j))
+                    self.assertEqual(len(caminho) - 1, dist[(i, j)])
+                    self.assertIn(caminho[-1], fins)
+                    for (x0, y0), (x1, y1) in zip(caminho, caminho[1:]):
+                        self.assertEqual(abs(x1 - x0) + abs(y1 - y0), 1)
+                        self.assertNotEqual(grid[x1][y1], 1)
+
+    # Depois de invalidar, a consulta seguinte enxerga o labirinto editado
+    def test_invalidar(self):
+        grid = labirinto_com_fins(0)
+        campo = CampoDistancias(grid)
+        campo.distancia((0, 0))
+        fim = next(
+            (i, j)
+            for i, linha in enumerate(grid)
+            for j, v in enumerate(linha)
+            if v == 3
+        )
+        grid[fim[0]][fim[1]] = 1
+        campo.invalidar()
+        self.assertEqual(campo.distancia(fim), -1)
+
+
+class TestEstatisticas(unittest.TestCase):
+
+    # O BFS completo expande cada célula alcançável uma vez e gera todos os seus
+    # vizinhos livres, inclusive os já visitados
+    def test_gerados_contam_todos_os_sucessores(self):
+        for semente in SEMENTES[:4]:
+            grid = labirinto_com_fins(semente)
+            for motor in ("padrao", "numpy"):
+                with self.subTest(semente=semente, motor=motor):
+                    floodfill = FloodFill(copia(grid), motor=motor)
+                    floodfill.estatisticas_detalhadas = True
+                    floodfill.buscar_caminho()
+                    estatisticas = floodfill.estatisticas
+                    alcancaveis = distancias_bfs(grid, [floodfill.inicio])
+                    vizinhos = sum(
+                        livre(grid, x + dx, y + dy)
+                        for x, y in alcancaveis
+                        for dx, dy in ((0, 1), (1, 0), (0, -1), (-1, 0))
+                    )
+                    self.assertEqual(estatisticas.expandidos, len(alcancaveis))
+                    self.assertEqual(estatisticas.gerados, vizinhos)
+                    self.assertEqual(estatisticas.insercoes, len(alcancaveis))
+
+    def test_contadores_da_fila_coerentes(self):
+        grid = labirinto(2)
+        for modo in ("padrao", "array", "dial", "bidirecional", "jps"):
+            for diagonal in (False, True):
+                with self.subTest(modo=modo, diagonal=diagonal):
+                    pathfinder = PathFinder(copia(grid), diagonal, modo=modo)
+                    pathfinder.estatisticas_detalhadas = True
+                    pathfinder.a_estrela()
+                    estatisticas = pathfinder.estatisticas
+                    self.assertEqual(
+                        estatisticas.remocoes,
+                        estatisticas.expandidos + estatisticas.obsoletos,
+                    )
+                    # toda inserção fora as raízes vem de um sucessor gerado
+                    raizes = 2 if modo == "bidirecional" else 1
+                    self.assertLessEqual(
+                        estatisticas.insercoes - raizes, estatisticas.gerados
+                    )
+
+    # Sem detalhado (ou num motor sem fila única, como o HPA*) os contadores ficam
+    # None e aparecem como não medidos, nunca como 0
+    def test_campos_nao_medidos(self):
+        grid = labirinto(2)
+        for modo, detalhado in (("array", False), ("hpa", True)):
+            with self.subTest(modo=modo, detalhado=detalhado):
+                pathfinder = PathFinder(copia(grid), True, modo=modo)
+                pathfinder.estatisticas_detalhadas = detalhado
+                pathfinder.a_estrela()
+                estatisticas = pathfinder.estatisticas
+                self.assertIsNone(estatisticas.gerados)
+                self.assertIsNone(estatisticas.insercoes)
+                self.assertIsNone(estatisticas.remocoes)
+                self.assertIn("não medido", estatisticas.relatorio())
+                self.assertNotIn("Gerados", estatisticas.resumo())
+                self.assertNotIn("gerados", estatisticas.como_dicionario())
+                self.assertEqual(estatisticas.pico_memoria_kb is not None, detalhado)
+
+
+class TestPathFinder(unittest.TestCase):
+
+    # O caminho liga inicio a fim por passos válidos (vizinhos, sem paredes)
+    def assertCaminhoValido(self, grid, caminho, inicio, fim, diagonal):
+        self.assertEqual(tuple(caminho[0]), tuple(inicio))
+        self.assertEqual(tuple(caminho[-1]), tuple(fim))
+        for (x0, y0), (x1, y1) in zip(caminho, caminho[1:]):
+            dx, dy = abs(x1 - x0), abs(y1 - y0)
+            self.assertTrue(
+                (dx, dy) in ((0, 1), (1, 0)) or (diagonal and dx == dy == 1)
+            )
+            self.assertNotEqual(grid[x1][y1], 1)
+
+    # Mesmo custo do A* padrão e caminho válido (ou nenhum caminho nos dois)
+    def comparar_com_padrao(self, pathfinder, grid):
+        referencia = PathFinder(copia(grid), pathfinder.diagonal).a_estrela()
+        caminho = pathfinder.a_estrela()
+        if referencia is None:
+            self.assertIsNone(caminho)
+            return
+        self.assertIsNotNone(caminho)
+        self.assertCaminhoValido(
+            grid, caminho, pathfinder.inicio, pathfinder.fim, pathfinder.diagonal
+        )
+        self.assertAlmostEqual(custo(caminho), custo(referencia))
+
+    # Compara um modo exato com o padrão em grids sorteados e num grid sem solução
+    def verificar_modo(self, modo):
+        for semente in SEMENTES:
+            for densidade in DENSIDADES:
+                for diagonal in (False, True):
+                    with self.subTest(
+                        semente=semente, densidade=densidade, diagonal=diagonal
+                    ):
+                        grid = labirinto(semente, densidade)
+                        pathfinder = PathFinder(copia(grid), diagonal, modo=modo)
+                        self.comparar_com_padrao(pathfinder, grid)
+        for diagonal in (False, True):
+            pathfinder = PathFinder(copia(SEM_SOLUCAO), diagonal, modo=modo)
+            self.assertIsNone(pathfinder.a_estrela())
+
+    def test_array_equivalente_ao_padrao(self):
+        self.verificar_modo("array")
+
+    def test_bidirecional_equivalente_ao_padrao(self):
+        self.verificar_modo("bidirecional")
+
+    def test_jps_equivalente_ao_padrao(self):
+        self.verificar_modo("jps")
+
+    # O HPA* não é ótimo: o caminho é válido e o custo excede o mínimo em no máximo o
+    # desvio documentado em PlanejadorHPA
+    def test_hpa_dentro_do_limite_de_desvio(self):
+        for semente in SEMENTES:
+            for densidade in DENSIDADES:
+                for diagonal in (False, True):
+                    with self.subTest(
+                        semente=semente, densidade=densidade, diagonal=diagonal
+                    ):
+                        grid = labirinto(semente, densidade, 48, 64)
+                        referencia = PathFinder(copia(grid), diagonal).a_estrela()
+                        pathfinder = PathFinder(copia(grid), diagonal, modo="hpa")
+                        caminho = pathfinder.a_estrela()
+                        if referencia is None:
+                            self.assertIsNone(caminho)
+                            continue
+                        self.assertCaminhoValido(
+                            grid, caminho, pathfinder.inicio, pathfinder.fim, diagonal
+                        )
+                        otimo = custo(referencia)
+                        self.assertGreaterEqual(custo(caminho), otimo - 1e-9)
+                        desvio = desvio_maximo_hpa(grid, referencia)
+                        if desvio is not None:
+                            self.assertLessEqual(custo(caminho), otimo + desvio + 1e-9)
+
+    # O LPA* reaproveitado após várias rodadas de edições acha o mesmo custo de um
+    # A* padrão feito do zero no labirinto editado
+    def test_incremental_depois_de_edicoes(self):
+        for semente in SEMENTES[:4]:
+            for diagonal in (False, True):
+                with self.subTest(semente=semente, diagonal=diagonal):
+                    rng = random.Random(semente)
+                    grid = labirinto(semente, 0.25)
+                    planejador = PathFinder(grid, diagonal).planejador_incremental()
+                    planejador.caminho()
+                    for _ in range(6):
+                        celulas = [
+                            (i, j)
+                            for i, linha in enumerate(grid)
+                            for j, valor in enumerate(linha)
+                            if valor in (0, 1)
+                        ]
+                        for x, y in rng.sample(celulas, 15):
+                            grid[x][y] = 1 - grid[x][y]
+                            planejador.notificar_alteracao(x, y)
+                        caminho = planejador.caminho()
+                        referencia = PathFinder(copia(grid), diagonal).a_estrela()
+                        if referencia is None:
+                            self.assertIsNone(caminho)
+                            continue
+                        self.assertCaminhoValido(
+                            grid, caminho, planejador.inicio, planejador.fim, diagonal
+                        )
+                        self.assertAlmostEqual(custo(caminho), custo(referencia))
+
+    # Com terreno o custo é comparado com um Dijkstra independente, e não com o modo
+    # padrão, que compartilha a heurística escalada por custo_minimo
+    def test_terreno_igual_a_dijkstra(self):
+        for semente in SEMENTES:
+            for fracao in (0.4, 1.0):
+                grid = labirinto_com_terreno(semente, fracao)
+                for modo in ("padrao", "array", "dial"):
+                    for diagonal in (False, True):
+                        with self.subTest(
+                            semente=semente, fracao=fracao, modo=modo, diagonal=diagonal
+                        ):
+                            pathfinder = PathFinder(copia(grid), diagonal, modo=modo)
+                            caminho = pathfinder.a_estrela()
+                            inicio, fim = pathfinder.inicio, pathfinder.fim
+                            otimo = dijkstra(grid, tuple(inicio), tuple(fim), diagonal)
+                            if otimo == math.inf:
+                                self.assertIsNone(caminho)
+                                continue
+                            self.assertCaminhoValido(
+                                grid, caminho, inicio, fim, diagonal
+                            )
+                            self.assertAlmostEqual(
+                                custo_ponderado(grid, caminho), otimo
+                            )
+
+    def test_modos_uniformes_recusam_terreno(self):
+        grid = labirinto(1)
+        i, j = next(
+            (i, j)
+            for i, linha in enumerate(grid)
+            for j, valor in enumerate(linha)
+            if valor == 0
+        )
+        grid[i][j] = valor_do_peso(3)
+        for modo in ("bidirecional", "jps", "hpa"):
+            with self.subTest(modo=modo):
+                with self.assertRaises(ValueError):
+                    PathFinder(copia(grid), True, modo=modo).a_estrela()
+
+    def test_array_aceita_ndarray(self):
+        grid = labirinto(3)
+        pathfinder = PathFinder(np.array(grid, dtype=np.uint8), True)
+        self.comparar_com_padrao(pathfinder, grid)
+
+    # As tabelas planas ficam guardadas entre buscas: edições avisadas por
+    # notificar_alteracao (ou limpar_cache) valem na busca seguinte
+    def test_edicoes_depois_da_busca(self):
+        for semente in SEMENTES:
+            with self.subTest(semente=semente):
+                rng = random.Random(semente)
+                grid = labirinto(semente, 0.25)
+                notificado = PathFinder(grid, True, modo="array")
+                limpo = PathFinder(grid, True, modo="array")
+                caminho = notificado.a_estrela()
+                limpo.a_estrela()
+                for _ in range(4):
+                    # fecha células do último caminho e abre paredes sorteadas
+                    meio = caminho[1:-1] if caminho else []
+                    paredes = [
+                        (i, j)
+                        for i, linha in enumerate(grid)
+                        for j, valor in enumerate(linha)
+                        if valor == 1
+                    ]
+                    editadas = rng.sample(meio, min(3, len(meio)))
+                    editadas += rng.sample(paredes, 3)
+                    for x, y in editadas:
+                        grid[x][y] = 1 - grid[x][y]
+                        notificado.notificar_alteracao(x, y)
+                    limpo.limpar_cache()
+                    self.comparar_com_padrao(notificado, grid)
+                    self.comparar_com_padrao(limpo, grid)
+                    caminho = notificado.a_estrela()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,4 +1,15 @@
+import math
+import os
+import tempfile
+
+import numpy as np
+
+from arquivo_labirinto import carregar_labirinto, salvar_labirinto
+from floodfill import FloodFill
+from geradores import gerar
+from hpa import PlanejadorHPA
 from pathfinder import PathFinder
+from terreno import PESO_BASE, peso_da_celula
 
 
 def teste_1_simples_sem_diagonal():
@@ -136,6 +147,157 @@ def teste_8_direto_com_diagonal():
     print()
 
 
+def teste_9_labirinto_gerado():
+    print("=== Teste 9: Labirinto perfeito gerado (semente 7, SEM diagonal) ===")
+    labirinto = gerar("labirinto", 21, 31, semente=7, extremos=True).tolist()
+
+    pathfinder = PathFinder(labirinto, diagonal=False)
+    caminho = pathfinder.a_estrela()
+
+    if caminho:
+        print(f"Caminho encontrado com {len(caminho)} passos")
+        pathfinder.mostrar_labirinto_com_caminho(caminho)
+    else:
+        print("Sem solucao")
+    print()
+
+
+def teste_10_labirinto_em_arquivo():
+    print(
+        "=== Teste 10: Labirinto salvo em .lab e aberto por memmap (COM diagonal) ==="
+    )
+    labirinto = gerar("cavernas", 40, 60, semente=3, extremos=True)
+    caminho_arquivo = os.path.join(tempfile.mkdtemp(), "cavernas.lab")
+    salvar_labirinto(caminho_arquivo, labirinto, conectividade=8)
+    mapeado, cabecalho = carregar_labirinto(caminho_arquivo)
+    print(
+        f"Cabecalho: {cabecalho.linhas}x{cabecalho.colunas}, S={cabecalho.inicio}, E={cabecalho.fim}"
+    )
+
+    caminho = PathFinder(mapeado, diagonal=True).a_estrela()
+    esperado = PathFinder(labirinto.tolist(), diagonal=True).a_estrela()
+
+    if caminho:
+        print(f"Caminho encontrado com {len(caminho)} passos")
+        print(f"Igual ao caminho do grid em memoria: {caminho == esperado}")
+    else:
+        print("Sem solucao")
+    print()
+
+
+def teste_11_hpa():
+    print("=== Teste 11: HPA* com espacamento 1 em cavernas geradas (SEM diagonal) ===")
+    labirinto = gerar("cavernas", 60, 80, semente=5, extremos=True).tolist()
+
+    caminho = PathFinder(labirinto, modo="hpa").a_estrela()
+    esperado = PathFinder(labirinto).a_estrela()
+    planejador = PlanejadorHPA(labirinto, espacamento=1)
+    exato = planejador.caminho(caminho[0], caminho[-1]) if caminho else None
+
+    if caminho:
+        print(f"Caminho HPA* com {len(caminho)} passos (A*: {len(esperado)})")
+        print(f"Com espacamento 1, mesmo tamanho do A*: {len(exato) == len(esperado)}")
+        print(f"Nos abstratos: {planejador.total_nos}")
+    else:
+        print("Sem solucao")
+    print()
+
+
+def teste_12_estatisticas():
+    print("=== Teste 12: Estatisticas detalhadas da busca (COM diagonal) ===")
+    labirinto = gerar("salas", 40, 60, semente=2, extremos=True).tolist()
+    fases = []
+
+    pathfinder = PathFinder(labirinto, diagonal=True, modo="array")
+    pathfinder.estatisticas_detalhadas = True
+    pathfinder.gancho_fase = lambda fase, estatisticas: fases.append(fase)
+    caminho = pathfinder.a_estrela()
+    estatisticas = pathfinder.estatisticas
+
+    if caminho:
+        print(f"Caminho encontrado com {len(caminho)} passos")
+        print(estatisticas.relatorio())
+        print(
+            f"Remocoes = expandidos + obsoletos: {estatisticas.remocoes == estatisticas.expandidos + estatisticas.obsoletos}"
+        )
+        print(f"Fases: {fases}")
+    else:
+        print("Sem solucao")
+    print()
+
+
+def teste_13_terreno():
+    print("=== Teste 13: Terreno com pesos, fila de baldes x heap (COM diagonal) ===")
+    mapa = gerar("cavernas", 50, 70, semente=4, extremos=True)
+    # todo o terreno custa de 3 a 9: a heurística é escalada por 3
+    pesos = np.random.default_rng(4).integers(3, 10, mapa.shape)
+    mapa = np.where(mapa == 0, PESO_BASE + pesos, mapa)
+    labirinto = mapa.tolist()
+
+    # custo somando o peso de cada célula em que o caminho entra
+    def custo(caminho):
+        return sum(
+            (math.sqrt(2) if a[0] != b[0] and a[1] != b[1] else 1)
+            * peso_da_celula(labirinto[b[0]][b[1]])
+            for a, b in zip(caminho, caminho[1:])
+        )
+
+    dial = PathFinder(labirinto, diagonal=True, modo="dial")
+    caminho = dial.a_estrela()
+    heap = PathFinder(labirinto, diagonal=True)
+    esperado = heap.a_estrela()
+
+    if caminho:
+        print(f"Caminho com {len(caminho)} passos e custo {custo(caminho):.2f}")
+        print(
+            f"Mesmo custo do A* com heap: {abs(custo(caminho) - custo(esperado)) < 1e-9}"
+        )
+        print(f"Custo minimo da heuristica: {dial.custo_minimo}")
+        print(
+            f"Expandidos (baldes / heap): {dial.last_expandidos} / {heap.last_expandidos}"
+        )
+    else:
+        print("Sem solucao")
+    print()
+
+
+def teste_14_flood_fill_em_array():
+    print("=== Teste 14: Flood Fill (motor numpy) sobre um array aberto por memmap ===")
+    labirinto = gerar("salas", 15, 25, semente=6, extremos=True)
+    caminho_arquivo = os.path.join(tempfile.mkdtemp(), "salas.lab")
+    salvar_labirinto(caminho_arquivo, labirinto)
+    mapeado, _ = carregar_labirinto(caminho_arquivo)
+
+    floodfill = FloodFill(mapeado, motor="numpy")
+    caminhos = floodfill.buscar_caminho(todos_encontrados=True)
+    inicio, fins = floodfill.inicio, list(floodfill.fins)
+
+    if caminhos:
+        print(f"Caminho encontrado com {min(len(c) for c in caminhos.values())} passos")
+        floodfill.mostrar_labirinto_com_caminho(caminhos)
+        # mostrar não pode alterar o estado da busca
+        assert (floodfill.inicio, floodfill.fins) == (inicio, fins)
+        print(f"Inicio e fins preservados: {floodfill.inicio} -> {floodfill.fins}")
+    else:
+        print("Sem solucao")
+    print()
+
+
+def teste_15_campo_aberto():
+    print("=== Teste 15: Campo aberto gerado (COM diagonal) ===")
+    labirinto = gerar("aberto", 12, 20, extremos=True)
+    # S e E ficam nos cantos opostos e o caminho é a diagonal mais o trecho reto
+    assert labirinto[0, 0] == 2 and labirinto[11, 19] == 3
+
+    pathfinder = PathFinder(labirinto.tolist(), diagonal=True)
+    caminho = pathfinder.a_estrela()
+
+    assert caminho is not None and len(caminho) == 20
+    print(f"Caminho encontrado com {len(caminho)} passos")
+    pathfinder.mostrar_labirinto_com_caminho(caminho)
+    print()
+
+
 def executar_todos_testes():
     print("========================================")
     print("EXECUTANDO TESTES DO PATHFINDER")
@@ -153,8 +315,17 @@ def executar_todos_testes():
     teste_7_grande_com_diagonal()
     teste_8_direto_com_diagonal()
 
+    print("\n*** TESTES COM MAPAS GERADOS ***\n")
+    teste_9_labirinto_gerado()
+    teste_10_labirinto_em_arquivo()
+    teste_11_hpa()
+    teste_12_estatisticas()
+    teste_13_terreno()
+    teste_14_flood_fill_em_array()
+    teste_15_campo_aberto()
+
     print("========================================")
-    print("TESTES CONCLUIDOS - 8 TESTES EXECUTADOS")
+    print("TESTES CONCLUIDOS - 15 TESTES EXECUTADOS")
     print("========================================")
 
 
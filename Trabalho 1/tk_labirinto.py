@@ -1,9 +1,19 @@
 import tkinter as tk
-from tkinter import messagebox, simpledialog
+from tkinter import filedialog, messagebox, simpledialog
 import numpy as np
 import time
 from pathfinder import PathFinder
 from floodfill import FloodFill
+from campo_distancias import CampoDistancias
+from hpa import PlanejadorHPA
+from render_grid import RenderizadorBitmap, RenderizadorVirtual, cor_celula
+from execucao import ExecucaoEmSegundoPlano
+from geradores import GERADORES, gerar
+from arquivo_labirinto import EXTENSAO, carregar_labirinto, salvar_labirinto
+from terreno import PESO_BASE, PESO_MAXIMO, eh_terreno, tem_terreno, valor_do_peso
+
+# Intervalo (ms) entre atualizações da barra de status durante uma busca em segundo plano
+INTERVALO_STATUS_MS = 100
 
 
 class TkLabirintoApp:
@@ -32,7 +42,33 @@ class TkLabirintoApp:
             None  # lista 2D armazenando os IDs dos itens do canvas para cada célula
         )
         self.path_cells = set()  # conjunto de (i,j) marcados como caminho (valor 5)
+        # valor original das células de terreno cobertas pela marcação do caminho
+        self.terreno_sob_caminho = {}
+        # peso pintado pelo clique esquerdo: 1 desenha paredes, 2..PESO_MAXIMO terreno
+        self.peso = tk.IntVar(value=1)
         self._last_drag_time = 0
+        # campo de distâncias até as saídas, reaproveitado entre consultas (Ctrl+Clique)
+        self.campo_distancias = None
+        # planejador LPA* mantido entre execuções do A* (opção "Incremental")
+        self.incremental = tk.BooleanVar(value=False)
+        self.planejador = None
+        # abstração HPA* mantida entre execuções (opção "HPA*"), atualizada por cluster
+        self.planejador_hpa = None
+        # PathFinder das buscas em segundo plano, mantido entre execuções: as tabelas
+        # planas dos modos array/dial/bidirecional são corrigidas a cada edição
+        self.pathfinder = None
+        # coleta as estatísticas detalhadas da busca (fila e memória; deixa a busca
+        # mais lenta)
+        self.detalhar = tk.BooleanVar(value=False)
+        # "retangulos" (um item por célula), "bitmap" (uma PhotoImage) ou "virtual"
+        # (itens só para a área visível)
+        self.modo_render = tk.StringVar(value="retangulos")
+        self.renderizador = None
+        # busca em segundo plano em andamento (ExecucaoEmSegundoPlano) ou None
+        self.execucao = None
+        self._ao_terminar_execucao = None
+        # tipo de mapa do botão "Aleatório" (chave de geradores.GERADORES)
+        self.gerador = tk.StringVar(value="densidade")
         self._build_interface()
 
     def _build_interface(self):
@@ -47,6 +83,20 @@ class TkLabirintoApp:
             value="1",
             command=self.on_algoritmo_change,
         ).pack(side=tk.LEFT)
+        tk.Radiobutton(
+            frame,
+            text="A* bidirecional",
+            variable=self.algoritmo,
+            value="3",
+            command=self.on_algoritmo_change,
+        ).pack(side=tk.LEFT)
+        tk.Radiobutton(
+            frame,
+            text="HPA*",
+            variable=self.algoritmo,
+            value="4",
+            command=self.on_algoritmo_change,
+        ).pack(side=tk.LEFT)
         tk.Radiobutton(
             frame,
             text="Flood Fill (ortogonal)",
@@ -60,15 +110,47 @@ class TkLabirintoApp:
         tk.Button(frame, text="Aleatório", command=self.gerar_aleatorio).pack(
             side=tk.LEFT
         )
+        tk.OptionMenu(frame, self.gerador, *GERADORES).pack(side=tk.LEFT)
         tk.Button(frame, text="Executar", command=self.executar_algoritmo).pack(
             side=tk.LEFT
         )
+        self.botao_cancelar = tk.Button(
+            frame, text="Cancelar", command=self.cancelar_execucao, state=tk.DISABLED
+        )
+        self.botao_cancelar.pack(side=tk.LEFT)
         tk.Button(frame, text="Limpar", command=self.limpar_grid).pack(side=tk.LEFT)
+        tk.Button(frame, text="Abrir", command=self.abrir_arquivo).pack(side=tk.LEFT)
+        tk.Button(frame, text="Salvar", command=self.salvar_arquivo).pack(side=tk.LEFT)
         tk.Checkbutton(frame, text="Visualizar", variable=self.visualizar).pack(
             side=tk.LEFT
         )
         self.diag_check = tk.Checkbutton(frame, text="Diagonal", variable=self.diagonal)
         self.diag_check.pack(side=tk.LEFT)
+        self.incremental_check = tk.Checkbutton(
+            frame, text="Incremental", variable=self.incremental
+        )
+        self.incremental_check.pack(side=tk.LEFT)
+        tk.Checkbutton(frame, text="Estatísticas", variable=self.detalhar).pack(
+            side=tk.LEFT
+        )
+        tk.Label(frame, text="Peso:").pack(side=tk.LEFT)
+        tk.Spinbox(
+            frame,
+            from_=1,
+            to=PESO_MAXIMO,
+            textvariable=self.peso,
+            width=2,
+            state="readonly",
+        ).pack(side=tk.LEFT)
+        tk.Label(frame, text="Render:").pack(side=tk.LEFT)
+        tk.OptionMenu(
+            frame,
+            self.modo_render,
+            "retangulos",
+            "bitmap",
+            "virtual",
+            command=self.on_modo_render_change,
+        ).pack(side=tk.LEFT)
 
         # Slider de Zoom (tamanho da célula)
         self.zoom_scale = tk.Scale(
@@ -87,7 +169,7 @@ class TkLabirintoApp:
         # Cria o label de status apenas uma vez
         self.status = tk.Label(
             self.root,
-            text="Clique para desenhar obstáculos. Botão direito: início. Shift+Clique: fim.",
+            text="Clique para desenhar obstáculos (com Peso > 1, terreno). Botão direito: início. Shift+Clique: fim. Ctrl+Clique: distância à saída.",
         )
         self.status.pack(side=tk.BOTTOM, fill=tk.X)
 
@@ -130,19 +212,28 @@ class TkLabirintoApp:
 
     def redesenhar_com_novo_zoom(self):
         # Redesenha o grid mantendo o estado, ajustando o tamanho do canvas e scrollbars
-        self._criar_canvas_com_scroll()
+        # (nos modos bitmap/virtual o próprio renderizador se ajusta à nova escala)
+        if self.renderizador is None:
+            self._criar_canvas_com_scroll()
         self.desenhar_grid()
 
     def on_algoritmo_change(self):
-        # Atualiza opções ao trocar algoritmo (A* ou Flood Fill)
-        if self.algoritmo.get() == "1":
+        # Atualiza opções ao trocar algoritmo (A*, A* bidirecional, HPA* ou Flood Fill)
+        if self.algoritmo.get() in ("1", "3", "4"):
             self.diag_check.config(state=tk.NORMAL)
         else:
             self.diag_check.config(state=tk.DISABLED)
             self.diagonal.set(False)
+        if self.algoritmo.get() == "1":
+            self.incremental_check.config(state=tk.NORMAL)
+        else:
+            self.incremental_check.config(state=tk.DISABLED)
+            self.incremental.set(False)
 
     def novo_grid_dialog(self):
         # Abre diálogo para definir novo tamanho do grid
+        if self._ocupado():
+            return
         linhas = simpledialog.askinteger(
             "Linhas",
             "Digite o número de linhas:",
@@ -166,9 +257,14 @@ class TkLabirintoApp:
         self.inicio = None
         self.fins = []
         self.last_draw_state = None
+        self.campo_distancias = None
+        self.planejador = None
+        self.planejador_hpa = None
+        self.pathfinder = None
         # reiniciar performance helpers
         self.cell_items = None
         self.path_cells.clear()
+        self.terreno_sob_caminho.clear()
         self._criar_canvas_com_scroll()
         self.desenhar_grid()
 
@@ -198,11 +294,12 @@ class TkLabirintoApp:
             yscrollcommand=self.v_scroll.set,
         )
         self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        self.h_scroll.config(command=self.canvas.xview)
-        self.v_scroll.config(command=self.canvas.yview)
+        self.h_scroll.config(command=self._rolar_x)
+        self.v_scroll.config(command=self._rolar_y)
 
         # When recreating the canvas, invalidate existing cell items
         self.cell_items = None
+        self._criar_renderizador()
 
         self.offset_x = 0
         self.offset_y = 0
@@ -218,6 +315,53 @@ class TkLabirintoApp:
         self.canvas.bind("<ButtonRelease-1>", self.on_left_release)
         self.canvas.bind("<Button-3>", self.on_right_click)
         self.canvas.bind("<Shift-Button-1>", self.on_shift_left_click)
+        self.canvas.bind("<Control-Button-1>", self.on_ctrl_left_click)
+
+    def _pintar_celula(self, i, j):
+        # Atualiza a cor de uma única célula conforme o valor atual no grid
+        if not (0 <= i < self.linhas and 0 <= j < self.colunas):
+            return
+        if self.renderizador is not None:
+            self.renderizador.atualizar_celula(i, j, self.grid[i][j])
+            return
+        if (
+            self.cell_items
+            and 0 <= i < len(self.cell_items)
+            and 0 <= j < len(self.cell_items[0])
+        ):
+            item = self.cell_items[i][j]
+            if item:
+                try:
+                    self.canvas.itemconfig(item, fill=cor_celula(self.grid[i][j]))
+                except (tk.TclError, IndexError):
+                    pass
+
+    def on_modo_render_change(self, *_):
+        # Troca entre um retângulo por célula e a imagem única (bitmap)
+        self.canvas.delete("all")
+        self.cell_items = None
+        self._criar_renderizador()
+        self.desenhar_grid()
+
+    def _criar_renderizador(self):
+        # Renderizador do modo atual (None = um retângulo por célula)
+        self.renderizador = None
+        if self.modo_render.get() == "bitmap":
+            self.renderizador = RenderizadorBitmap(self.canvas)
+        elif self.modo_render.get() == "virtual":
+            self.renderizador = RenderizadorVirtual(self.canvas)
+
+    def _rolar_x(self, *args):
+        # Rolagem horizontal pela barra; o renderizador virtual recicla os itens
+        self.canvas.xview(*args)
+        if self.renderizador is not None:
+            self.renderizador.rolar(self.grid)
+
+    def _rolar_y(self, *args):
+        # Rolagem vertical pela barra; o renderizador virtual recicla os itens
+        self.canvas.yview(*args)
+        if self.renderizador is not None:
+            self.renderizador.rolar(self.grid)
 
     def desenhar_grid(self):
         # Desenha o grid e as células no canvas, centralizado
@@ -230,6 +374,14 @@ class TkLabirintoApp:
         self.offset_x = max(0, (canvas_width - total_width) // 2)
         self.offset_y = max(0, (canvas_height - total_height) // 2)
 
+        if self.renderizador is not None:
+            # bitmap: só as células que mudaram são repintadas; virtual: só as visíveis
+            self.renderizador.desenhar(
+                self.grid, self.cell_size, self.offset_x, self.offset_y
+            )
+            self.canvas.config(scrollregion=(0, 0, total_width, total_height))
+            return
+
         # If cell items not created yet (or grid size changed), create them once.
         need_create = (
             not self.cell_items
@@ -249,15 +401,7 @@ class TkLabirintoApp:
                     y0 = i * self.cell_size + self.offset_y
                     x1 = x0 + self.cell_size
                     y1 = y0 + self.cell_size
-                    cor = "white"
-                    if self.grid[i][j] == 1:
-                        cor = "black"
-                    elif self.grid[i][j] == 2:
-                        cor = "green"
-                    elif self.grid[i][j] == 3:
-                        cor = "red"
-                    elif self.grid[i][j] == 5:
-                        cor = "yellow"
+                    cor = cor_celula(self.grid[i][j])
                     item = self.canvas.create_rectangle(
                         x0, y0, x1, y1, fill=cor, outline="gray"
                     )
@@ -273,15 +417,7 @@ class TkLabirintoApp:
                     y0 = i * self.cell_size + self.offset_y
                     x1 = x0 + self.cell_size
                     y1 = y0 + self.cell_size
-                    cor = "white"
-                    if self.grid[i][j] == 1:
-                        cor = "black"
-                    elif self.grid[i][j] == 2:
-                        cor = "green"
-                    elif self.grid[i][j] == 3:
-                        cor = "red"
-                    elif self.grid[i][j] == 5:
-                        cor = "yellow"
+                    cor = cor_celula(self.grid[i][j])
                     # update geometry and color
                     try:
                         self.canvas.coords(item, x0, y0, x1, y1)
@@ -295,6 +431,8 @@ class TkLabirintoApp:
 
     def on_left_click(self, event):
         # Manipula clique esquerdo: desenha/remove obstáculos e limpa caminho
+        if self._ocupado():
+            return
         x_canvas = self.canvas.canvasx(event.x) - getattr(self, "offset_x", 0)
         y_canvas = self.canvas.canvasy(event.y) - getattr(self, "offset_y", 0)
         i, j = int(y_canvas // self.cell_size), int(x_canvas // self.cell_size)
@@ -303,32 +441,26 @@ class TkLabirintoApp:
         if self.path_cells:
             for px, py in list(self.path_cells):
                 if 0 <= px < self.linhas and 0 <= py < self.colunas:
-                    self.grid[px][py] = 0
-                    if (
-                        self.cell_items
-                        and 0 <= px < len(self.cell_items)
-                        and 0 <= py < len(self.cell_items[0])
-                    ):
-                        try:
-                            self.canvas.itemconfig(
-                                self.cell_items[px][py], fill="white"
-                            )
-                        except tk.TclError:
-                            pass
+                    self._desmarcar_caminho(px, py)
+                    self._pintar_celula(px, py)
             self.path_cells.clear()
 
         if 0 <= i < self.linhas and 0 <= j < self.colunas:
-            if self.grid[i][j] == 0:
-                self.grid[i][j] = 1
-                self.last_draw_state = 1
-            elif self.grid[i][j] == 1:
+            anterior = self.grid[i][j]
+            pincel = 1 if self.peso.get() == 1 else valor_do_peso(self.peso.get())
+            if self.grid[i][j] == pincel:
                 self.grid[i][j] = 0
                 self.last_draw_state = 0
+            elif self._pintavel(self.grid[i][j]):
+                self.grid[i][j] = pincel
+                self.last_draw_state = pincel
             elif self.grid[i][j] == 3:
                 self.grid[i][j] = 0
                 self.last_draw_state = 0 
             else:
                 self.last_draw_state = None
+            if self.grid[i][j] != anterior:
+                self._celula_alterada(i, j)
 
             if (i, j) in self.fins and self.grid[i][j] != 3:
                 try:
@@ -336,22 +468,13 @@ class TkLabirintoApp:
                 except ValueError:
                     pass
 
-            if (
-                self.cell_items
-                and 0 <= i < len(self.cell_items)
-                and 0 <= j < len(self.cell_items[0])
-            ):
-                item = self.cell_items[i][j]
-                if item:
-                    color = "black" if self.grid[i][j] == 1 else "white"
-                    try:
-                        self.canvas.itemconfig(item, fill=color)
-                    except tk.TclError:
-                        pass
+            self._pintar_celula(i, j)
 
     def on_left_drag(self, event):
         # Manipula arrasto com botão esquerdo: desenha/remover obstáculos
         # Throttle drag events to avoid excessive updates
+        if self._ocupado():
+            return
         now = time.time()
         if now - self._last_drag_time < 0.02:
             return
@@ -365,19 +488,8 @@ class TkLabirintoApp:
         if self.path_cells:
             for px, py in list(self.path_cells):
                 if 0 <= px < self.linhas and 0 <= py < self.colunas:
-                    self.grid[px][py] = 0
-                    item = None
-                    if (
-                        self.cell_items
-                        and 0 <= px < len(self.cell_items)
-                        and 0 <= py < len(self.cell_items[0])
-                    ):
-                        item = self.cell_items[px][py]
-                    if item:
-                        try:
-                            self.canvas.itemconfig(item, fill="white")
-                        except tk.TclError:
-                            pass
+                    self._desmarcar_caminho(px, py)
+                    self._pintar_celula(px, py)
             self.path_cells.clear()
 
         if (
@@ -385,26 +497,23 @@ class TkLabirintoApp:
             and 0 <= j < self.colunas
             and self.last_draw_state is not None
         ):
-            if self.grid[i][j] in [0, 1] and self.grid[i][j] != self.last_draw_state:
+            if (
+                self._pintavel(self.grid[i][j])
+                and self.grid[i][j] != self.last_draw_state
+            ):
                 self.grid[i][j] = self.last_draw_state
+                self._celula_alterada(i, j)
                 # update only the affected cell
                 if (i, j) in self.fins and self.grid[i][j] != 3:
                     try:
                         self.fins.remove((i, j))
                     except ValueError:
                         pass
-                if (
-                    self.cell_items
-                    and 0 <= i < len(self.cell_items)
-                    and 0 <= j < len(self.cell_items[0])
-                ):
-                    item = self.cell_items[i][j]
-                    if item:
-                        color = "black" if self.grid[i][j] == 1 else "white"
-                        try:
-                            self.canvas.itemconfig(item, fill=color)
-                        except tk.TclError:
-                            pass
+                self._pintar_celula(i, j)
+
+    def _pintavel(self, valor):
+        # Células que o clique/arrasto esquerdo pode trocar: livre, parede e terreno
+        return valor in (0, 1) or eh_terreno(valor)
 
     def on_left_release(self, event):
         # Finaliza arrasto do mouse
@@ -412,6 +521,8 @@ class TkLabirintoApp:
 
     def on_right_click(self, event):
         # Define a posição inicial (S) com clique direito
+        if self._ocupado():
+            return
         x_canvas = self.canvas.canvasx(event.x) - getattr(self, "offset_x", 0)
         y_canvas = self.canvas.canvasy(event.y) - getattr(self, "offset_y", 0)
         i, j = int(y_canvas // self.cell_size), int(x_canvas // self.cell_size)
@@ -421,32 +532,17 @@ class TkLabirintoApp:
                 if self.grid[old_i][old_j] == 2:
                     self.grid[old_i][old_j] = 0
                     # update old start cell
-                    if (
-                        self.cell_items
-                        and 0 <= old_i < len(self.cell_items)
-                        and 0 <= old_j < len(self.cell_items[0])
-                    ):
-                        try:
-                            self.canvas.itemconfig(
-                                self.cell_items[old_i][old_j], fill="white"
-                            )
-                        except tk.TclError:
-                            pass
+                    self._pintar_celula(old_i, old_j)
             self.inicio = (i, j)
             self.grid[i][j] = 2
+            self._celula_alterada(i, j)
             # update new start cell
-            if (
-                self.cell_items
-                and 0 <= i < len(self.cell_items)
-                and 0 <= j < len(self.cell_items[0])
-            ):
-                try:
-                    self.canvas.itemconfig(self.cell_items[i][j], fill="green")
-                except tk.TclError:
-                    pass
+            self._pintar_celula(i, j)
 
     def on_shift_left_click(self, event):
         # Adiciona ou remove posição final (E) com Shift+Clique esquerdo
+        if self._ocupado():
+            return
         x_canvas = self.canvas.canvasx(event.x) - getattr(self, "offset_x", 0)
         y_canvas = self.canvas.canvasy(event.y) - getattr(self, "offset_y", 0)
         i, j = int(y_canvas // self.cell_size), int(x_canvas // self.cell_size)
@@ -456,169 +552,414 @@ class TkLabirintoApp:
                 self.fins.remove((i, j))
                 if self.grid[i][j] == 3:
                     self.grid[i][j] = 0
-                    if (
-                        self.cell_items
-                        and 0 <= i < len(self.cell_items)
-                        and 0 <= j < len(self.cell_items[0])
-                    ):
-                        try:
-                            self.canvas.itemconfig(self.cell_items[i][j], fill="white")
-                        except tk.TclError:
-                            pass
+                    self._celula_alterada(i, j)
+                    self._pintar_celula(i, j)
             else:
                 # add final (no modal message)
                 self.fins.append((i, j))
                 self.grid[i][j] = 3
-                if (
-                    self.cell_items
-                    and 0 <= i < len(self.cell_items)
-                    and 0 <= j < len(self.cell_items[0])
-                ):
-                    try:
-                        self.canvas.itemconfig(self.cell_items[i][j], fill="red")
-                    except tk.TclError:
-                        pass
+                self._celula_alterada(i, j)
+                self._pintar_celula(i, j)
 
     def limpar_grid(self):
         # Limpa o grid atual (mantém tamanho)
+        if self._ocupado():
+            return
         self.novo_grid(self.linhas, self.colunas)
 
     def gerar_aleatorio(self):
-        # Gera obstáculos aleatórios no grid
-        densidade = simpledialog.askfloat(
-            "Densidade",
-            "Densidade de obstáculos (0.0 a 1.0):",
+        # Gera um mapa do tipo escolhido (vetorizado, reproduzível pela semente) com S e
+        # E posicionados de forma que exista caminho entre eles
+        if self._ocupado():
+            return
+        tipo = self.gerador.get()
+        opcoes = {}
+        if tipo in ("densidade", "cavernas"):
+            densidade = simpledialog.askfloat(
+                "Densidade",
+                "Densidade de obstáculos (0.0 a 1.0):",
+                parent=self.root,
+                initialvalue=0.3 if tipo == "densidade" else 0.45,
+                minvalue=0.0,
+                maxvalue=1,
+            )
+            if densidade is None:
+                return
+            opcoes["densidade"] = densidade
+        semente = simpledialog.askinteger(
+            "Semente",
+            "Semente (a mesma semente gera o mesmo mapa):",
             parent=self.root,
-            initialvalue=0.3,
-            minvalue=0.0,
-            maxvalue=1,
+            initialvalue=int(np.random.randint(0, 2**31 - 1)),
+            minvalue=0,
         )
-        if densidade is None:
+        if semente is None:
             return
-        for i in range(self.linhas):
-            for j in range(self.colunas):
-                if np.random.rand() < densidade:
-                    self.grid[i][j] = 1
-                else:
-                    self.grid[i][j] = 0
+        mapa = gerar(
+            tipo, self.linhas, self.colunas, semente=semente, extremos=True, **opcoes
+        )
+        self.grid[:] = mapa.tolist()
         self.inicio = None
         self.fins = []
+        inicios = np.argwhere(mapa == 2)
+        if len(inicios):
+            self.inicio = tuple(int(v) for v in inicios[0])
+            self.fins = [tuple(int(v) for v in fim) for fim in np.argwhere(mapa == 3)]
+        self.status.config(text=f"Mapa '{tipo}' gerado com semente {semente}")
+        self.campo_distancias = None
+        self.planejador = None
+        self.planejador_hpa = None
+        self.pathfinder = None
         self.path_cells.clear()
+        self.terreno_sob_caminho.clear()
+        self.desenhar_grid()
+
+    def salvar_arquivo(self):
+        # Grava o grid (sem as marcações de caminho/visitados) num arquivo .lab
+        if self._ocupado():
+            return
+        caminho = filedialog.asksaveasfilename(
+            parent=self.root,
+            defaultextension=EXTENSAO,
+            filetypes=[("Labirinto", f"*{EXTENSAO}")],
+        )
+        if not caminho:
+            return
+        grade = np.array(self.grid, dtype=np.uint8)
+        grade[(grade > 3) & (grade <= PESO_BASE)] = 0
+        for (i, j), valor in self.terreno_sob_caminho.items():
+            grade[i, j] = valor
+        try:
+            salvar_labirinto(caminho, grade, 8 if self.diagonal.get() else 4)
+        except OSError as erro:
+            messagebox.showerror("Salvar", str(erro))
+            return
+        self.status.config(text=f"Labirinto salvo em {caminho}")
+
+    def abrir_arquivo(self):
+        # Carrega um arquivo .lab (aberto por memmap) no editor
+        if self._ocupado():
+            return
+        caminho = filedialog.askopenfilename(
+            parent=self.root, filetypes=[("Labirinto", f"*{EXTENSAO}")]
+        )
+        if not caminho:
+            return
+        try:
+            grade, cabecalho = carregar_labirinto(caminho)
+        except (OSError, ValueError) as erro:
+            messagebox.showerror("Abrir", str(erro))
+            return
+        self.novo_grid(cabecalho.linhas, cabecalho.colunas)
+        self.grid[:] = grade.tolist()
+        inicios = np.argwhere(grade == 2)
+        if len(inicios):
+            self.inicio = tuple(int(v) for v in inicios[0])
+        self.fins = [tuple(int(v) for v in fim) for fim in np.argwhere(grade == 3)]
+        if self.algoritmo.get() != "2":
+            self.diagonal.set(cabecalho.conectividade == 8)
+        self.status.config(
+            text=f"Labirinto {cabecalho.linhas}x{cabecalho.colunas} aberto"
+        )
+        self.desenhar_grid()
+
+    def _celula_alterada(self, i, j):
+        # Uma parede ou saída mudou: o campo de distâncias precisa ser recalculado e
+        # o planejador incremental reavalia só a vizinhança da célula (o HPA* só o
+        # cluster dela e o PathFinder guardado só a própria célula)
+        if self.campo_distancias is not None:
+            self.campo_distancias.invalidar()
+        if self.planejador is not None:
+            self.planejador.notificar_alteracao(i, j)
+        if self.planejador_hpa is not None:
+            self.planejador_hpa.notificar_alteracao(i, j)
+        if self.pathfinder is not None:
+            self.pathfinder.notificar_alteracao(i, j)
+
+    def on_ctrl_left_click(self, event):
+        # Consulta a distância e o caminho da célula até a saída mais próxima,
+        # reaproveitando o campo de distâncias enquanto o grid não for editado
+        if self._ocupado():
+            return
+        x_canvas = self.canvas.canvasx(event.x) - getattr(self, "offset_x", 0)
+        y_canvas = self.canvas.canvasy(event.y) - getattr(self, "offset_y", 0)
+        i, j = int(y_canvas // self.cell_size), int(x_canvas // self.cell_size)
+        if not (0 <= i < self.linhas and 0 <= j < self.colunas):
+            return
+        inicio = time.perf_counter()
+        if self.campo_distancias is None:
+            self.campo_distancias = CampoDistancias(self.grid)
+        distancia = self.campo_distancias.distancia((i, j))
+        caminho = self.campo_distancias.caminho((i, j))
+        elapsed_ms = (time.perf_counter() - inicio) * 1000.0
+        for px, py in self.path_cells:
+            if self.grid[px][py] == 5:
+                self._desmarcar_caminho(px, py)
+        self.path_cells.clear()
+        if caminho is None:
+            self.status.config(text=f"({i}, {j}): nenhuma saída alcançável")
+            self.desenhar_grid()
+            return
+        self._marcar_caminho(caminho)
+        self.status.config(
+            text=f"({i}, {j}): distância até a saída mais próxima: {distancia} | Consulta: {elapsed_ms:.3f} ms"
+        )
         self.desenhar_grid()
 
     def executar_algoritmo(self):
-        # Executa o algoritmo selecionado (A* ou Flood Fill) e mostra o resultado
-        for i in range(self.linhas):
-            for j in range(self.colunas):
-                if self.grid[i][j] == 5:
-                    self.grid[i][j] = 0
+        # Executa o algoritmo selecionado (A* ou Flood Fill) e mostra o resultado.
+        # Sem visualização a busca roda numa thread, que copia o grid e detecta o
+        # terreno; na thread do Tk só passam o caminho anterior e a busca de S/E.
+        if self.execucao is not None:
+            return
+        for px, py in self.path_cells:
+            if self.grid[px][py] == 5:
+                self._desmarcar_caminho(px, py)
+        self.path_cells.clear()
         self.desenhar_grid()
-        actual_fins = []
-        found_start = None
-        for ii in range(self.linhas):
-            for jj in range(self.colunas):
-                if self.grid[ii][jj] == 3:
-                    actual_fins.append((ii, jj))
-                elif self.grid[ii][jj] == 2 and found_start is None:
-                    found_start = (ii, jj)
-        self.fins = actual_fins
-        self.inicio = found_start
+        self.inicio, self.fins = self._localizar_extremos()
 
         if not self.inicio or not self.fins:
             self.status.config(
                 text="Defina início (botão direito) e fim (shift+clique)!"
             )
             return
-        if self.algoritmo.get() == "1":
+        visualizar = self.visualizar.get()
+        diagonal = self.diagonal.get()
+        detalhar = self.detalhar.get()
+        if self.algoritmo.get() in ("1", "3", "4"):
             if len(self.fins) != 1:
                 messagebox.showinfo(
                     "A*", "A* requer exatamente 1 fim!", parent=self.root
                 )
                 self.status.config(text="A* requer exatamente 1 fim!")
                 return
-            pathfinder = PathFinder(self.grid, diagonal=self.diagonal.get())
-            if not pathfinder.encontrar_posicoes():
-                self.status.config(text="Sem solução!")
+            modo = {"3": "bidirecional", "4": "hpa"}.get(self.algoritmo.get(), "padrao")
+            if (
+                self.incremental.get()
+                and modo == "padrao"
+                and not visualizar
+                and not tem_terreno(self.grid)
+            ):
+                # o planejador incremental guarda estado ligado ao grid editado: roda
+                # na thread do Tk (a consulta após uma edição é curta)
+                pathfinder = PathFinder(self.grid, diagonal=diagonal)
+                if not pathfinder.encontrar_posicoes():
+                    self.status.config(text="Sem solução!")
+                    return
+                if self.planejador is None or self.planejador.diagonal != diagonal:
+                    self.planejador = pathfinder.planejador_incremental()
+                self.planejador.definir_extremos(pathfinder.inicio, pathfinder.fim)
+                caminho = self.planejador.caminho()
+                self._mostrar_resultado_a_estrela(caminho, self.planejador)
                 return
-            caminho = pathfinder.a_estrela(visualizar=self.visualizar.get())
-            elapsed_ms = getattr(pathfinder, "last_elapsed_ms", 0.0)
-            if caminho is None:
-                self.status.config(text="Sem solução!")
-                print(f"\nA* execution time: {elapsed_ms:.3f} ms")
-            else:
-                for i, j in caminho:
-                    if self.grid[i][j] not in [2, 3]:
-                        self.grid[i][j] = 5
-                        self.path_cells.add((i, j))
-                        if (
-                            self.cell_items
-                            and 0 <= i < len(self.cell_items)
-                            and 0 <= j < len(self.cell_items[0])
-                        ):
-                            try:
-                                self.canvas.itemconfig(
-                                    self.cell_items[i][j], fill="yellow"
-                                )
-                            except tk.TclError:
-                                pass
-                self.status.config(
-                    text=f"Caminho encontrado! Tamanho: {len(caminho)} | Tempo total: {elapsed_ms:.3f} ms"
+            if modo == "hpa" and not visualizar:
+                # a abstração lê o próprio grid (edições ficam bloqueadas durante a
+                # busca) e é reaproveitada na próxima execução
+                if (
+                    self.planejador_hpa is None
+                    or self.planejador_hpa.diagonal != diagonal
+                ):
+                    self.planejador_hpa = PlanejadorHPA(self.grid, diagonal)
+                planejador = self.planejador_hpa
+                inicio, fim = self.inicio, self.fins[0]
+
+                def tarefa(progresso):
+                    if tem_terreno(planejador.labirinto):
+                        raise ValueError("Terreno com pesos: use o A*")
+                    planejador.progresso = progresso
+                    return planejador.caminho(inicio, fim, refinar=True)
+
+                self._iniciar_execucao(
+                    tarefa,
+                    lambda caminho: self._mostrar_resultado_a_estrela(
+                        caminho, planejador
+                    ),
                 )
-                self.desenhar_grid()
-                print(f"\nA* execution time: {elapsed_ms:.3f} ms")
-                # Mostra o caminho no terminal
-                print("\nCaminho encontrado (A*):")
-                print(caminho)
-        else:
-            floodfill = FloodFill(self.grid)
-            if not floodfill.encontrar_posicoes():
-                self.status.config(text="Sem solução!")
                 return
-            caminhos = floodfill.buscar_caminho(
-                visualizar=self.visualizar.get(), todos_encontrados=True
+            if visualizar:
+                # com terreno a visualização usa o modo padrão, que soma os pesos;
+                # os demais supõem custo uniforme
+                if modo != "padrao" and tem_terreno(self.grid):
+                    self.status.config(text="Terreno com pesos: use o A*")
+                    return
+                pathfinder = PathFinder(self.grid, diagonal=diagonal, modo=modo)
+                pathfinder.estatisticas_detalhadas = detalhar
+                if not pathfinder.encontrar_posicoes():
+                    self.status.config(text="Sem solução!")
+                    return
+                caminho = pathfinder.a_estrela(visualizar=True)
+                self._mostrar_resultado_a_estrela(caminho, pathfinder)
+                return
+
+            # o PathFinder lê o próprio grid (edições ficam bloqueadas durante a busca)
+            # e é reaproveitado com as tabelas planas da execução anterior
+            if self.pathfinder is None or self.pathfinder.diagonal != diagonal:
+                self.pathfinder = PathFinder(self.grid, diagonal=diagonal)
+            pathfinder = self.pathfinder
+
+            def tarefa(progresso):
+                # com terreno o A* usa a fila de baldes; o bidirecional recusa o grid
+                pathfinder.modo = modo
+                if modo == "padrao" and tem_terreno(pathfinder.labirinto):
+                    pathfinder.modo = "dial"
+                pathfinder.estatisticas_detalhadas = detalhar
+                pathfinder.progresso = progresso
+                return pathfinder.a_estrela(), pathfinder
+
+            self._iniciar_execucao(
+                tarefa, lambda resultado: self._mostrar_resultado_a_estrela(*resultado)
             )
-            elapsed_ms = getattr(floodfill, "last_elapsed_ms", 0.0)
-            if not caminhos:
-                self.status.config(text="Sem solução!")
-                print(f"\nFlood Fill execution time: {elapsed_ms:.3f} ms")
-            else:
-                for caminho in caminhos.values():
-                    for i, j in caminho:
-                        if self.grid[i][j] not in [2, 3]:
-                            self.grid[i][j] = 5
-                            self.path_cells.add((i, j))
-                            if (
-                                self.cell_items
-                                and 0 <= i < len(self.cell_items)
-                                and 0 <= j < len(self.cell_items[0])
-                            ):
-                                try:
-                                    self.canvas.itemconfig(
-                                        self.cell_items[i][j], fill="yellow"
-                                    )
-                                except tk.TclError:
-                                    pass
-                resumo_tamanhos = " | ".join(
-                    [
-                        f"{idx+1} - {len(caminho)}"
-                        for idx, (_fim, caminho) in enumerate(caminhos.items())
-                    ]
+        else:
+            if visualizar:
+                floodfill = FloodFill(self.grid)
+                floodfill.estatisticas_detalhadas = detalhar
+                if not floodfill.encontrar_posicoes():
+                    self.status.config(text="Sem solução!")
+                    return
+                caminhos = floodfill.buscar_caminho(
+                    visualizar=True, todos_encontrados=True
                 )
+                self._mostrar_resultado_flood_fill(caminhos, floodfill)
+                return
+
+            def tarefa(progresso):
+                floodfill = FloodFill(self._copia_grid())
+                floodfill.estatisticas_detalhadas = detalhar
+                floodfill.progresso = progresso
+                return floodfill.buscar_caminho(todos_encontrados=True), floodfill
+
+            self._iniciar_execucao(
+                tarefa,
+                lambda resultado: self._mostrar_resultado_flood_fill(*resultado),
+            )
+
+    def _localizar_extremos(self):
+        # Primeiro S (em ordem de linhas) e todos os E do grid; o teste "in" de cada
+        # linha roda em C, e só as linhas com E são percorridas célula a célula
+        inicio = None
+        fins = []
+        for i, linha in enumerate(self.grid):
+            if inicio is None and 2 in linha:
+                inicio = (i, linha.index(2))
+            if 3 in linha:
+                fins.extend((i, j) for j, valor in enumerate(linha) if valor == 3)
+        return inicio, fins
+
+    def _copia_grid(self):
+        # Cópia do grid para a busca em segundo plano, feita na própria thread da
+        # busca (as edições ficam bloqueadas até o fim)
+        return [linha[:] for linha in self.grid]
+
+    def _iniciar_execucao(self, tarefa, ao_terminar):
+        # Dispara a busca numa thread e passa a acompanhar o progresso via root.after
+        self.execucao = ExecucaoEmSegundoPlano(tarefa)
+        self._ao_terminar_execucao = ao_terminar
+        self.botao_cancelar.config(state=tk.NORMAL)
+        self.status.config(text="Buscando...")
+        self.execucao.iniciar()
+        self.root.after(INTERVALO_STATUS_MS, self._acompanhar_execucao)
+
+    def _acompanhar_execucao(self):
+        # Atualiza a barra de status com o último progresso e trata o término
+        execucao = self.execucao
+        if execucao is None:
+            return
+        if not execucao.terminou():
+            if execucao.progresso is not None:
+                expandidos, fronteira = execucao.progresso
                 self.status.config(
-                    text=f"Caminhos encontrados: {len(caminhos)} | {resumo_tamanhos} | Tempo total: {elapsed_ms:.3f} ms"
+                    text=f"Buscando... Expandidos: {expandidos} | Fronteira: {fronteira}"
                 )
-                self.desenhar_grid()
-                print(f"\nFlood Fill execution time: {elapsed_ms:.3f} ms")
-                # Mostra os caminhos no terminal
-                print("\nCaminhos encontrados (Flood Fill):")
-                resumo_tamanhos = [
-                    f"{idx+1} - {len(caminho)}"
-                    for idx, (_fim, caminho) in enumerate(caminhos.items())
-                ]
-                if resumo_tamanhos:
-                    print(" | ".join(resumo_tamanhos))
-                for fim, caminho in caminhos.items():
-                    print(f"Fim {fim}: {caminho}")
+            self.root.after(INTERVALO_STATUS_MS, self._acompanhar_execucao)
+            return
+        self.execucao = None
+        self.botao_cancelar.config(state=tk.DISABLED)
+        if execucao.cancelada:
+            self.status.config(text="Busca cancelada.")
+        elif execucao.erro is not None:
+            self.status.config(text=f"Erro na busca: {execucao.erro}")
+        else:
+            self._ao_terminar_execucao(execucao.resultado)
+
+    def cancelar_execucao(self):
+        # Pede à busca em andamento que pare na próxima verificação de progresso
+        if self.execucao is not None:
+            self.execucao.cancelar()
+            self.status.config(text="Cancelando...")
+
+    def _ocupado(self):
+        # Edições ficam bloqueadas enquanto uma busca roda sobre a cópia do grid
+        if self.execucao is not None:
+            self.status.config(text="Busca em andamento (use Cancelar)")
+            return True
+        return False
+
+    def _marcar_caminho(self, caminho):
+        # Marca as células do caminho no grid; o canvas é atualizado de uma vez depois
+        for i, j in caminho:
+            if self.grid[i][j] not in [2, 3]:
+                if eh_terreno(self.grid[i][j]):
+                    self.terreno_sob_caminho[(i, j)] = self.grid[i][j]
+                self.grid[i][j] = 5
+                self.path_cells.add((i, j))
+
+    def _desmarcar_caminho(self, i, j):
+        # Devolve à célula o valor de antes da marcação (livre ou o terreno)
+        self.grid[i][j] = self.terreno_sob_caminho.pop((i, j), 0)
+
+    def _mostrar_resultado_a_estrela(self, caminho, pathfinder):
+        # Mostra o caminho do A* no canvas, na barra de status e no terminal
+        # (pathfinder é o PathFinder ou o planejador LPA*/HPA* que fez a busca)
+        estatisticas = pathfinder.estatisticas
+        if caminho is None:
+            self.status.config(text=f"Sem solução! | {estatisticas.resumo()}")
+            print(f"\nA* execution time: {estatisticas.total_ms:.3f} ms")
+            print(estatisticas.relatorio())
+            return
+        self._marcar_caminho(caminho)
+        self.status.config(
+            text=f"Caminho encontrado! Tamanho: {len(caminho)} | {estatisticas.resumo()}"
+        )
+        self.desenhar_grid()
+        print(f"\nA* execution time: {estatisticas.total_ms:.3f} ms")
+        print(estatisticas.relatorio())
+        # Mostra o caminho no terminal
+        print("\nCaminho encontrado (A*):")
+        print(caminho)
+
+    def _mostrar_resultado_flood_fill(self, caminhos, floodfill):
+        # Mostra os caminhos do Flood Fill no canvas, na barra de status e no terminal
+        estatisticas = floodfill.estatisticas
+        if not caminhos:
+            self.status.config(text=f"Sem solução! | {estatisticas.resumo()}")
+            print(f"\nFlood Fill execution time: {estatisticas.total_ms:.3f} ms")
+            print(estatisticas.relatorio())
+            return
+        for caminho in caminhos.values():
+            self._marcar_caminho(caminho)
+        resumo_tamanhos = " | ".join(
+            [
+                f"{idx+1} - {len(caminho)}"
+                for idx, (_fim, caminho) in enumerate(caminhos.items())
+            ]
+        )
+        self.status.config(
+            text=f"Caminhos encontrados: {len(caminhos)} | {resumo_tamanhos} | {estatisticas.resumo()}"
+        )
+        self.desenhar_grid()
+        print(f"\nFlood Fill execution time: {estatisticas.total_ms:.3f} ms")
+        print(estatisticas.relatorio())
+        # Mostra os caminhos no terminal
+        print("\nCaminhos encontrados (Flood Fill):")
+        resumo_tamanhos = [
+            f"{idx+1} - {len(caminho)}"
+            for idx, (_fim, caminho) in enumerate(caminhos.items())
+        ]
+        if resumo_tamanhos:
+            print(" | ".join(resumo_tamanhos))
+        for fim, caminho in caminhos.items():
+            print(f"Fim {fim}: {caminho}")
 
     def reset_grid(self):
         # Reseta o grid ao trocar modo/algoritmo
@@ -0,0 +1,50 @@
+import time
+import numpy as np
+from floodfill2 import colorir_regiao
+
+
+def grid_aberto(tamanho):
+    return [[0 for _ in range(tamanho)] for _ in range(tamanho)]
+
+
+def grid_com_obstaculos(tamanho, densidade=0.2, semente=0):
+    rng = np.random.default_rng(semente)
+    grid = (rng.random((tamanho, tamanho)) < densidade).astype(int)
+    grid[0, 0] = 0
+    return grid.tolist()
+
+
+# Preenche a região de (0, 0) e devolve (tempo em ms, estatísticas da fila/pilha)
+def medir(grid, metodo):
+    estatisticas = {}
+    inicio = time.perf_counter()
+    colorir_regiao(grid, (0, 0), 2, metodo=metodo, estatisticas=estatisticas)
+    return (time.perf_counter() - inicio) * 1000.0, estatisticas
+
+
+def comparar(nome, fabrica):
+    print(f"\n=== {nome} ===")
+    print(f"{'método':<18}{'tempo (ms)':>12}{'enfileirados':>14}{'max fila':>10}")
+    casos = [
+        ("bfs", "bfs", False),
+        ("scanline", "scanline", False),
+        ("scanline (numpy)", "scanline", True),
+    ]
+    for rotulo, metodo, numpy_grid in casos:
+        grid = fabrica()
+        if numpy_grid:
+            grid = np.array(grid, dtype=np.int32)
+        ms, est = medir(grid, metodo)
+        print(
+            f"{rotulo:<18}{ms:>12.2f}{est.get('enfileirados', 0):>14}"
+            f"{est.get('max_fila', 0):>10}"
+        )
+
+
+if __name__ == "__main__":
+    for tamanho in (300, 1000):
+        comparar(f"Área aberta {tamanho}x{tamanho}", lambda: grid_aberto(tamanho))
+        comparar(
+            f"Obstáculos 20% {tamanho}x{tamanho}",
+            lambda: grid_com_obstaculos(tamanho),
+        )
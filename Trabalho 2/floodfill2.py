@@ -1,9 +1,23 @@
+from array import array
 from collections import deque
-from typing import List, Tuple, Dict, Optional
+from typing import List, Tuple, Dict, Optional, Union, Iterator
 import copy
+import numpy as np
 
+METODOS = ("bfs", "rotulos", "scanline", "paralelo")
+METODOS_REGIAO = ("bfs", "scanline")
 
-def colorir_regiao(grid: List[List[int]], start: Tuple[int, int], color: int) -> bool:
+
+# estatisticas (opcional) recebe "enfileirados" e "max_fila" do preenchimento
+def colorir_regiao(
+    grid: List[List[int]],
+    start: Tuple[int, int],
+    color: int,
+    metodo: str = "bfs",
+    estatisticas: Optional[Dict[str, int]] = None,
+) -> bool:
+    if metodo not in METODOS_REGIAO:
+        raise ValueError(f"Método desconhecido: {metodo}")
     linhas = len(grid)
     if linhas == 0:
         return False
@@ -13,25 +27,193 @@ def colorir_regiao(grid: List[List[int]], start: Tuple[int, int], color: int) ->
         return False
     if grid[r0][c0] != 0:
         return False
+    if metodo == "scanline":
+        _colorir_regiao_scanline(grid, r0, c0, color, estatisticas)
+        return True
 
+    medir = estatisticas is not None
+    enfileirados = 1
+    max_fila = 1
     dq = deque()
     dq.append((r0, c0))
     grid[r0][c0] = color
     while dq:
+        if medir and len(dq) > max_fila:
+            max_fila = len(dq)
         r, c = dq.popleft()
         for dr, dc in [(-1, 0), (0, 1), (1, 0), (0, -1)]:
             nr, nc = r + dr, c + dc
             if 0 <= nr < linhas and 0 <= nc < colunas and grid[nr][nc] == 0:
                 grid[nr][nc] = color
                 dq.append((nr, nc))
+                enfileirados += 1
+    if medir:
+        estatisticas["enfileirados"] = enfileirados
+        estatisticas["max_fila"] = max_fila
     return True
 
 
+# Trechos menores que isto são percorridos célula a célula mesmo em grids NumPy
+TRECHO_CURTO = 32
+
+
+# Primeira coluna >= c cujo valor não é 0 (ou o fim da linha), com busca em blocos
+# de tamanho crescente para que o custo seja proporcional ao trecho percorrido
+def _proximo_bloqueio(linha: np.ndarray, c: int, passo: int) -> int:
+    colunas = linha.shape[0]
+    while c < colunas:
+        bloqueios = np.flatnonzero(linha[c : c + passo])
+        if bloqueios.size:
+            return c + int(bloqueios[0])
+        c += passo
+        passo *= 2
+    return colunas
+
+
+# Limites [inicio, fim] da corrida de zeros que contém a coluna c de uma linha NumPy:
+# os primeiros passos usam acesso escalar (memoryview) e corridas longas usam blocos
+def _limites_corrida(linha: np.ndarray, celulas, c: int) -> Tuple[int, int]:
+    colunas = linha.shape[0]
+    fim = c + 1
+    limite = min(c + TRECHO_CURTO, colunas)
+    while fim < limite and celulas[fim] == 0:
+        fim += 1
+    if fim == limite and fim < colunas:
+        fim = _proximo_bloqueio(linha, fim, 2 * TRECHO_CURTO)
+    inicio = c - 1
+    limite = max(c - TRECHO_CURTO, -1)
+    while inicio > limite and celulas[inicio] == 0:
+        inicio -= 1
+    if inicio == limite and inicio >= 0:
+        inicio -= _proximo_bloqueio(linha[inicio::-1], 0, 2 * TRECHO_CURTO)
+    return inicio + 1, fim - 1
+
+
+# Preenchimento por trechos (scanline): pinta a corrida horizontal inteira de uma vez
+# e empilha apenas uma semente por corrida livre nas linhas de cima e de baixo.
+# Em grids NumPy a pintura é feita por fatia e corridas longas são varridas em bloco.
+def _colorir_regiao_scanline(
+    grid, r0: int, c0: int, color: int, estatisticas: Optional[Dict[str, int]]
+):
+    linhas = len(grid)
+    colunas = len(grid[0])
+    vetorizado = isinstance(grid, np.ndarray)
+    pilha = [(r0, c0)]
+    enfileirados = 1
+    max_fila = 1
+    while pilha:
+        if len(pilha) > max_fila:
+            max_fila = len(pilha)
+        r, c = pilha.pop()
+        linha = grid[r]
+        if vetorizado:
+            celulas = memoryview(linha)
+            if celulas[c] != 0:
+                continue
+            inicio, fim = _limites_corrida(linha, celulas, c)
+            linha[inicio : fim + 1] = color
+        else:
+            if linha[c] != 0:
+                continue
+            inicio = c
+            while inicio > 0 and linha[inicio - 1] == 0:
+                inicio -= 1
+            fim = c
+            while fim < colunas - 1 and linha[fim + 1] == 0:
+                fim += 1
+            linha[inicio : fim + 1] = [color] * (fim - inicio + 1)
+
+        for nr in (r - 1, r + 1):
+            if not 0 <= nr < linhas:
+                continue
+            vizinha = grid[nr]
+            if vetorizado and fim - inicio >= TRECHO_CURTO:
+                livres = vizinha[inicio : fim + 1] == 0
+                sementes = np.flatnonzero(livres[1:] & ~livres[:-1]) + 1
+                if livres[0]:
+                    pilha.append((nr, inicio))
+                    enfileirados += 1
+                for k in sementes.tolist():
+                    pilha.append((nr, inicio + k))
+                enfileirados += len(sementes)
+                continue
+            if vetorizado:
+                vizinha = memoryview(vizinha)
+            dentro = False
+            for k in range(inicio, fim + 1):
+                if vizinha[k] == 0:
+                    if not dentro:
+                        pilha.append((nr, k))
+                        enfileirados += 1
+                        dentro = True
+                else:
+                    dentro = False
+    if estatisticas is not None:
+        estatisticas["enfileirados"] = enfileirados
+        estatisticas["max_fila"] = max_fila
+
+
+# Histórico compacto de preenchimento: guarda o grid inicial uma única vez e, para cada
+# célula pintada, apenas o trio (linha, coluna, cor) em um vetor append-only.
+# Os frames são reconstruídos sob demanda (frame) ou percorridos incrementalmente
+# (iterar_frames); para_lista devolve o formato antigo de lista de grids.
+class HistoricoPreenchimento:
+    def __init__(self, grid: List[List[int]]):
+        self.inicial = np.array(grid, dtype=np.int32)
+        self.passos = array("i")
+
+    def registrar(self, linha: int, coluna: int, cor: int):
+        self.passos.append(linha)
+        self.passos.append(coluna)
+        self.passos.append(cor)
+
+    def __len__(self) -> int:
+        return len(self.passos) // 3
+
+    def passo(self, indice: int) -> Tuple[int, int, int]:
+        base = 3 * indice
+        return self.passos[base], self.passos[base + 1], self.passos[base + 2]
+
+    # Aplica, no lugar, os passos [inicio, fim) sobre uma matriz do mesmo formato
+    def aplicar(self, matriz: np.ndarray, inicio: int, fim: int):
+        if fim <= inicio:
+            return
+        trios = np.array(self.passos[3 * inicio : 3 * fim], dtype=np.int32)
+        trios = trios.reshape(-1, 3)
+        matriz[trios[:, 0], trios[:, 1]] = trios[:, 2]
+
+    # Reconstrói o frame do passo indicado (grid logo após pintar essa célula)
+    def frame(self, indice: int) -> np.ndarray:
+        total = len(self)
+        if indice < 0:
+            indice += total
+        if not 0 <= indice < total:
+            raise IndexError("frame fora do histórico")
+        matriz = self.inicial.copy()
+        self.aplicar(matriz, 0, indice + 1)
+        return matriz
+
+    def __getitem__(self, indice: int) -> np.ndarray:
+        return self.frame(indice)
+
+    # Percorre os frames em ordem; a mesma matriz é atualizada a cada passo
+    def iterar_frames(self) -> Iterator[np.ndarray]:
+        matriz = self.inicial.copy()
+        passos = self.passos
+        for base in range(0, len(passos), 3):
+            matriz[passos[base], passos[base + 1]] = passos[base + 2]
+            yield matriz
+
+    # Adaptador para o formato antigo (uma cópia completa do grid por passo)
+    def para_lista(self) -> List[List[List[int]]]:
+        return [matriz.tolist() for matriz in self.iterar_frames()]
+
+
 def colorir_regiao_history(
     grid: List[List[int]],
     start: Tuple[int, int],
     color: int,
-    history: List[List[List[int]]],
+    history: Union[HistoricoPreenchimento, List[List[List[int]]]],
 ) -> bool:
     linhas = len(grid)
     if linhas == 0:
@@ -43,10 +225,16 @@ def colorir_regiao_history(
     if grid[r0][c0] != 0:
         return False
 
+    # listas continuam recebendo cópias completas (formato antigo)
+    compacto = isinstance(history, HistoricoPreenchimento)
+
     dq = deque()
     dq.append((r0, c0))
     grid[r0][c0] = color
-    history.append(copy.deepcopy(grid))
+    if compacto:
+        history.registrar(r0, c0, color)
+    else:
+        history.append(copy.deepcopy(grid))
     while dq:
         r, c = dq.popleft()
         for dr, dc in [(-1, 0), (0, 1), (1, 0), (0, -1)]:
@@ -54,19 +242,192 @@ def colorir_regiao_history(
             if 0 <= nr < linhas and 0 <= nc < colunas and grid[nr][nc] == 0:
                 grid[nr][nc] = color
                 dq.append((nr, nc))
-                history.append(copy.deepcopy(grid))
+                if compacto:
+                    history.registrar(nr, nc, color)
+                else:
+                    history.append(copy.deepcopy(grid))
     return True
 
 
+# Union-find vetorizado: une os elementos a[k] e b[k] ligando sempre a raiz maior à
+# menor. pai chega comprimido (cada elemento aponta para a sua raiz) e só as raízes de
+# entrada mudam de pai; cada rodada comprime apenas elas, então a raiz de qualquer
+# elemento fica a dois saltos. Retorna pai, em que cada elemento aponta para o menor
+# elemento da sua componente.
+def _unir(pai: np.ndarray, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    raizes = np.flatnonzero(pai == np.arange(pai.size, dtype=pai.dtype))
+    while a.size:
+        ra = pai[pai[a]]
+        rb = pai[pai[b]]
+        diferentes = np.flatnonzero(ra != rb)
+        if not diferentes.size:
+            break
+        a, b, ra, rb = a[diferentes], b[diferentes], ra[diferentes], rb[diferentes]
+        np.minimum.at(pai, np.maximum(ra, rb), np.minimum(ra, rb))
+        # salta só as que ainda não apontam para uma raiz (as raízes não mudam aqui)
+        ativos = raizes
+        while ativos.size:
+            acima = pai[ativos]
+            avo = pai[acima]
+            mudou = np.flatnonzero(avo != acima)
+            ativos = ativos[mudou]
+            pai[ativos] = avo[mudou]
+    return pai[pai]
+
+
+# Pares (rótulo, rótulo) de células livres vizinhas dos dois lados de uma borda entre
+# pedaços rotulados separadamente, sem repetição. As duas faixas têm o mesmo
+# comprimento e 0 marca célula bloqueada.
+def pares_da_borda(lado_a: np.ndarray, lado_b: np.ndarray) -> np.ndarray:
+    ambos = (lado_a > 0) & (lado_b > 0)
+    pares = np.stack([lado_a[ambos], lado_b[ambos]], axis=1).astype(np.int64)
+    return np.unique(pares, axis=0) if len(pares) else pares.reshape(0, 2)
+
+
+# Junta rótulos provisórios equivalentes, dados como pares (n, 2) de rótulos de células
+# vizinhas rotuladas em pedaços separados (blocos ou faixas do grid). Retorna
+# (rotulos, raiz, absorvidos): os rótulos que aparecem nos pares em ordem crescente, a
+# raiz (menor rótulo da componente) de cada um e os rótulos que não são raiz.
+def unir_rotulos(pares: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    pares = np.asarray(pares, dtype=np.int64).reshape(-1, 2)
+    rotulos = np.unique(pares)
+    pai = _unir(
+        np.arange(len(rotulos), dtype=np.int64),
+        np.searchsorted(rotulos, pares[:, 0]),
+        np.searchsorted(rotulos, pares[:, 1]),
+    )
+    raiz = rotulos[pai]
+    return rotulos, raiz, rotulos[raiz != rotulos]
+
+
+# Rótulos finais consecutivos (1..n) de rótulos provisórios, a partir do resultado de
+# unir_rotulos: cada rótulo vai para a raiz da sua componente e a raiz é renumerada
+# descontando quantos rótulos absorvidos vêm antes dela (a ordem é preservada)
+def renumerar_rotulos(
+    valores: np.ndarray, rotulos: np.ndarray, raiz: np.ndarray, absorvidos: np.ndarray
+) -> np.ndarray:
+    valores = np.asarray(valores, dtype=np.int64)
+    if rotulos.size:
+        k = np.minimum(np.searchsorted(rotulos, valores), len(rotulos) - 1)
+        valores = np.where(rotulos[k] == valores, raiz[k], valores)
+    return valores - np.searchsorted(absorvidos, valores)
+
+
+# Trechos (runs) horizontais das células livres, numerados linha a linha, e as suas
+# componentes 4-conexas: trechos sobrepostos em linhas vizinhas são unidos por _unir.
+# Retorna (trecho, pai): o trecho de cada célula (só vale nas células livres) e, para
+# cada trecho, o menor trecho da sua componente.
+def unir_trechos(livre: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    livre = np.asarray(livre, dtype=bool)
+    inicio_trecho = livre.copy()
+    inicio_trecho[:, 1:] &= ~livre[:, :-1]
+    n_trechos = int(np.count_nonzero(inicio_trecho))
+    if n_trechos == 0:
+        return np.zeros(livre.shape, dtype=np.int32), np.zeros(0, dtype=np.int32)
+    trecho = np.cumsum(inicio_trecho, dtype=np.int32).reshape(livre.shape) - 1
+
+    # uma aresta por segmento de sobreposição vertical entre dois trechos
+    ambos = livre[:-1] & livre[1:]
+    inicio_sobreposicao = ambos.copy()
+    inicio_sobreposicao[:, 1:] &= ~ambos[:, :-1]
+    celulas = np.flatnonzero(inicio_sobreposicao)
+    plano = trecho.reshape(-1)
+    a = plano[celulas]
+    b = plano[celulas + livre.shape[1]]
+
+    # cada trecho pendura num dos trechos que toca na linha de cima (com índices
+    # repetidos a atribuição fica com um deles; as outras arestas vão para _unir) e,
+    # como a linha de cima já está comprimida, uma passada por linha comprime tudo
+    pai = np.arange(n_trechos, dtype=np.int32)
+    pai[b] = a
+    outras = np.flatnonzero(pai[b] != a)
+    limites = np.cumsum(np.count_nonzero(inicio_trecho, axis=1)).tolist()
+    for inicio, fim in zip(limites[:-1], limites[1:]):
+        if inicio < fim:
+            pai[inicio:fim] = pai[pai[inicio:fim]]
+    return trecho, _unir(pai, a[outras], b[outras])
+
+
+# Rotula as componentes 4-conexas das células livres (máscara booleana), a partir de
+# unir_trechos. Retorna (rotulos, n): rotulos é 0 fora da máscara e 1..n por
+# componente, numerados na ordem linha a linha da primeira célula de cada componente.
+def rotular_componentes(livre: np.ndarray) -> Tuple[np.ndarray, int]:
+    livre = np.asarray(livre, dtype=bool)
+    trecho, pai = unir_trechos(livre)
+    if pai.size == 0:
+        return np.zeros(livre.shape, dtype=np.int32), 0
+    # a raiz é o menor trecho da componente, logo a ordem das raízes é a ordem linha a linha
+    raizes = pai == np.arange(pai.size, dtype=np.int32)
+    rotulo_da_raiz = np.cumsum(raizes, dtype=np.int32)
+    rotulos = rotulo_da_raiz[pai][trecho]
+    rotulos *= livre
+    return rotulos, int(rotulo_da_raiz[-1])
+
+
+# paralelo=True rotula com rotular_componentes_paralelo (mesmos rótulos, em processos)
+def _colorir_todas_regioes_rotulos(
+    grid, inicio: Optional[Tuple[int, int]], primeiro_cor: int, paralelo: bool = False
+) -> Dict[int, List[Tuple[int, int]]]:
+    matriz = grid if isinstance(grid, np.ndarray) else np.array(grid)
+    linhas, colunas = matriz.shape
+    livre = matriz == 0
+    if paralelo:
+        from rotulacao_paralela import rotular_componentes_paralelo
+
+        rotulos, n = rotular_componentes_paralelo(livre)
+    else:
+        rotulos, n = rotular_componentes(livre)
+    if n == 0:
+        return {}
+
+    # ordem das cores: região do início (se válida) e depois a varredura linha a linha
+    ordem = np.arange(n)
+    if inicio is not None:
+        r0, c0 = inicio
+        if 0 <= r0 < linhas and 0 <= c0 < colunas and livre[r0, c0]:
+            k = rotulos[r0, c0] - 1
+            ordem[:k] += 1
+            ordem[k] = 0
+    cores = ordem + primeiro_cor
+    preenchido = np.where(livre, cores[rotulos - 1], matriz)
+
+    if isinstance(grid, np.ndarray):
+        grid[livre] = preenchido[livre]
+    else:
+        for i in np.flatnonzero(livre.any(axis=1)):
+            grid[i][:] = preenchido[i].tolist()
+
+    # coordenadas por cor em ordem linha a linha (inclui células que já tinham a cor)
+    plano = preenchido.reshape(-1)
+    indices = np.flatnonzero((plano >= primeiro_cor) & (plano < primeiro_cor + n))
+    valores = plano[indices] - primeiro_cor
+    indices = indices[np.argsort(valores, kind="stable")]
+    contagens = np.bincount(valores, minlength=n)
+    resultados: Dict[int, List[Tuple[int, int]]] = {}
+    for deslocamento, bloco in enumerate(np.split(indices, np.cumsum(contagens)[:-1])):
+        rs, cs = np.divmod(bloco, colunas)
+        resultados[primeiro_cor + deslocamento] = list(zip(rs.tolist(), cs.tolist()))
+    return resultados
+
+
 def colorir_todas_regioes(
     grid: List[List[int]],
     inicio: Optional[Tuple[int, int]] = None,
     primeiro_cor: int = 2,
     record_history: bool = False,
+    metodo: str = "bfs",
 ) -> Dict[int, List[Tuple[int, int]]]:
+    if metodo not in METODOS:
+        raise ValueError(f"Método desconhecido: {metodo}")
     linhas = len(grid)
     if linhas == 0:
         return {}
+    # o histórico é célula a célula: rotulos/paralelo/scanline só valem sem histórico
+    if metodo in ("rotulos", "paralelo") and not record_history:
+        return _colorir_todas_regioes_rotulos(
+            grid, inicio, primeiro_cor, paralelo=metodo == "paralelo"
+        )
+    metodo_regiao = "scanline" if metodo == "scanline" else "bfs"
     colunas = len(grid[0])
 
     def encontrar_proximo_zero() -> Optional[Tuple[int, int]]:
@@ -79,7 +440,7 @@ def colorir_todas_regioes(
     resultados: Dict[int, List[Tuple[int, int]]] = {}
     cor_atual = primeiro_cor
 
-    history: List[List[List[int]]] = [] if record_history else None
+    history = HistoricoPreenchimento(grid) if record_history else None
 
     if inicio is not None:
         r0, c0 = inicio
@@ -87,7 +448,7 @@ def colorir_todas_regioes(
             if record_history:
                 colorir_regiao_history(grid, inicio, cor_atual, history)
             else:
-                colorir_regiao(grid, inicio, cor_atual)
+                colorir_regiao(grid, inicio, cor_atual, metodo=metodo_regiao)
             coords = []
             for i in range(linhas):
                 for j in range(colunas):
@@ -103,7 +464,7 @@ def colorir_todas_regioes(
         if record_history:
             colorir_regiao_history(grid, proximo, cor_atual, history)
         else:
-            colorir_regiao(grid, proximo, cor_atual)
+            colorir_regiao(grid, proximo, cor_atual, metodo=metodo_regiao)
         coords = []
         for i in range(linhas):
             for j in range(colunas):
@@ -1,12 +1,34 @@
+import math
+import time
 import matplotlib.pyplot as plt
-import matplotlib.patches as patches
+import numpy as np
 from matplotlib.colors import ListedColormap
-from floodfill2 import colorir_regiao_history
+from floodfill2 import colorir_regiao_history, HistoricoPreenchimento
 import copy
 
+# Quadros por segundo da animação
+FPS_PADRAO = 20
+# Com celulas_por_quadro=None, o lote é escolhido para a animação inteira levar no
+# máximo este tempo (s) na taxa de quadros pedida
+DURACAO_MAX_ANIMACAO = 20.0
+# Pausa (s) depois de cada região que ocupa mais de um quadro
+PAUSA_ENTRE_REGIOES = 0.5
+# Acima deste número de linhas/colunas não se desenham ticks e linhas de grade
+LIMITE_GRADE = 50
+
 
 class InteractiveFloodFill:
-    def __init__(self, linhas, colunas, modo_desenho=True):
+    # Um único imshow mostra o grid; a animação altera o vetor de dados no lugar e
+    # redesenha só a imagem e o título por blitting. celulas_por_quadro fixa quantas
+    # células do histórico entram em cada quadro (None = automático pela fps).
+    def __init__(
+        self,
+        linhas,
+        colunas,
+        modo_desenho=True,
+        celulas_por_quadro=None,
+        fps=FPS_PADRAO,
+    ):
         self.linhas = linhas
         self.colunas = colunas
         self.grid = [[0 for _ in range(colunas)] for _ in range(linhas)]
@@ -14,6 +36,11 @@ class InteractiveFloodFill:
         self.cor_atual = 2
         self.modo_desenho = modo_desenho
         self.animacao_concluida = False
+        self.celulas_por_quadro = celulas_por_quadro
+        self.fps = fps
+        self.imagem = None
+        self._dados = None
+        self._fundo = None
         self.fig, self.ax = plt.subplots(figsize=(10, 10))
 
         manager = plt.get_current_fig_manager()
@@ -29,6 +56,7 @@ class InteractiveFloodFill:
                     pass
 
         self.setup_colors()
+        self.fig.canvas.mpl_connect("draw_event", self._ao_desenhar)
         self.setup_plot()
         self.fig.canvas.mpl_connect("button_press_event", self.on_click)
         self.fig.canvas.mpl_connect("key_press_event", self.on_key)
@@ -58,46 +86,90 @@ class InteractiveFloodFill:
             (0.8, 0.4, 0.8),
         ]
         self.color_list = base_colors + extra_colors
+        # cores além da lista usam a última, como antes
+        self.cmap = ListedColormap(self.color_list)
+        self.cmap.set_over(self.color_list[-1])
 
+    # Redesenho completo: recria a imagem a partir de self.grid (início, reset)
     def setup_plot(self):
         self.ax.clear()
-        self.ax.set_xlim(-0.5, self.colunas - 0.5)
-        self.ax.set_ylim(-0.5, self.linhas - 0.5)
-        self.ax.set_aspect("equal")
-        self.ax.invert_yaxis()
-
-        for i in range(self.linhas):
-            for j in range(self.colunas):
-                color_idx = self.grid[i][j]
-                if color_idx < len(self.color_list):
-                    color = self.color_list[color_idx]
-                else:
-                    color = self.color_list[-1]
-
-                rect = patches.Rectangle(
-                    (j - 0.5, i - 0.5),
-                    1,
-                    1,
-                    linewidth=1,
-                    edgecolor="gray",
-                    facecolor=color,
-                )
-                self.ax.add_patch(rect)
+        self._dados = np.array(self.grid, dtype=np.int32)
+        self.imagem = self.ax.imshow(
+            self._dados,
+            cmap=self.cmap,
+            vmin=0,
+            vmax=len(self.color_list) - 1,
+            interpolation="nearest",
+            animated=True,
+        )
 
-        self.ax.set_xticks(range(self.colunas))
-        self.ax.set_yticks(range(self.linhas))
-        self.ax.grid(True, alpha=0.3)
+        if max(self.linhas, self.colunas) <= LIMITE_GRADE:
+            self.ax.set_xticks(range(self.colunas))
+            self.ax.set_yticks(range(self.linhas))
+            self.ax.set_xticks(np.arange(-0.5, self.colunas, 1), minor=True)
+            self.ax.set_yticks(np.arange(-0.5, self.linhas, 1), minor=True)
+            self.ax.grid(which="minor", color="gray", linewidth=1)
+            self.ax.tick_params(which="minor", length=0)
+        else:
+            self.ax.set_xticks([])
+            self.ax.set_yticks([])
 
         if self.modo_desenho:
-            self.ax.set_title(
+            self._titulo(
                 "MODO DESENHO: Clique para alternar célula (livre/obstáculo)\n"
-                "Pressione ENTER para iniciar o Flood Fill",
-                fontsize=12,
-                pad=20,
+                "Pressione ENTER para iniciar o Flood Fill"
             )
+        else:
+            self._titulo("")
 
         self.fig.canvas.draw()
 
+    def _titulo(self, texto):
+        self.ax.set_title(texto, fontsize=12, pad=20)
+        self.ax.title.set_animated(True)
+
+    # Após cada redesenho completo (inclusive ao redimensionar a janela) guarda o fundo
+    # sem os artistas animados e desenha a imagem e o título por cima
+    def _ao_desenhar(self, event):
+        if self.imagem is None:
+            return
+        self._fundo = self.fig.canvas.copy_from_bbox(self.fig.bbox)
+        self._desenhar_animados()
+
+    def _desenhar_animados(self):
+        self.ax.draw_artist(self.imagem)
+        self.ax.draw_artist(self.ax.title)
+
+    # Mostra o estado atual de self._dados: restaura o fundo e redesenha só os
+    # artistas animados (sem blitting, cai no redesenho normal)
+    def _atualizar_tela(self):
+        canvas = self.fig.canvas
+        self.imagem.set_data(self._dados)
+        if self._fundo is None or not getattr(canvas, "supports_blit", False):
+            canvas.draw_idle()
+        else:
+            canvas.restore_region(self._fundo)
+            self._desenhar_animados()
+            canvas.blit(self.fig.bbox)
+        canvas.flush_events()
+
+    def _definir_celula(self, row, col, cor):
+        self.grid[row][col] = cor
+        self._dados[row, col] = cor
+
+    # Células do histórico aplicadas por quadro, para total células a animar
+    def _lote_por_quadro(self, total):
+        if self.celulas_por_quadro:
+            return self.celulas_por_quadro
+        return max(1, math.ceil(total / (self.fps * DURACAO_MAX_ANIMACAO)))
+
+    # Espera até o instante do próximo quadro processando eventos da janela (sem
+    # plt.pause, que forçaria um redesenho completo da figura)
+    def _aguardar(self, ate):
+        restante = ate - time.perf_counter()
+        if restante > 0:
+            self.fig.canvas.start_event_loop(restante)
+
     def on_click(self, event):
         if event.inaxes != self.ax:
             return
@@ -111,12 +183,12 @@ class InteractiveFloodFill:
         if 0 <= row < self.linhas and 0 <= col < self.colunas:
             if self.modo_desenho:
                 if self.grid[row][col] == 0:
-                    self.grid[row][col] = 1
+                    self._definir_celula(row, col, 1)
                     print(f"({row}, {col}) → Obstáculo")
                 elif self.grid[row][col] == 1:
-                    self.grid[row][col] = 0
+                    self._definir_celula(row, col, 0)
                     print(f"({row}, {col}) → Livre")
-                self.setup_plot()
+                self._atualizar_tela()
 
     def on_key(self, event):
         if event.key == "enter":
@@ -137,77 +209,92 @@ class InteractiveFloodFill:
             plt.close(self.fig)
             print("\n✓ Saindo...")
 
-    def preencher_tudo_animado(self):
-        self.ax.set_title(
-            "Preenchendo automaticamente...",
-            fontsize=12,
-            pad=20,
-        )
-        self.fig.canvas.draw()
-        plt.pause(0.5)
+    # Calcula todas as regiões num único histórico compacto (uma cópia do grid, busca
+    # da próxima célula livre retomada de onde parou) e devolve os intervalos de passos
+    # de cada região: [(inicio, fim, cor, origem)]
+    def _calcular_regioes(self):
+        grid_trabalho = copy.deepcopy(self.grid)
+        history = HistoricoPreenchimento(grid_trabalho)
+        regioes = []
+        cor = self.cor_atual
+        for i in range(self.linhas):
+            linha = grid_trabalho[i]
+            for j in range(self.colunas):
+                if linha[j] != 0:
+                    continue
+                inicio = len(history)
+                if colorir_regiao_history(
+                    grid_trabalho, start=(i, j), color=cor, history=history
+                ):
+                    regioes.append((inicio, len(history), cor, (i, j)))
+                    cor += 1
+        return history, regioes
+
+    # Mostra um quadro da animação e espera o instante do próximo. Se o desenho está
+    # atrasado mais de um quadro, este é descartado (os dados já foram aplicados e
+    # aparecem no próximo) para a animação manter a duração prevista.
+    def _quadro(self, titulo, proximo_quadro):
+        if time.perf_counter() > proximo_quadro + 1.0 / self.fps:
+            return
+        self._titulo(titulo)
+        self._atualizar_tela()
+        self._aguardar(proximo_quadro)
 
+    def preencher_tudo_animado(self):
+        self._titulo("Preenchendo automaticamente...")
+        self._atualizar_tela()
+        self._aguardar(time.perf_counter() + PAUSA_ENTRE_REGIOES)
+
+        history, regioes = self._calcular_regioes()
+        lote = self._lote_por_quadro(len(history))
+        intervalo = 1.0 / self.fps
+        proximo_quadro = time.perf_counter()
+        # células já aplicadas e ainda não mostradas: regiões pequenas dividem quadros
+        pendentes = 0
         regioes_preenchidas = 0
 
-        while True:
-            posicao_zero = None
-            for i in range(self.linhas):
-                for j in range(self.colunas):
-                    if self.grid[i][j] == 0:
-                        posicao_zero = (i, j)
-                        break
-                if posicao_zero:
-                    break
-
-            if not posicao_zero:
-                print(f"Nenhuma célula vazia encontrada. Finalizando...")
-                break
-
-            row, col = posicao_zero
-            print(
-                f"\nPreenchendo região {self.cor_atual - 1} a partir de ({row}, {col})"
-            )
-
-            history = []
-            grid_copy = copy.deepcopy(self.grid)
-            sucesso = colorir_regiao_history(
-                grid_copy, start=(row, col), color=self.cor_atual, history=history
-            )
-
-            if sucesso and len(history) > 0:
-                num_celulas = len(history)
-                print(f"✓ Região {self.cor_atual - 1}: {num_celulas} células")
-                regioes_preenchidas += 1
-
-                for frame_idx, frame in enumerate(history):
-                    self.grid = copy.deepcopy(frame)
-                    self.setup_plot()
-                    self.ax.set_title(
-                        f"Preenchendo região {self.cor_atual - 1}... ({frame_idx + 1}/{len(history)} células)",
-                        fontsize=12,
-                        pad=20,
+        for inicio, fim, cor, (row, col) in regioes:
+            num_celulas = fim - inicio
+            print(f"\nPreenchendo região {cor - 1} a partir de ({row}, {col})")
+            print(f"✓ Região {cor - 1}: {num_celulas} células")
+            regioes_preenchidas += 1
+            for k in range(inicio, fim):
+                r, c, cor_passo = history.passo(k)
+                self.grid[r][c] = cor_passo
+
+            posicao = inicio
+            while posicao < fim:
+                passo = min(lote - pendentes, fim - posicao)
+                history.aplicar(self._dados, posicao, posicao + passo)
+                posicao += passo
+                pendentes += passo
+                if pendentes >= lote:
+                    proximo_quadro += intervalo
+                    self._quadro(
+                        f"Preenchendo região {cor - 1}... ({posicao - inicio}/{num_celulas} células)",
+                        proximo_quadro,
                     )
-                    self.fig.canvas.draw()
-                    plt.pause(0.05)
+                    pendentes = 0
+            self.cor_atual = cor + 1
 
-                self.cor_atual += 1
-
-                self.setup_plot()
-                self.ax.set_title(
+            if num_celulas > lote:
+                proximo_quadro += intervalo
+                self._quadro(
                     f"Preenchendo... ({regioes_preenchidas} regiões encontradas)",
-                    fontsize=12,
-                    pad=20,
+                    proximo_quadro,
                 )
-                self.fig.canvas.draw()
-                plt.pause(0.5)
+                pendentes = 0
+                self._aguardar(time.perf_counter() + PAUSA_ENTRE_REGIOES)
+                proximo_quadro = time.perf_counter()
 
-        self.ax.set_title(
+        if not regioes:
+            print(f"Nenhuma célula vazia encontrada. Finalizando...")
+        self._titulo(
             f"✓ Concluído! {regioes_preenchidas} {'região' if regioes_preenchidas == 1 else 'regiões'} {'preenchida' if regioes_preenchidas == 1 else 'preenchidas'}\n"
-            f"Pressione R para resetar ou ESC para sair",
-            fontsize=12,
-            pad=20,
+            f"Pressione R para resetar ou ESC para sair"
         )
         self.animacao_concluida = True
-        self.fig.canvas.draw()
+        self._atualizar_tela()
         print(f"\n=== CONCLUÍDO ===")
         print(f"Total de regiões: {regioes_preenchidas}")
         print("Pressione R para resetar ou ESC para sair")
@@ -0,0 +1,107 @@
+import argparse
+import time
+from typing import Iterator, Tuple, Union
+
+import numpy as np
+
+from floodfill2 import (
+    pares_da_borda,
+    renumerar_rotulos,
+    rotular_componentes,
+    unir_rotulos,
+)
+
+# Lado (em células) dos blocos lidos por vez; a memória de pico é proporcional a
+# TAMANHO_BLOCO² e não ao tamanho do grid
+TAMANHO_BLOCO = 4096
+
+
+# Blocos (r0, r1, c0, c1) em ordem linha a linha
+def _blocos(
+    linhas: int, colunas: int, lado: int
+) -> Iterator[Tuple[int, int, int, int]]:
+    for r0 in range(0, linhas, lado):
+        for c0 in range(0, colunas, lado):
+            yield r0, min(linhas, r0 + lado), c0, min(colunas, c0 + lado)
+
+
+# Rotula as componentes 4-conexas das células com valor_livre de um grid maior que a
+# memória (numpy.memmap, caminho de um .npy ou qualquer array fatiável), bloco a bloco:
+#   1. cada bloco é rotulado sozinho com rotular_componentes e recebe rótulos
+#      provisórios globais (deslocados pelo total dos blocos anteriores), gravados em
+#      caminho_saida; as células livres vizinhas nas bordas com os blocos de cima e da
+#      esquerda viram pares de equivalência;
+#   2. um union-find sobre esses pares (só rótulos que tocam bordas) junta as
+#      componentes que atravessam blocos;
+#   3. cada bloco é relido e renumerado para rótulos finais consecutivos.
+# Retorna (rotulos, contagens): rotulos é o .npy de saída aberto por memmap (0 fora da
+# máscara, 1..n por componente, numeradas pela ordem da primeira célula na varredura
+# bloco a bloco) e contagens[k - 1] é o número de células da componente k. Fora os
+# blocos, a memória usada é proporcional às bordas e ao número de componentes.
+def rotular_em_blocos(
+    grade: Union[str, np.ndarray],
+    caminho_saida: str,
+    tamanho_bloco: int = TAMANHO_BLOCO,
+    valor_livre: int = 0,
+    dtype=np.int32,
+) -> Tuple[np.ndarray, np.ndarray]:
+    if isinstance(grade, str):
+        grade = np.load(grade, mmap_mode="r")
+    linhas, colunas = grade.shape
+    rotulos = np.lib.format.open_memmap(
+        caminho_saida, mode="w+", dtype=dtype, shape=(linhas, colunas)
+    )
+    maximo = np.iinfo(dtype).max
+
+    pares = []
+    total = 0
+    for r0, r1, c0, c1 in _blocos(linhas, colunas, tamanho_bloco):
+        livre = np.asarray(grade[r0:r1, c0:c1]) == valor_livre
+        locais, n = rotular_componentes(livre)
+        if total + n > maximo:
+            raise OverflowError(
+                f"Mais componentes provisórias do que cabem em {np.dtype(dtype)}"
+            )
+        locais = locais.astype(dtype, copy=False)
+        locais[livre] += total
+        total += n
+        rotulos[r0:r1, c0:c1] = locais
+        if r0 > 0:
+            pares.append(pares_da_borda(rotulos[r0 - 1, c0:c1], locais[0]))
+        if c0 > 0:
+            pares.append(pares_da_borda(rotulos[r0:r1, c0 - 1], locais[:, 0]))
+
+    equivalencias = unir_rotulos(np.concatenate(pares) if pares else [])
+    absorvidos = equivalencias[2]
+    contagens = np.zeros(total - len(absorvidos), dtype=np.int64)
+    for r0, r1, c0, c1 in _blocos(linhas, colunas, tamanho_bloco):
+        bloco = np.asarray(rotulos[r0:r1, c0:c1]).astype(np.int64)
+        livre = bloco > 0
+        valores = renumerar_rotulos(bloco[livre], *equivalencias)
+        bloco[livre] = valores
+        rotulos[r0:r1, c0:c1] = bloco
+        presentes, celulas = np.unique(valores, return_counts=True)
+        contagens[presentes - 1] += celulas
+    rotulos.flush()
+    return rotulos, contagens
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Rotula as regiões de um grid .npy maior que a memória"
+    )
+    parser.add_argument("entrada", help="grid .npy (0 = livre)")
+    parser.add_argument("saida", help="mapa de rótulos .npy gerado")
+    parser.add_argument("--bloco", type=int, default=TAMANHO_BLOCO)
+    parser.add_argument("--maiores", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    inicio = time.perf_counter()
+    _, contagens = rotular_em_blocos(args.entrada, args.saida, args.bloco)
+    print(f"{len(contagens)} regiões em {time.perf_counter() - inicio:.1f} s")
+    for k in np.argsort(contagens, kind="stable")[::-1][: args.maiores]:
+        print(f"  região {k + 1}: {contagens[k]} células")
+
+
+if __name__ == "__main__":
+    main()
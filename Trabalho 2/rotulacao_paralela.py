@@ -0,0 +1,132 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from floodfill2 import (
+    pares_da_borda,
+    renumerar_rotulos,
+    rotular_componentes,
+    unir_rotulos,
+)
+
+# Abaixo disto (células por processo) o custo de iniciar processos supera o ganho
+CELULAS_MINIMAS_POR_PROCESSO = 1 << 16
+
+
+# Faixas horizontais [r0, r1) de tamanhos quase iguais, uma por processo
+def _faixas(linhas: int, processos: int) -> List[Tuple[int, int]]:
+    limites = np.linspace(0, linhas, processos + 1).astype(int)
+    return [(int(a), int(b)) for a, b in zip(limites[:-1], limites[1:]) if b > a]
+
+
+# Array numpy sobre um bloco de memória compartilhada já criado por outro processo
+def _anexar(nome: str, forma, dtype):
+    memoria = shared_memory.SharedMemory(name=nome)
+    return memoria, np.ndarray(forma, dtype=dtype, buffer=memoria.buf)
+
+
+# Tarefa de cada processo: rotula a sua faixa da máscara compartilhada e grava os
+# rótulos locais (1..n da faixa) no bloco de rótulos. Retorna n.
+def _rotular_faixa(nome_livre: str, nome_rotulos: str, forma, r0: int, r1: int) -> int:
+    memoria_livre, livre = _anexar(nome_livre, forma, np.bool_)
+    memoria_rotulos, rotulos = _anexar(nome_rotulos, forma, np.int32)
+    locais, n = rotular_componentes(livre[r0:r1])
+    rotulos[r0:r1] = locais
+    # os arrays precisam ser liberados antes de fechar a memória que eles usam
+    del livre, rotulos
+    memoria_livre.close()
+    memoria_rotulos.close()
+    return n
+
+
+# Tarefa de cada processo: troca os rótulos locais da faixa pelos rótulos finais
+def _renumerar_faixa(
+    nome_rotulos: str, forma, r0: int, r1: int, deslocamento: int, equivalencias
+):
+    memoria, rotulos = _anexar(nome_rotulos, forma, np.int32)
+    faixa = rotulos[r0:r1]
+    livre = faixa > 0
+    faixa[livre] = renumerar_rotulos(faixa[livre] + deslocamento, *equivalencias)
+    del rotulos, faixa
+    memoria.close()
+
+
+# Mesmo resultado de rotular_componentes (rótulos numerados na ordem linha a linha da
+# primeira célula de cada componente), dividindo o grid em faixas horizontais rotuladas
+# em processos separados. A máscara e os rótulos ficam em multiprocessing.shared_memory,
+# então os processos não recebem nem devolvem o grid. As componentes que atravessam as
+# bordas das faixas são unidas por unir_rotulos; como a faixa de cima numera primeiro,
+# a menor raiz de cada componente é a da sua primeira célula, e a renumeração final
+# (também em paralelo) reproduz a ordem linha a linha.
+def rotular_componentes_paralelo(
+    livre: np.ndarray, processos: Optional[int] = None
+) -> Tuple[np.ndarray, int]:
+    livre = np.asarray(livre, dtype=bool)
+    forma = livre.shape
+    processos = min(
+        processos or os.cpu_count() or 1,
+        forma[0],
+        livre.size // CELULAS_MINIMAS_POR_PROCESSO,
+    )
+    if processos <= 1:
+        return rotular_componentes(livre)
+
+    faixas = _faixas(forma[0], processos)
+    memoria_livre = shared_memory.SharedMemory(create=True, size=livre.nbytes)
+    memoria_rotulos = shared_memory.SharedMemory(create=True, size=livre.size * 4)
+    rotulos = None
+    try:
+        np.ndarray(forma, dtype=np.bool_, buffer=memoria_livre.buf)[:] = livre
+        rotulos = np.ndarray(forma, dtype=np.int32, buffer=memoria_rotulos.buf)
+        with ProcessPoolExecutor(len(faixas)) as executor:
+            tarefas = [
+                executor.submit(
+                    _rotular_faixa,
+                    memoria_livre.name,
+                    memoria_rotulos.name,
+                    forma,
+                    r0,
+                    r1,
+                )
+                for r0, r1 in faixas
+            ]
+            contagens = [tarefa.result() for tarefa in tarefas]
+            deslocamentos = np.concatenate([[0], np.cumsum(contagens)[:-1]])
+
+            # equivalências entre a última linha de cada faixa e a primeira da seguinte
+            pares = []
+            for k in range(1, len(faixas)):
+                r = faixas[k][0]
+                acima = rotulos[r - 1].astype(np.int64)
+                abaixo = rotulos[r].astype(np.int64)
+                acima[acima > 0] += deslocamentos[k - 1]
+                abaixo[abaixo > 0] += deslocamentos[k]
+                pares.append(pares_da_borda(acima, abaixo))
+            equivalencias = unir_rotulos(np.concatenate(pares))
+
+            tarefas = [
+                executor.submit(
+                    _renumerar_faixa,
+                    memoria_rotulos.name,
+                    forma,
+                    r0,
+                    r1,
+                    int(deslocamento),
+                    equivalencias,
+                )
+                for (r0, r1), deslocamento in zip(faixas, deslocamentos)
+            ]
+            for tarefa in tarefas:
+                tarefa.result()
+        resultado = rotulos.copy()
+    finally:
+        # o array precisa ser liberado antes de fechar a memória que ele usa
+        rotulos = None
+        memoria_livre.close()
+        memoria_livre.unlink()
+        memoria_rotulos.close()
+        memoria_rotulos.unlink()
+    return resultado, sum(contagens) - len(equivalencias[2])
@@ -1,6 +1,24 @@
 import unittest
 import copy
-from floodfill2 import colorir_regiao, colorir_todas_regioes
+import os
+import random
+import tempfile
+from unittest import mock
+import numpy as np
+from PIL import Image, ImageSequence
+from floodfill2 import (
+    HistoricoPreenchimento,
+    colorir_regiao,
+    colorir_regiao_history,
+    colorir_todas_regioes,
+    rotular_componentes,
+)
+from rotulacao_blocos import rotular_em_blocos
+from rotulacao_paralela import rotular_componentes_paralelo
+from visualize2 import exportar_gif
+
+# módulo de Trabalho 1, no caminho de busca depois de importar visualize2
+import exportador_gif  # noqa: E402
 
 
 class TestFloodFill(unittest.TestCase):
@@ -147,8 +165,9 @@ class TestFloodFill(unittest.TestCase):
             grid, inicio=(0, 0), primeiro_cor=2, record_history=True
         )
         self.assertIn(-1, resultado)
-        self.assertIsInstance(resultado[-1], list)
+        self.assertIsInstance(resultado[-1], HistoricoPreenchimento)
         self.assertGreater(len(resultado[-1]), 0)
+        self.assertIsInstance(resultado[-1].para_lista(), list)
 
     def test_record_history_ausente(self):
         grid = [[0, 0], [0, 0]]
@@ -175,6 +194,221 @@ class TestFloodFill(unittest.TestCase):
         self.assertEqual(len(resultado), 1)
         self.assertEqual(len(resultado[2]), tamanho * tamanho)
 
+    def test_historico_compacto_equivale_a_lista(self):
+        grid = [
+            [0, 0, 1, 0],
+            [0, 1, 1, 0],
+            [0, 0, 0, 0],
+        ]
+        grid_lista = copy.deepcopy(grid)
+        grid_compacto = copy.deepcopy(grid)
+        lista = []
+        historico = HistoricoPreenchimento(grid_compacto)
+        colorir_regiao_history(grid_lista, (0, 0), 2, lista)
+        colorir_regiao_history(grid_compacto, (0, 0), 2, historico)
+        self.assertEqual(len(historico), len(lista))
+        self.assertEqual(historico.para_lista(), lista)
+        self.assertEqual(historico.frame(3).tolist(), lista[3])
+        self.assertEqual(historico[-1].tolist(), grid_compacto)
+        self.assertEqual(historico.passo(0), (0, 0, 2))
+
+    def test_historico_aplicar_incremental(self):
+        grid = [[0, 0, 0], [0, 0, 0]]
+        resultado = colorir_todas_regioes(grid, record_history=True)
+        historico = resultado[-1]
+        matriz = historico.inicial.copy()
+        historico.aplicar(matriz, 0, 2)
+        historico.aplicar(matriz, 2, 4)
+        self.assertEqual(matriz.tolist(), historico.frame(3).tolist())
+        with self.assertRaises(IndexError):
+            historico.frame(len(historico))
+
+    def test_rotulos_equivalente_bfs(self):
+        rng = random.Random(42)
+        for _ in range(200):
+            linhas, colunas = rng.randint(1, 10), rng.randint(1, 10)
+            grid = [
+                [rng.choice([0, 0, 0, 1, 1, 2]) for _ in range(colunas)]
+                for _ in range(linhas)
+            ]
+            inicio = (rng.randint(0, linhas - 1), rng.randint(0, colunas - 1))
+            grid_bfs = copy.deepcopy(grid)
+            grid_rot = copy.deepcopy(grid)
+            esperado = colorir_todas_regioes(grid_bfs, inicio=inicio, primeiro_cor=2)
+            resultado = colorir_todas_regioes(
+                grid_rot, inicio=inicio, primeiro_cor=2, metodo="rotulos"
+            )
+            self.assertEqual(list(resultado.items()), list(esperado.items()))
+            self.assertEqual(grid_rot, grid_bfs)
+
+    def test_rotulos_grid_numpy(self):
+        grid = np.array([[0, 1, 0], [0, 1, 0], [1, 1, 0]])
+        resultado = colorir_todas_regioes(grid, inicio=(0, 2), metodo="rotulos")
+        self.assertEqual(resultado[2], [(0, 2), (1, 2), (2, 2)])
+        self.assertEqual(resultado[3], [(0, 0), (1, 0)])
+        self.assertEqual(grid.tolist(), [[3, 1, 2], [3, 1, 2], [1, 1, 2]])
+
+    def test_rotular_componentes_paralelo_equivalente(self):
+        rng = np.random.default_rng(9)
+        for densidade in (0.0, 0.45, 1.0):
+            livre = rng.random((420, 500)) >= densidade
+            esperado, n = rotular_componentes(livre)
+            rotulos, m = rotular_componentes_paralelo(livre, processos=3)
+            self.assertEqual(m, n)
+            self.assertTrue(np.array_equal(rotulos, esperado))
+
+    def test_todas_regioes_paralelo(self):
+        grid = [[0, 1, 0, 0], [1, 1, 1, 0], [0, 0, 1, 0]]
+        grid_rot = copy.deepcopy(grid)
+        esperado = colorir_todas_regioes(grid_rot, inicio=(2, 0), metodo="rotulos")
+        resultado = colorir_todas_regioes(grid, inicio=(2, 0), metodo="paralelo")
+        self.assertEqual(list(resultado.items()), list(esperado.items()))
+        self.assertEqual(grid, grid_rot)
+
+    def test_rotular_componentes_ordem_linha(self):
+        livre = np.array(
+            [
+                [0, 0, 0, 1],
+                [1, 0, 0, 1],
+                [1, 1, 0, 1],
+            ],
+            dtype=bool,
+        )
+        rotulos, n = rotular_componentes(livre)
+        self.assertEqual(n, 2)
+        self.assertEqual(rotulos[0, 3], 1)
+        self.assertEqual(rotulos[1, 0], 2)
+        self.assertEqual(rotulos[0, 0], 0)
+
+    def test_scanline_equivalente_bfs(self):
+        rng = random.Random(7)
+        for _ in range(200):
+            linhas, colunas = rng.randint(1, 12), rng.randint(1, 80)
+            grid = [
+                [rng.choice([0, 0, 0, 1, 2]) for _ in range(colunas)]
+                for _ in range(linhas)
+            ]
+            inicio = (rng.randint(0, linhas - 1), rng.randint(0, colunas - 1))
+            grid_bfs = copy.deepcopy(grid)
+            grid_scan = copy.deepcopy(grid)
+            grid_np = np.array(grid)
+            esperado = colorir_regiao(grid_bfs, inicio, 9)
+            self.assertEqual(
+                colorir_regiao(grid_scan, inicio, 9, metodo="scanline"), esperado
+            )
+            self.assertEqual(
+                colorir_regiao(grid_np, inicio, 9, metodo="scanline"), esperado
+            )
+            self.assertEqual(grid_scan, grid_bfs)
+            self.assertEqual(grid_np.tolist(), grid_bfs)
+
+    def test_scanline_menos_enfileirados_em_area_aberta(self):
+        bfs, scan = {}, {}
+        colorir_regiao([[0] * 30 for _ in range(30)], (0, 0), 2, estatisticas=bfs)
+        colorir_regiao(
+            [[0] * 30 for _ in range(30)],
+            (0, 0),
+            2,
+            metodo="scanline",
+            estatisticas=scan,
+        )
+        self.assertEqual(bfs["enfileirados"], 900)
+        self.assertEqual(scan["enfileirados"], 30)
+        self.assertLess(scan["max_fila"], bfs["max_fila"])
+
+    def test_todas_regioes_scanline(self):
+        grid = [
+            [0, 1, 0, 1, 0],
+            [0, 1, 0, 1, 0],
+            [1, 1, 1, 1, 1],
+            [0, 0, 1, 0, 0],
+        ]
+        esperado_grid = copy.deepcopy(grid)
+        esperado = colorir_todas_regioes(esperado_grid, inicio=(3, 4))
+        resultado = colorir_todas_regioes(grid, inicio=(3, 4), metodo="scanline")
+        self.assertEqual(resultado, esperado)
+        self.assertEqual(grid, esperado_grid)
+
+    def test_metodo_invalido(self):
+        with self.assertRaises(ValueError):
+            colorir_todas_regioes([[0]], metodo="desconhecido")
+
+    def test_exportar_gif_quadro_final(self):
+        grid = [
+            [0, 0, 1, 0],
+            [1, 0, 1, 0],
+            [0, 1, 1, 0],
+        ]
+        resultados = colorir_todas_regioes(grid, inicio=(0, 0), record_history=True)
+        history = resultados[-1]
+        with tempfile.TemporaryDirectory() as pasta:
+            caminho = os.path.join(pasta, "teste.gif")
+            quadros = exportar_gif(history, caminho, a_cada=2, tamanho_max=8)
+            imagem = Image.open(caminho)
+            self.assertEqual(imagem.size, (8, 6))
+            self.assertEqual(imagem.n_frames, quadros)
+            self.assertEqual(quadros, (len(history) + 1) // 2)
+            for quadro in ImageSequence.Iterator(imagem):
+                ultimo = np.asarray(quadro.convert("RGB"))
+            imagem.close()
+        # cada célula vira um bloco 2x2 com a cor do seu valor final
+        celulas = ultimo[::2, ::2]
+        for i, linha in enumerate(grid):
+            for j, valor in enumerate(linha):
+                iguais = [
+                    (celulas[i, j] == celulas[a, b]).all()
+                    for a, b in np.ndindex(3, 4)
+                    if grid[a][b] == valor
+                ]
+                self.assertTrue(all(iguais))
+        self.assertFalse((celulas[0, 0] == celulas[0, 3]).all())
+
+    # Sem os codificadores semi-privados do Pillow o GIF sai por Image.save, com os
+    # mesmos quadros e durações
+    def test_exportar_gif_sem_codificadores_do_pillow(self):
+        rng = np.random.default_rng(3)
+        grid = (rng.random((12, 18)) < 0.4).astype(int).tolist()
+        history = colorir_todas_regioes(grid, inicio=(0, 0), record_history=True)[-1]
+
+        def quadros(caminho):
+            with Image.open(caminho) as imagem:
+                return [
+                    (np.asarray(q.convert("RGB")), q.info.get("duration"))
+                    for q in ImageSequence.Iterator(imagem)
+                ]
+
+        with tempfile.TemporaryDirectory() as pasta:
+            direto = os.path.join(pasta, "direto.gif")
+            salvo = os.path.join(pasta, "salvo.gif")
+            n_direto = exportar_gif(history, direto, a_cada=3, tamanho_max=36)
+            with mock.patch.multiple(exportador_gif, getdata=None, getheader=None):
+                n_salvo = exportar_gif(history, salvo, a_cada=3, tamanho_max=36)
+            esperado, obtido = quadros(direto), quadros(salvo)
+        self.assertEqual(n_salvo, n_direto)
+        self.assertEqual(len(obtido), len(esperado))
+        for (a, duracao_a), (b, duracao_b) in zip(obtido, esperado):
+            self.assertTrue((a == b).all())
+            self.assertEqual(duracao_a, duracao_b)
+
+    def test_rotular_em_blocos_equivalente(self):
+        rng = np.random.default_rng(5)
+        grid = (rng.random((97, 130)) < 0.45).astype(np.uint8)
+        esperado, n = rotular_componentes(grid == 0)
+        with tempfile.TemporaryDirectory() as pasta:
+            entrada = os.path.join(pasta, "grid.npy")
+            np.save(entrada, grid)
+            rotulos, contagens = rotular_em_blocos(
+                entrada, os.path.join(pasta, "rotulos.npy"), tamanho_bloco=16
+            )
+            rotulos = np.array(rotulos)
+        livre = grid == 0
+        self.assertEqual(len(contagens), n)
+        self.assertTrue(((rotulos > 0) == livre).all())
+        # mesma partição: cada rótulo por blocos corresponde a exatamente um rótulo global
+        pares = np.unique(np.stack([rotulos[livre], esperado[livre]], axis=1), axis=0)
+        self.assertEqual(len(pares), n)
+        self.assertEqual(contagens.tolist(), np.bincount(rotulos[livre])[1:].tolist())
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -3,7 +3,89 @@ import matplotlib.animation as animation
 import numpy as np
 import datetime
 import os
-from floodfill2 import colorir_todas_regioes
+import sys
+from floodfill2 import colorir_todas_regioes, HistoricoPreenchimento
+
+# O codificador de GIF é o de Trabalho 1/exportador_gif.py (acrescentado ao fim do
+# caminho de busca, para não esconder os módulos deste diretório)
+sys.path.append(
+    os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Trabalho 1"
+    )
+)
+from exportador_gif import ExportadorGif  # noqa: E402
+
+CORES_BASE = ["white", "black", "red", "blue", "orange", "yellow", "green"]
+CORES_EXTRAS = [
+    (0.5, 0, 0.5),
+    (0, 0.5, 0.5),
+    (1, 0.75, 0.8),
+    (0.6, 0.4, 0.2),
+    (0.5, 0.5, 0.5),
+    (0.4, 0, 0.8),
+    (0.8, 0.4, 0),
+    (0, 0.6, 0.3),
+    (0.7, 0.3, 0.7),
+    (0.3, 0.7, 0.7),
+    (0.9, 0.6, 0.1),
+    (0.2, 0.8, 0.2),
+    (0.8, 0.2, 0.2),
+    (0.2, 0.2, 0.8),
+    (0.6, 0.6, 0),
+    (0, 0.6, 0.6),
+    (0.6, 0, 0.6),
+    (0.8, 0.8, 0.4),
+    (0.4, 0.8, 0.8),
+    (0.8, 0.4, 0.8),
+]
+# Maior lado (pixels) do GIF gerado por exportar_gif
+TAMANHO_MAX_GIF = 800
+
+
+# Quadros do histórico, um a cada a_cada passos (o último sempre incluído). O
+# histórico compacto é aplicado em blocos sobre uma única matriz.
+def _frames_do_historico(history, a_cada):
+    total = len(history)
+    if isinstance(history, HistoricoPreenchimento):
+        matriz = history.inicial.copy()
+        for inicio in range(0, total, a_cada):
+            history.aplicar(matriz, inicio, min(inicio + a_cada, total))
+            yield matriz
+    else:
+        for i in range(a_cada - 1, total - 1, a_cada):
+            yield np.asarray(history[i])
+        yield np.asarray(history[total - 1])
+
+
+# Exporta o histórico direto para um GIF, sem matplotlib, com o ExportadorGif de
+# Trabalho 1: cada quadro vira uma imagem de paleta (valor da célula = índice da cor;
+# regiões além da lista reutilizam as cores a partir da 2) escrita no disco assim que
+# é gerada. Grids maiores que tamanho_max são reduzidos amostrando linhas e colunas.
+# Retorna o número de quadros gravados.
+def exportar_gif(
+    history, out_path, a_cada=1, tamanho_max=TAMANHO_MAX_GIF, duracao_ms=200
+):
+    from matplotlib.colors import to_hex
+
+    cores = [to_hex(cor) for cor in CORES_BASE + CORES_EXTRAS]
+    frames = _frames_do_historico(history, max(1, a_cada))
+    primeiro = next(frames, None)
+    if primeiro is None:
+        return 0
+    linhas, colunas = primeiro.shape
+    with ExportadorGif(
+        out_path,
+        linhas,
+        colunas,
+        tamanho_max,
+        duracao_ms,
+        cores=cores,
+        reciclar_de=2,
+    ) as exportador:
+        exportador.adicionar(primeiro)
+        for matriz in frames:
+            exportador.adicionar(matriz)
+    return exportador.quadros
 
 
 def animate_history(history, save_gif=False, out_path=None, interval=200):
@@ -11,37 +93,43 @@ def animate_history(history, save_gif=False, out_path=None, interval=200):
         print("Nenhum histórico recebido para animar.")
         return
 
-    arr0 = np.array(history[0])
+    if save_gif:
+        if out_path is None:
+            ts = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+            out_path = f"animation_{ts}.gif"
+        try:
+            exportar_gif(history, out_path, duracao_ms=interval)
+            print(f"GIF salvo em: {out_path}")
+        except Exception as e:
+            print(f"Erro ao salvar GIF: {e}")
+        return
+
+    if isinstance(history, HistoricoPreenchimento):
+        # reproduz o histórico compacto avançando uma única matriz passo a passo
+        matriz = history.inicial.copy()
+        estado = {"frame": -1}
+
+        def obter_frame(i):
+            if i < estado["frame"]:
+                matriz[...] = history.inicial
+                estado["frame"] = -1
+            history.aplicar(matriz, estado["frame"] + 1, i + 1)
+            estado["frame"] = i
+            return matriz
+
+    else:
+
+        def obter_frame(i):
+            return np.array(history[i])
+
+    arr0 = obter_frame(0)
     linhas, colunas = arr0.shape
 
     fig, ax = plt.subplots(figsize=(6, 6))
 
     from matplotlib.colors import ListedColormap
 
-    cores_base = ["white", "black", "red", "blue", "orange", "yellow", "green"]
-    cores_extras = [
-        (0.5, 0, 0.5),
-        (0, 0.5, 0.5),
-        (1, 0.75, 0.8),
-        (0.6, 0.4, 0.2),
-        (0.5, 0.5, 0.5),
-        (0.4, 0, 0.8),
-        (0.8, 0.4, 0),
-        (0, 0.6, 0.3),
-        (0.7, 0.3, 0.7),
-        (0.3, 0.7, 0.7),
-        (0.9, 0.6, 0.1),
-        (0.2, 0.8, 0.2),
-        (0.8, 0.2, 0.2),
-        (0.2, 0.2, 0.8),
-        (0.6, 0.6, 0),
-        (0, 0.6, 0.6),
-        (0.6, 0, 0.6),
-        (0.8, 0.8, 0.4),
-        (0.4, 0.8, 0.8),
-        (0.8, 0.4, 0.8),
-    ]
-    cores = cores_base + cores_extras
+    cores = CORES_BASE + CORES_EXTRAS
     cmap = ListedColormap(cores)
 
     img = ax.imshow(arr0, cmap=cmap, vmin=0, vmax=6, animated=True)
@@ -51,26 +139,19 @@ def animate_history(history, save_gif=False, out_path=None, interval=200):
     ax.grid(False)
 
     def atualizar(i):
-        img.set_data(np.array(history[i]))
+        img.set_data(obter_frame(i))
         ax.set_title(f"Frame {i+1}/{len(history)}")
         return [img]
 
+    # a animação precisa de uma referência viva enquanto a janela estiver aberta;
+    # devolvê-la a mantém também com o modo interativo (plt.show não bloqueia)
     anim = animation.FuncAnimation(
         fig, atualizar, frames=len(history), interval=interval, blit=True
     )
 
     plt.tight_layout()
-    if save_gif:
-        if out_path is None:
-            ts = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-            out_path = f"animation_{ts}.gif"
-        try:
-            anim.save(out_path, writer="pillow")
-            print(f"GIF salvo em: {out_path}")
-        except Exception as e:
-            print(f"Erro ao salvar GIF: {e}")
-    else:
-        plt.show()
+    plt.show()
+    return anim
 
 
 if __name__ == "__main__":
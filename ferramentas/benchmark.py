@@ -0,0 +1,519 @@
+import argparse
+import datetime
+import json
+import math
+import multiprocessing
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(RAIZ, "Trabalho 1"))
+sys.path.insert(0, os.path.join(RAIZ, "Trabalho 2"))
+
+from execucao import BuscaCancelada
+from floodfill import FloodFill
+from floodfill2 import colorir_regiao, colorir_todas_regioes, rotular_componentes
+from geradores import gerar, posicionar_extremos
+from hpa import PlanejadorHPA
+from pathfinder import PathFinder
+
+TAMANHOS = (100, 256, 512, 1024, 2048, 4096)
+DENSIDADES = (0.1, 0.3)
+# Tamanhos e topologias padrão da comparação do HPA* com o A* plano (comando hpa)
+TAMANHOS_HPA = (256, 512, 1024)
+TOPOLOGIAS_HPA = ("aleatorio_0.2", "cavernas", "salas")
+# Tempo máximo (s) de cada execução: cada caso roda num processo separado, encerrado ao
+# passar do limite. Uma combinação motor/topologia que estoura (ou cuja estimativa a
+# partir do tamanho anterior passa do limite) não roda nos tamanhos maiores.
+LIMITE_S = 60.0
+# A execução com tracemalloc é mais lenta: recebe este múltiplo do limite
+FATOR_MEMORIA = 10
+# Acima desta razão (novo / base) o tempo ou a memória contam como regressão
+TOLERANCIA = 1.10
+# Diferenças de tempo menores que isto (ms) são ruído de medição, não regressão
+DIFERENCA_MINIMA_MS = 5.0
+
+
+# ---- Topologias: geradores de Trabalho 1/geradores.py mais um caso extremo ----
+
+
+# Corredores horizontais em serpentina: paredes a cada duas linhas com uma única
+# passagem, alternando entre as extremidades (o caminho percorre o grid inteiro)
+def gerar_corredores(tamanho, semente):
+    grid = np.zeros((tamanho, tamanho), dtype=np.uint8)
+    grid[1::2, :] = 1
+    grid[1::4, -1] = 0
+    grid[3::4, 0] = 0
+    return grid
+
+
+def _gerador(tipo, **opcoes):
+    return lambda tamanho, semente: gerar(tipo, tamanho, tamanho, semente, **opcoes)
+
+
+# Nome -> (fábrica(tamanho, semente), conexo); as densidades viram "aleatorio_<d>".
+# conexo indica que todas as células livres formam uma única região.
+def topologias(densidades):
+    fabricas = {"aberto": (_gerador("aberto"), True)}
+    for densidade in densidades:
+        fabricas[f"aleatorio_{densidade:g}"] = (
+            _gerador("densidade", densidade=densidade),
+            False,
+        )
+    fabricas["cavernas"] = (_gerador("cavernas"), False)
+    fabricas["labirinto"] = (_gerador("labirinto"), True)
+    fabricas["divisao"] = (_gerador("divisao"), True)
+    fabricas["salas"] = (_gerador("salas"), True)
+    fabricas["corredores"] = (gerar_corredores, True)
+    return fabricas
+
+
+# ---- Motores: cada um recebe o grid (list of lists) e o início, devolve métricas ----
+
+
+def _prazo(limite_s):
+    fim = time.perf_counter() + limite_s
+    return lambda expandidos, fronteira: time.perf_counter() < fim
+
+
+def _flood_fill(motor):
+    def executar(grid, inicio, limite_s):
+        ff = FloodFill(grid, motor=motor)
+        ff.progresso = _prazo(limite_s)
+        caminhos = ff.buscar_caminho()
+        comprimento = max((len(c) for c in caminhos.values()), default=0)
+        return {"expandidos": ff.last_expandidos, "comprimento": comprimento}
+
+    return executar
+
+
+def _a_estrela(diagonal, modo="padrao"):
+    def executar(grid, inicio, limite_s):
+        pf = PathFinder(grid, diagonal=diagonal, modo=modo)
+        pf.progresso = _prazo(limite_s)
+        caminho = pf.a_estrela()
+        return {
+            "expandidos": pf.last_expandidos,
+            "comprimento": len(caminho) if caminho else 0,
+        }
+
+    return executar
+
+
+def _colorir_regiao(metodo):
+    def executar(grid, inicio, limite_s):
+        # o flood fill de Trabalho 2 trata só o valor 0 como livre
+        grid[inicio[0]][inicio[1]] = 0
+        estatisticas = {}
+        colorir_regiao(grid, inicio, 5, metodo=metodo, estatisticas=estatisticas)
+        return {"expandidos": estatisticas.get("enfileirados", 0)}
+
+    return executar
+
+
+def _colorir_todas(metodo):
+    def executar(grid, inicio, limite_s):
+        resultado = colorir_todas_regioes(grid, inicio=(0, 0), metodo=metodo)
+        return {"regioes": len(resultado)}
+
+    return executar
+
+
+# Nome -> (executar, maior tamanho da suíte padrão). Os motores em Python puro param
+# em 1024 (alguns segundos por execução); colorir_todas_regioes com BFS cresce com o
+# número de regiões e para em 256; os vetorizados vão até o fim de TAMANHOS.
+MOTORES = {
+    "floodfill": (_flood_fill("padrao"), 1024),
+    "floodfill_numpy": (_flood_fill("numpy"), 4096),
+    "a_estrela_4": (_a_estrela(False), 1024),
+    "a_estrela_8": (_a_estrela(True), 1024),
+    "a_estrela_bidirecional_4": (_a_estrela(False, "bidirecional"), 1024),
+    "a_estrela_jps_8": (_a_estrela(True, "jps"), 1024),
+    "a_estrela_hpa_8": (_a_estrela(True, "hpa"), 1024),
+    "a_estrela_dial_8": (_a_estrela(True, "dial"), 1024),
+    "colorir_regiao": (_colorir_regiao("bfs"), 1024),
+    "colorir_regiao_scanline": (_colorir_regiao("scanline"), 1024),
+    "colorir_todas_regioes": (_colorir_todas("bfs"), 256),
+    "colorir_todas_regioes_rotulos": (_colorir_todas("rotulos"), 4096),
+    "colorir_todas_regioes_paralelo": (_colorir_todas("paralelo"), 4096),
+}
+
+
+# Executado no processo filho: manda ao pai, pela conexão, cada medição assim que ela
+# termina; ("tempo", ms, métricas) por repetição e ("memoria", kb, None) no fim
+def _medir_no_processo(conexao, nome, base, inicio, repeticoes, limite_s, memoria):
+    executar = MOTORES[nome][0]
+    try:
+        for _ in range(repeticoes):
+            grid = base.tolist()
+            t0 = time.perf_counter()
+            metricas = executar(grid, inicio, limite_s)
+            conexao.send(("tempo", (time.perf_counter() - t0) * 1000.0, metricas))
+        if memoria:
+            grid = base.tolist()
+            tracemalloc.start()
+            executar(grid, inicio, limite_s * FATOR_MEMORIA)
+            _, pico = tracemalloc.get_traced_memory()
+            conexao.send(("memoria", pico / 1024.0, None))
+    except BuscaCancelada:
+        conexao.send(("cancelada", None, None))
+    finally:
+        conexao.close()
+
+
+# fork evita reimportar os módulos a cada caso; onde não existe, o padrão da plataforma
+def _contexto():
+    if "fork" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("fork")
+    return multiprocessing.get_context()
+
+
+# Mede um motor sobre um grid num processo separado: melhor tempo e mediana das
+# repetições e, numa execução à parte (tracemalloc deixa tudo mais lento), o pico de
+# memória. Os motores sem callback de progresso (os de Trabalho 2) também respeitam o
+# limite: o processo é encerrado quando uma execução passa dele.
+def medir(nome, base, inicio, repeticoes, limite_s, memoria):
+    contexto = _contexto()
+    receptor, emissor = contexto.Pipe(duplex=False)
+    processo = contexto.Process(
+        target=_medir_no_processo,
+        args=(emissor, nome, base, inicio, repeticoes, limite_s, memoria),
+    )
+    processo.start()
+    emissor.close()
+    esgotado = {"status": "tempo_esgotado", "tempo_ms": limite_s * 1000.0}
+    tempos = []
+    metricas = {}
+    pico_kb = None
+    try:
+        for k in range(repeticoes + int(memoria)):
+            medindo_memoria = k == repeticoes
+            espera = limite_s * (FATOR_MEMORIA if medindo_memoria else 1)
+            try:
+                tipo, valor, dados = (
+                    receptor.recv() if receptor.poll(espera) else ("limite", 0, None)
+                )
+            except EOFError:
+                return {"status": "erro", "erro": f"código {processo.exitcode}"}
+            if tipo in ("limite", "cancelada"):
+                if medindo_memoria:
+                    break
+                return esgotado
+            if tipo == "memoria":
+                pico_kb = valor
+            else:
+                tempos.append(valor)
+                metricas = dados
+    finally:
+        if processo.is_alive():
+            processo.terminate()
+        processo.join()
+        receptor.close()
+    resultado = {
+        "status": "ok",
+        "tempo_ms": min(tempos),
+        "tempo_mediana_ms": statistics.median(tempos),
+    }
+    resultado.update(metricas)
+    if pico_kb is not None:
+        resultado["pico_memoria_kb"] = pico_kb
+    return resultado
+
+
+def executar_suite(args):
+    fabricas = topologias(args.densidades)
+    if args.topologias:
+        fabricas = {n: f for n, f in fabricas.items() if n in args.topologias}
+    motores = {
+        n: m for n, m in MOTORES.items() if not args.motores or n in args.motores
+    }
+    # sem --tamanhos, cada motor roda só até o seu maior tamanho da suíte padrão
+    padrao = args.tamanhos is None
+    tamanhos = TAMANHOS if padrao else args.tamanhos
+    limite_ms = args.limite * 1000.0
+    resultados = []
+    # (motor, topologia) -> (tamanho, tempo em ms) da última medição; None se estourou
+    anteriores = {}
+    for tamanho in sorted(tamanhos):
+        for topologia, (fabrica, conexo) in fabricas.items():
+            base = fabrica(tamanho, args.semente)
+            extremos = posicionar_extremos(base, conexo)
+            if extremos is None:
+                continue
+            inicio = extremos[0]
+            for nome, (_, maximo) in motores.items():
+                if padrao and tamanho > maximo:
+                    continue
+                registro = {"motor": nome, "topologia": topologia, "tamanho": tamanho}
+                anterior = anteriores.get((nome, topologia), (tamanho, 0.0))
+                # o tempo cresce ao menos com o número de células
+                estimativa = None
+                if anterior is not None:
+                    estimativa = anterior[1] * (tamanho / anterior[0]) ** 2
+                if estimativa is None or estimativa > limite_ms:
+                    registro["status"] = "pulado"
+                    if estimativa is not None:
+                        registro["estimativa_ms"] = estimativa
+                    anteriores[(nome, topologia)] = None
+                else:
+                    registro.update(
+                        medir(
+                            nome,
+                            base,
+                            inicio,
+                            args.repeticoes,
+                            args.limite,
+                            not args.sem_memoria,
+                        )
+                    )
+                    anteriores[(nome, topologia)] = (
+                        (tamanho, registro["tempo_ms"])
+                        if registro["status"] == "ok"
+                        else None
+                    )
+                resultados.append(registro)
+                print(_linha(registro), flush=True)
+    dados = {
+        "meta": {
+            "data": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "plataforma": platform.platform(),
+            "semente": args.semente,
+            "repeticoes": args.repeticoes,
+        },
+        "resultados": resultados,
+    }
+    with open(args.saida, "w", encoding="utf-8") as arquivo:
+        json.dump(dados, arquivo, indent=2, ensure_ascii=False)
+    print(f"\nResultados salvos em: {args.saida}")
+
+
+# ---- HPA*: uma abstração, várias consultas, comparadas ao A* sobre as tabelas planas ----
+
+
+# Pares (início, fim) distintos sorteados entre as células da maior região livre
+def _pares_de_consulta(base, consultas, semente):
+    rotulos, n = rotular_componentes(base == 0)
+    if n == 0:
+        return []
+    tamanhos = np.bincount(rotulos.reshape(-1), minlength=n + 1)
+    tamanhos[0] = 0
+    celulas = np.flatnonzero(rotulos.reshape(-1) == int(np.argmax(tamanhos)))
+    if celulas.size < 2:
+        return []
+    sorteio = np.random.default_rng(semente).choice(celulas, size=(consultas, 2))
+    colunas = base.shape[1]
+    return [
+        (divmod(int(a), colunas), divmod(int(b), colunas)) for a, b in sorteio if a != b
+    ]
+
+
+def _custo(caminho):
+    return sum(
+        math.sqrt(2) if a[0] != b[0] and a[1] != b[1] else 1
+        for a, b in zip(caminho, caminho[1:])
+    )
+
+
+# Constrói a abstração uma vez e responde às mesmas consultas com o HPA* e com o A*
+# modo="array" (que também reaproveita a sua tabela entre as consultas)
+def medir_hpa(base, pares, diagonal):
+    planejador = PlanejadorHPA(base, diagonal)
+    t0 = time.perf_counter()
+    planejador.construir()
+    construcao_ms = (time.perf_counter() - t0) * 1000.0
+    grid = base.copy()
+    pf = PathFinder(grid, diagonal=diagonal, modo="array")
+    tempos_hpa, tempos_plano, razoes = [], [], []
+    for inicio, fim in pares:
+        t0 = time.perf_counter()
+        caminho = planejador.caminho(inicio, fim)
+        tempos_hpa.append((time.perf_counter() - t0) * 1000.0)
+        grid[inicio], grid[fim] = 2, 3
+        t0 = time.perf_counter()
+        esperado = pf.a_estrela()
+        tempos_plano.append((time.perf_counter() - t0) * 1000.0)
+        grid[inicio] = grid[fim] = 0
+        if caminho and esperado and len(esperado) > 1:
+            razoes.append(_custo(caminho) / _custo(esperado))
+    hpa_ms = statistics.mean(tempos_hpa)
+    plano_ms = statistics.mean(tempos_plano)
+    return {
+        "nos": planejador.total_nos,
+        "construcao_ms": construcao_ms,
+        "hpa_ms": hpa_ms,
+        "plano_ms": plano_ms,
+        "aceleracao": plano_ms / hpa_ms,
+        "custo_relativo": statistics.mean(razoes) if razoes else None,
+        # consultas até a construção se pagar (None se o HPA* não for mais rápido)
+        "empate": (
+            math.ceil(construcao_ms / (plano_ms - hpa_ms))
+            if plano_ms > hpa_ms
+            else None
+        ),
+    }
+
+
+def executar_hpa(args):
+    densidades = sorted(
+        {
+            float(n.split("_", 1)[1])
+            for n in args.topologias
+            if n.startswith("aleatorio_")
+        }
+    )
+    fabricas = topologias(densidades)
+    print(
+        f"{'topologia':<16}{'tamanho':>7}{'nós':>8}{'construção':>13}{'HPA*':>11}"
+        f"{'A*':>11}{'aceleração':>12}{'custo':>8}{'empate':>8}"
+    )
+    for tamanho in args.tamanhos:
+        for topologia in args.topologias:
+            fabrica, _ = fabricas[topologia]
+            base = fabrica(tamanho, args.semente)
+            pares = _pares_de_consulta(base, args.consultas, args.semente)
+            if not pares:
+                continue
+            r = medir_hpa(base, pares, not args.sem_diagonal)
+            custo = "-" if r["custo_relativo"] is None else f"{r['custo_relativo']:.3f}"
+            empate = "-" if r["empate"] is None else str(r["empate"])
+            print(
+                f"{topologia:<16}{tamanho:>7}{r['nos']:>8}"
+                f"{r['construcao_ms']:>10.0f} ms{r['hpa_ms']:>8.1f} ms"
+                f"{r['plano_ms']:>8.1f} ms{r['aceleracao']:>11.1f}x{custo:>8}{empate:>8}",
+                flush=True,
+            )
+
+
+def _linha(registro):
+    rotulo = (
+        f"{registro['motor']:<32}{registro['topologia']:<16}{registro['tamanho']:>6}"
+    )
+    if registro["status"] != "ok":
+        return f"{rotulo}  {registro['status']}"
+    memoria = registro.get("pico_memoria_kb")
+    memoria = f"{memoria / 1024.0:>10.1f} MB" if memoria is not None else ""
+    return (
+        f"{rotulo}{registro['tempo_ms']:>12.1f} ms"
+        f"{registro.get('expandidos', ''):>12}{memoria}"
+    )
+
+
+# Compara dois arquivos de resultados; devolve o número de regressões encontradas
+def comparar(caminho_base, caminho_novo, tolerancia, minimo_ms=DIFERENCA_MINIMA_MS):
+    with open(caminho_base, encoding="utf-8") as arquivo:
+        base = json.load(arquivo)["resultados"]
+    with open(caminho_novo, encoding="utf-8") as arquivo:
+        novo = json.load(arquivo)["resultados"]
+    chave = lambda r: (r["motor"], r["topologia"], r["tamanho"])
+    anteriores = {chave(r): r for r in base}
+    regressoes = 0
+    print(f"{'motor':<32}{'topologia':<16}{'tamanho':>7}{'tempo':>10}{'memória':>10}")
+    for registro in novo:
+        anterior = anteriores.get(chave(registro))
+        if anterior is None:
+            continue
+        avisos = []
+        if anterior["status"] == "ok" and registro["status"] != "ok":
+            avisos.append(registro["status"])
+        razao_tempo = _razao(anterior, registro, "tempo_ms")
+        razao_memoria = _razao(anterior, registro, "pico_memoria_kb")
+        if (
+            razao_tempo is not None
+            and razao_tempo > tolerancia
+            and registro["tempo_ms"] - anterior["tempo_ms"] > minimo_ms
+        ):
+            avisos.append("tempo")
+        if razao_memoria is not None and razao_memoria > tolerancia:
+            avisos.append("memória")
+        if anterior.get("expandidos") != registro.get("expandidos"):
+            # não é regressão de desempenho, mas indica mudança de comportamento
+            print(
+                f"  aviso: expansões mudaram em {chave(registro)}: "
+                f"{anterior.get('expandidos')} -> {registro.get('expandidos')}"
+            )
+        regressoes += bool(avisos)
+        print(
+            f"{registro['motor']:<32}{registro['topologia']:<16}{registro['tamanho']:>7}"
+            f"{_formatar_razao(razao_tempo):>10}{_formatar_razao(razao_memoria):>10}"
+            f"{'  REGRESSÃO: ' + ', '.join(avisos) if avisos else ''}"
+        )
+    print(f"\n{regressoes} regressão(ões) acima de {tolerancia:.2f}x")
+    return regressoes
+
+
+def _razao(anterior, registro, campo):
+    if anterior["status"] != "ok" or registro["status"] != "ok":
+        return None
+    if not anterior.get(campo) or registro.get(campo) is None:
+        return None
+    return registro[campo] / anterior[campo]
+
+
+def _formatar_razao(razao):
+    return "-" if razao is None else f"{razao:.2f}x"
+
+
+def _lista(tipo):
+    return lambda texto: [tipo(v) for v in texto.split(",") if v]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Benchmark dos motores de busca e preenchimento"
+    )
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    executar = sub.add_parser("executar", help="roda a suíte e grava um JSON")
+    executar.add_argument(
+        "--tamanhos",
+        type=_lista(int),
+        default=None,
+        help="padrão: TAMANHOS, cada motor até o seu maior tamanho",
+    )
+    executar.add_argument("--densidades", type=_lista(float), default=list(DENSIDADES))
+    executar.add_argument("--topologias", type=_lista(str), default=None)
+    executar.add_argument("--motores", type=_lista(str), default=None)
+    executar.add_argument("--repeticoes", type=int, default=3)
+    executar.add_argument("--semente", type=int, default=0)
+    executar.add_argument("--limite", type=float, default=LIMITE_S)
+    executar.add_argument("--sem-memoria", action="store_true")
+    executar.add_argument(
+        "--saida",
+        default=f"benchmark_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
+    )
+
+    comparar_cmd = sub.add_parser("comparar", help="compara dois JSONs de resultados")
+    comparar_cmd.add_argument("base")
+    comparar_cmd.add_argument("novo")
+    comparar_cmd.add_argument("--tolerancia", type=float, default=TOLERANCIA)
+    comparar_cmd.add_argument("--minimo-ms", type=float, default=DIFERENCA_MINIMA_MS)
+
+    hpa = sub.add_parser(
+        "hpa", help="consultas repetidas: HPA* contra o A* sobre as tabelas planas"
+    )
+    hpa.add_argument("--tamanhos", type=_lista(int), default=list(TAMANHOS_HPA))
+    hpa.add_argument("--topologias", type=_lista(str), default=list(TOPOLOGIAS_HPA))
+    hpa.add_argument("--consultas", type=int, default=10)
+    hpa.add_argument("--semente", type=int, default=0)
+    hpa.add_argument("--sem-diagonal", action="store_true")
+
+    args = parser.parse_args(argv)
+    if args.comando == "executar":
+        executar_suite(args)
+        return 0
+    if args.comando == "hpa":
+        executar_hpa(args)
+        return 0
+    return 1 if comparar(args.base, args.novo, args.tolerancia, args.minimo_ms) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
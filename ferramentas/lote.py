@@ -0,0 +1,263 @@
+import argparse
+import concurrent.futures
+import glob
+import json
+import math
+import os
+import sys
+import time
+
+import numpy as np
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(RAIZ, "Trabalho 1"))
+sys.path.insert(0, os.path.join(RAIZ, "Trabalho 2"))
+
+import arquivo_labirinto
+from execucao import BuscaCancelada
+from floodfill import FloodFill
+from floodfill2 import colorir_todas_regioes
+from pathfinder import PathFinder
+from terreno import peso_da_celula
+
+PADROES = ("*.txt", "*.npy", "*" + arquivo_labirinto.EXTENSAO)
+ALGORITMOS = ("a_estrela", "floodfill", "regioes")
+# Arquivos por tarefa enviada a um processo (amortiza o custo de despachar a tarefa)
+TAMANHO_LOTE = 8
+# Tempo máximo (s) de cada arquivo; a busca é cancelada pelo callback de progresso
+LIMITE_S = 60.0
+# Caracteres aceitos nos arquivos de texto, além dos dígitos 0-3
+SIMBOLOS = {".": 0, "#": 1, "S": 2, "E": 3}
+
+
+# ---- Leitura dos labirintos ----
+
+
+# Lê um labirinto de um .lab (memmap, ver arquivo_labirinto), de um .npy ou de um
+# arquivo de texto com uma linha do grid por linha do arquivo: dígitos 0-3 (separados
+# ou não por espaço/vírgula) ou os símbolos . # S E
+def carregar_labirinto(caminho):
+    if caminho.endswith(arquivo_labirinto.EXTENSAO):
+        return arquivo_labirinto.carregar_labirinto(caminho)[0]
+    if caminho.endswith(".npy"):
+        return np.load(caminho).astype(np.uint8, copy=False)
+    linhas = []
+    with open(caminho, encoding="utf-8") as arquivo:
+        for numero, texto in enumerate(arquivo, 1):
+            texto = texto.strip().replace(",", "").replace(" ", "")
+            if not texto:
+                continue
+            try:
+                linhas.append([int(c) if c.isdigit() else SIMBOLOS[c] for c in texto])
+            except KeyError as erro:
+                raise ValueError(
+                    f"{caminho}:{numero}: símbolo inválido {erro.args[0]!r}"
+                ) from None
+    if not linhas or any(len(linha) != len(linhas[0]) for linha in linhas):
+        raise ValueError(f"{caminho}: o grid precisa ser retangular e não vazio")
+    return np.array(linhas, dtype=np.uint8)
+
+
+def listar_arquivos(diretorio, padroes):
+    arquivos = set()
+    for padrao in padroes:
+        arquivos.update(
+            glob.glob(os.path.join(diretorio, "**", padrao), recursive=True)
+        )
+    return sorted(arquivos)
+
+
+# ---- Algoritmos: cada um recebe o grid (array) e as opções, devolve métricas ----
+
+
+def _prazo(limite_s):
+    fim = time.perf_counter() + limite_s
+    return lambda expandidos, fronteira: time.perf_counter() < fim
+
+
+# Custo do caminho somando o peso de cada célula em que ele entra (ver terreno.py)
+def _custo_caminho(grid, caminho):
+    return sum(
+        (math.sqrt(2) if a[0] != b[0] and a[1] != b[1] else 1)
+        * peso_da_celula(int(grid[b]))
+        for a, b in zip(caminho, caminho[1:])
+    )
+
+
+def _a_estrela(grid, opcoes, limite_s):
+    pf = PathFinder(grid, diagonal=opcoes.diagonal, modo=opcoes.modo)
+    pf.progresso = _prazo(limite_s)
+    caminho = pf.a_estrela()
+    if pf.inicio is None or pf.fim is None:
+        return {"status": "sem_extremos"}
+    return {
+        "status": "ok" if caminho else "sem_caminho",
+        "comprimento": len(caminho) if caminho else 0,
+        "custo": round(_custo_caminho(grid, caminho), 6) if caminho else None,
+        "expandidos": pf.last_expandidos,
+        "tempo_busca_ms": pf.last_elapsed_ms,
+        "fases_ms": pf.estatisticas.tempos_ms,
+    }
+
+
+def _flood_fill(grid, opcoes, limite_s):
+    ff = FloodFill(grid, motor=opcoes.motor)
+    ff.progresso = _prazo(limite_s)
+    caminhos = ff.buscar_caminho(todos_encontrados=True)
+    if ff.inicio is None:
+        return {"status": "sem_extremos"}
+    comprimento = min((len(c) for c in caminhos.values()), default=0)
+    return {
+        "status": "ok" if caminhos else "sem_caminho",
+        "comprimento": comprimento,
+        # sem diagonais, o custo é o número de passos do caminho mais curto
+        "custo": comprimento - 1 if caminhos else None,
+        "alvos": len(ff.fins),
+        "alvos_alcancados": len(caminhos),
+        "expandidos": ff.last_expandidos,
+        "tempo_busca_ms": ff.last_elapsed_ms,
+        "fases_ms": ff.estatisticas.tempos_ms,
+    }
+
+
+# colorir_todas_regioes não tem callback de progresso: o limite não interrompe a
+# rotulação (com metodo="rotulos" ela é linear e vetorizada)
+def _regioes(grid, opcoes, limite_s):
+    # o flood fill de Trabalho 2 trata só o valor 0 como livre
+    grid = grid.tolist()
+    for linha in grid:
+        for j, valor in enumerate(linha):
+            if valor in (2, 3):
+                linha[j] = 0
+    t0 = time.perf_counter()
+    resultado = colorir_todas_regioes(grid, metodo=opcoes.metodo)
+    tamanhos = [len(celulas) for celulas in resultado.values()]
+    return {
+        "status": "ok",
+        "regioes": len(tamanhos),
+        "maior_regiao": max(tamanhos, default=0),
+        "tempo_busca_ms": (time.perf_counter() - t0) * 1000.0,
+    }
+
+
+EXECUTORES = {"a_estrela": _a_estrela, "floodfill": _flood_fill, "regioes": _regioes}
+
+
+# Resolve um arquivo; erros viram registros em vez de derrubar o lote inteiro
+def resolver(caminho, opcoes, limite_s):
+    registro = {"arquivo": caminho, "algoritmo": opcoes.algoritmo}
+    t0 = time.perf_counter()
+    try:
+        base = carregar_labirinto(caminho)
+        registro["linhas"], registro["colunas"] = base.shape
+        registro["carga_ms"] = (time.perf_counter() - t0) * 1000.0
+        restante = limite_s - (time.perf_counter() - t0)
+        # PathFinder e FloodFill recebem o array direto (tabelas planas / motor numpy)
+        registro.update(EXECUTORES[opcoes.algoritmo](base, opcoes, restante))
+    except BuscaCancelada:
+        registro["status"] = "tempo_esgotado"
+    except Exception as erro:
+        registro["status"] = "erro"
+        registro["erro"] = f"{type(erro).__name__}: {erro}"
+    registro["tempo_total_ms"] = (time.perf_counter() - t0) * 1000.0
+    return registro
+
+
+# Tarefa enviada a cada processo: resolve um lote de arquivos em sequência
+def resolver_lote(caminhos, opcoes, limite_s):
+    return [resolver(caminho, opcoes, limite_s) for caminho in caminhos]
+
+
+# ---- Execução ----
+
+
+# Arquivos já presentes na saída (para retomar um lote interrompido). Uma última linha
+# truncada por uma interrupção é ignorada e o arquivo correspondente roda de novo.
+def arquivos_concluidos(caminho_saida):
+    concluidos = set()
+    if not os.path.exists(caminho_saida):
+        return concluidos
+    with open(caminho_saida, encoding="utf-8") as arquivo:
+        for linha in arquivo:
+            try:
+                concluidos.add(json.loads(linha)["arquivo"])
+            except (ValueError, KeyError):
+                continue
+    return concluidos
+
+
+def executar_lote(args, saida):
+    arquivos = listar_arquivos(args.diretorio, args.padroes)
+    if args.retomar and args.saida:
+        concluidos = arquivos_concluidos(args.saida)
+        arquivos = [a for a in arquivos if a not in concluidos]
+    lotes = [arquivos[k : k + args.lote] for k in range(0, len(arquivos), args.lote)]
+    contagem = {}
+    t0 = time.perf_counter()
+    with concurrent.futures.ProcessPoolExecutor(args.processos) as executor:
+        pendentes = [
+            executor.submit(resolver_lote, lote, args, args.limite) for lote in lotes
+        ]
+        # os resultados saem à medida que os lotes terminam, não na ordem dos arquivos
+        for futuro in concurrent.futures.as_completed(pendentes):
+            for registro in futuro.result():
+                saida.write(json.dumps(registro, ensure_ascii=False) + "\n")
+                contagem[registro["status"]] = contagem.get(registro["status"], 0) + 1
+            saida.flush()
+    total = time.perf_counter() - t0
+    resumo = ", ".join(f"{n} {status}" for status, n in sorted(contagem.items()))
+    print(
+        f"{len(arquivos)} arquivo(s) em {total:.1f} s ({resumo or 'nada a fazer'})",
+        file=sys.stderr,
+    )
+    return contagem
+
+
+def _lista(texto):
+    return [v for v in texto.split(",") if v]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Resolve em paralelo todos os labirintos de um diretório"
+    )
+    parser.add_argument("diretorio")
+    parser.add_argument("--algoritmo", choices=ALGORITMOS, default="a_estrela")
+    parser.add_argument("--modo", default="padrao", help="modo do PathFinder")
+    parser.add_argument("--diagonal", action="store_true")
+    parser.add_argument("--motor", default="numpy", help="motor do FloodFill")
+    parser.add_argument(
+        "--metodo", default="rotulos", help="método de colorir_todas_regioes"
+    )
+    parser.add_argument("--padroes", type=_lista, default=list(PADROES))
+    parser.add_argument("--processos", type=int, default=os.cpu_count())
+    parser.add_argument("--lote", type=int, default=TAMANHO_LOTE)
+    parser.add_argument("--limite", type=float, default=LIMITE_S)
+    parser.add_argument("--saida", help="arquivo JSONL (padrão: saída padrão)")
+    parser.add_argument(
+        "--retomar",
+        action="store_true",
+        help="acrescenta à saída pulando os arquivos que já estão nela",
+    )
+    args = parser.parse_args(argv)
+    args.lote = max(1, args.lote)
+
+    if not args.saida:
+        contagem = executar_lote(args, sys.stdout)
+    else:
+        with open(args.saida, "a" if args.retomar else "w", encoding="utf-8") as saida:
+            # completa a linha que uma interrupção tenha deixado pela metade
+            if saida.tell() and _termina_sem_quebra(args.saida):
+                saida.write("\n")
+            contagem = executar_lote(args, saida)
+    return 1 if contagem.get("erro") else 0
+
+
+def _termina_sem_quebra(caminho):
+    with open(caminho, "rb") as arquivo:
+        arquivo.seek(-1, os.SEEK_END)
+        return arquivo.read(1) != b"\n"
+
+
+if __name__ == "__main__":
+    sys.exit(main())